@@ -0,0 +1,36 @@
+import functools
+import hmac
+import logging
+
+from flask import request, jsonify, current_app
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def token_matches(expected, provided):
+    """Comparație în timp constant; fără token configurat nu se potrivește nimic."""
+    return bool(expected) and hmac.compare_digest((provided or '').encode(), str(expected).encode())
+
+
+def is_admin_request():
+    """Antetul X-Admin-Token corespunde cu CRM_ADMIN_TOKEN? Fără token configurat: niciodată."""
+    return token_matches(current_app.config.get('CRM_ADMIN_TOKEN'), request.headers.get(ADMIN_TOKEN_HEADER, ''))
+
+
+def admin_required(view):
+    """Endpoint-urile de administrare există doar dacă CRM_ADMIN_TOKEN este setat."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get('CRM_ADMIN_TOKEN'):
+            return jsonify({"error": "Not found"}), 404
+        if not is_admin_request():
+            return jsonify({"error": "Admin token required"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def init_admin(app):
+    app.config.setdefault('CRM_ADMIN_TOKEN', None)
@@ -0,0 +1,267 @@
+import logging
+import math
+import threading
+import time
+
+from flask import request, jsonify, current_app
+
+from backend.admin import admin_required
+
+logger = logging.getLogger(__name__)
+
+HEAVY = 'heavy'
+STANDARD = 'standard'
+# Cheia din request.environ pentru permisele obținute (sub-cererile unui batch
+# au propriul environ, deci nu se amestecă cu cele ale cererii părinte)
+TICKET_KEY = 'crm.admission_ticket'
+# Ponderea ultimei durate în media mobilă folosită pentru Retry-After
+SERVICE_TIME_WEIGHT = 0.2
+
+
+def cost_class(cost):
+    """Marchează costul unui handler: un nume de clasă (ex: 'heavy') sau o
+    funcție care îl alege după query string (ex: listă paginată = ieftină).
+
+    Handler-ele nemarcate sunt 'standard' și nu sunt limitate.
+    """
+    def decorator(view):
+        view._crm_cost = cost
+        return view
+    return decorator
+
+
+def view_cost(view, args):
+    cost = getattr(view, '_crm_cost', STANDARD)
+    return cost(args) if callable(cost) else cost
+
+
+class Shed(Exception):
+    """Cererea a fost respinsă: coada e plină sau bugetul de așteptare a expirat."""
+
+    def __init__(self, gate, reason, retry_after):
+        super().__init__(f"{gate}: {reason}")
+        self.gate = gate
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Gate:
+    """Semafor cu coadă mărginită: cel mult `limit` cereri rulează simultan,
+    cel mult `max_queue` așteaptă, fiecare cel mult `queue_timeout` secunde."""
+
+    def __init__(self, name, limit, queue_timeout, max_queue):
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = {'queue_full': 0, 'timeout': 0}
+        self.wait_seconds_total = 0.0
+        self.service_seconds = None
+
+    def retry_after(self):
+        """Secunde până când o cerere nouă are șanse să intre (cel puțin 1)."""
+        service = self.service_seconds or 1.0
+        return max(1, math.ceil(service * (self.waiting + 1) / self.limit))
+
+    def enter(self, deadline):
+        """Ocupă un permis; returnează secundele așteptate. Ridică Shed."""
+        started = time.monotonic()
+        with self._cond:
+            if self.in_flight >= self.limit:
+                if self.waiting >= self.max_queue:
+                    self.shed['queue_full'] += 1
+                    raise Shed(self.name, 'queue_full', self.retry_after())
+                self.waiting += 1
+                try:
+                    while self.in_flight >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.shed['timeout'] += 1
+                            raise Shed(self.name, 'timeout', self.retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            waited = time.monotonic() - started
+            self.in_flight += 1
+            self.admitted += 1
+            self.wait_seconds_total += waited
+            return waited
+
+    def leave(self, service_seconds):
+        with self._cond:
+            self.in_flight -= 1
+            if self.service_seconds is None:
+                self.service_seconds = service_seconds
+            else:
+                self.service_seconds += SERVICE_TIME_WEIGHT * (service_seconds - self.service_seconds)
+            self._cond.notify()
+
+    def cancel(self, waited):
+        """Anulează un `enter` reușit al unei cereri respinse de poarta următoare.
+
+        Cererea nu a rulat: nu intră în media duratelor (Retry-After) și nici
+        în numărul de cereri admise sau în timpul de așteptare.
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self.admitted -= 1
+            self.wait_seconds_total -= waited
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'shed': dict(self.shed),
+                'avg_wait_ms': round(1000 * self.wait_seconds_total / self.admitted, 2) if self.admitted else 0.0,
+                'avg_service_ms': round(1000 * (self.service_seconds or 0.0), 2),
+            }
+
+
+class Ticket:
+    def __init__(self, gates):
+        self.gates = gates
+        self.started = time.monotonic()
+
+    def release(self):
+        elapsed = time.monotonic() - self.started
+        for gate in reversed(self.gates):
+            gate.leave(elapsed)
+        self.gates = []
+
+
+class AdmissionRegistry:
+    """Porțile (semafoarele) procesului: una per clasă de cost limitată și una
+    per rută cu limită proprie. Partajate de toate thread-urile workerului."""
+
+    def __init__(self, class_limits, route_limits):
+        self.class_gates = {
+            name: Gate(f"class:{name}", limit, queue_ms / 1000.0, max_queue)
+            for name, (limit, queue_ms, max_queue) in class_limits.items() if limit > 0
+        }
+        self.route_gates = {
+            endpoint: Gate(f"route:{endpoint}", limit, queue_ms / 1000.0, max_queue)
+            for endpoint, (limit, queue_ms, max_queue) in route_limits.items() if limit > 0
+        }
+
+    def admit(self, endpoint, cost):
+        """Intră pe porțile rutei și ale clasei, cu un singur buget de așteptare.
+
+        Returnează un Ticket (de eliberat după răspuns) sau None dacă cererea
+        nu este limitată. Ridică Shed dacă cererea trebuie respinsă.
+        """
+        gates = [gate for gate in (self.route_gates.get(endpoint), self.class_gates.get(cost)) if gate]
+        if not gates:
+            return None
+        deadline = time.monotonic() + min(gate.queue_timeout for gate in gates)
+        entered = []
+        try:
+            for gate in gates:
+                entered.append((gate, gate.enter(deadline)))
+        except Shed:
+            for gate, waited in reversed(entered):
+                gate.cancel(waited)
+            raise
+        return Ticket([gate for gate, _ in entered])
+
+    def stats(self):
+        return {
+            'classes': {name: gate.stats() for name, gate in self.class_gates.items()},
+            'routes': {endpoint: gate.stats() for endpoint, gate in self.route_gates.items()},
+        }
+
+
+def parse_route_limits(value):
+    """"api.get_contacts=2,api.get_interactions=1" -> {"api.get_contacts": 2, ...}"""
+    if isinstance(value, dict):
+        return {endpoint: int(limit) for endpoint, limit in value.items()}
+    limits = {}
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        endpoint, sep, limit = item.partition('=')
+        if not sep:
+            raise ValueError(f"Invalid CRM_ADMISSION_ROUTE_LIMITS entry '{item}' (expected endpoint=limit)")
+        limits[endpoint.strip()] = int(limit)
+    return limits
+
+
+def shed_response(shed):
+    response = jsonify({"error": "Server is busy, please retry later"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(shed.retry_after)
+    return response
+
+
+def admit_endpoint(app, endpoint, args):
+    """Aplică admission control pentru un endpoint Flask (folosit și de handler-ele ASGI)."""
+    registry = app.extensions.get('crm_admission')
+    if registry is None:
+        return None
+    try:
+        return registry.admit(endpoint, view_cost(app.view_functions.get(endpoint), args))
+    except Shed as shed:
+        logger.warning(f"Shed request to {endpoint}: {shed}")
+        raise
+
+
+def init_admission(app):
+    """Limite de concurență per clasă de cost și per rută (CRM_ADMISSION)."""
+    app.config.setdefault('CRM_ADMISSION', True)
+    app.config.setdefault('CRM_ADMISSION_HEAVY_LIMIT', 2)
+    app.config.setdefault('CRM_ADMISSION_QUEUE_TIMEOUT_MS', 500)
+    app.config.setdefault('CRM_ADMISSION_MAX_QUEUE', 8)
+    app.config.setdefault('CRM_ADMISSION_ROUTE_LIMITS', '')
+    if not app.config['CRM_ADMISSION']:
+        return
+
+    queue_ms = app.config['CRM_ADMISSION_QUEUE_TIMEOUT_MS']
+    max_queue = app.config['CRM_ADMISSION_MAX_QUEUE']
+    registry = AdmissionRegistry(
+        class_limits={HEAVY: (app.config['CRM_ADMISSION_HEAVY_LIMIT'], queue_ms, max_queue)},
+        route_limits={
+            endpoint: (limit, queue_ms, max_queue)
+            for endpoint, limit in parse_route_limits(app.config['CRM_ADMISSION_ROUTE_LIMITS']).items()
+        },
+    )
+    app.extensions['crm_admission'] = registry
+
+    @app.before_request
+    def admit_request():
+        if request.endpoint is None:
+            return None
+        try:
+            ticket = admit_endpoint(app, request.endpoint, request.args)
+        except Shed as shed:
+            return shed_response(shed)
+        if ticket is not None:
+            request.environ[TICKET_KEY] = ticket
+        return None
+
+    @app.teardown_request
+    def release_request(exc):
+        ticket = request.environ.pop(TICKET_KEY, None)
+        if ticket is not None:
+            ticket.release()
+
+    logger.debug(f"Admission control enabled: {registry.stats()}")
+
+
+def register_admission_routes(bp):
+    """Register the admission control metrics endpoint."""
+
+    @bp.route('/api/admin/admission', methods=['GET'])
+    @admin_required
+    def get_admission_stats():
+        """Permise ocupate, cereri în așteptare și cereri respinse, per clasă și per rută."""
+        registry = current_app.extensions.get('crm_admission')
+        if registry is None:
+            return jsonify({"enabled": False}), 200
+        return jsonify({"enabled": True, **registry.stats()}), 200
@@ -1,12 +1,13 @@
 import os
 import logging
+import weakref
 
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from sqlalchemy.orm import DeclarativeBase
-from flask_migrate import Migrate # Import Flask-Migrate
 from sqlalchemy import MetaData # Import MetaData for naming convention
+from backend.routing import RoutingSession, init_routing
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -28,42 +29,116 @@ class Base(DeclarativeBase):
     metadata = MetaData(naming_convention=convention)
 
 # Initialize SQLAlchemy with the Base class (which now includes metadata with naming convention)
-db = SQLAlchemy(model_class=Base)
-
-# Initialize Migrate - Added render_as_batch=True for SQLite compatibility
-migrate = Migrate(render_as_batch=True) # Create Migrate instance with batch mode enabled
-
-# Create the Flask application
-app = Flask(__name__)
-
-# Enable CORS
-CORS(app)
-
-# Configure the application
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
+# RoutingSession trimite citirile handler-elor read-only către replici (dacă sunt configurate)
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 
 # Set up database - Folosim SQLite
 # Creează calea absolută către directorul proiectului
 basedir = os.path.abspath(os.path.dirname(__file__))
 # Definește calea către fișierul bazei de date SQLite în directorul rădăcină al proiectului
-db_path = os.path.join(os.path.dirname(basedir), 'crm_lite.db') 
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+db_path = os.path.join(os.path.dirname(basedir), 'crm_lite.db')
+
+
+def _running_from_cli():
+    # Setat de FlaskGroup pentru orice comandă `flask ...` (db, crm, run, shell)
+    return os.environ.get("FLASK_RUN_FROM_CLI") == "true"
+
+
+def _init_cli(app):
+    """Flask-Migrate (Alembic) și comenzile `flask crm` sunt importate doar pentru CLI."""
+    from flask_migrate import Migrate # Import Flask-Migrate
+    from backend.cli import crm_cli
+
+    # Initialize Migrate - Added render_as_batch=True for SQLite compatibility
+    Migrate(render_as_batch=True).init_app(app, db)
+    app.cli.add_command(crm_cli)
+    logger.debug("Flask-Migrate initialized (batch mode enabled)")
+
+
+# Aplicațiile create în acest proces, pentru resetarea pool-urilor după fork
+_apps = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    """Conexiunile din pool nu pot fi partajate între procese: după fork
+    (ex: gunicorn --preload) fiecare worker își deschide propriile conexiuni."""
+    for app in list(_apps):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+        app.extensions['crm_replicas'].dispose(close=False)
+        if 'crm_tenants' in app.extensions:
+            app.extensions['crm_tenants'].dispose(close=False)
+
+    from backend.batch import reset_executor
+    reset_executor()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def create_app(config=None):
+    """Application factory.
+
+    `config` (dict) suprascrie configurația implicită și variabilele de mediu;
+    util pentru aplicații de test (ex: {"SQLALCHEMY_DATABASE_URI": "sqlite://"}).
+    """
+    # Create the Flask application
+    app = Flask(__name__)
+
+    # Enable CORS (ETag expus pentru revalidarea din queryCache.js)
+    CORS(app, expose_headers=['ETag'])
+
+    # Configure the application
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", f"sqlite:///{db_path}")
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["CRM_ENABLE_CLI"] = _running_from_cli()
+
+    # Opțiuni CRM_* din variabile de mediu cu prefixul FLASK_ (ex: FLASK_CRM_GROUP_COMMIT=true)
+    app.config.from_prefixed_env()
+    if config:
+        app.config.update(config)
+
+    # Initialize the database with the app
+    db.init_app(app)
+    init_routing(app)
+
+    # Mod multi-tenant: o bază de date per tenant (CRM_TENANCY)
+    from backend.tenancy import init_tenancy
+    init_tenancy(app)
+
+    # Interacțiunile istorice pot fi mutate într-un fișier SQLite separat (CRM_COLD_STORAGE)
+    from backend.coldstorage import init_cold_storage
+    init_cold_storage(app)
+
+    # Writer opțional cu group commit pentru SQLite (CRM_GROUP_COMMIT)
+    from backend.writequeue import init_group_commit
+    init_group_commit(app)
+
+    # !! IMPORTANT: Remove db.create_all() as migrations will handle the schema !!
+
+    # Rutele API sunt înregistrate pe un blueprint
+    from backend.routes import api_bp, init_api
+    init_api(app)
+    app.register_blueprint(api_bp)
 
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Rollup-uri pentru rapoarte (listener-e ORM + scheduler opțional)
+    from backend.rollups import init_rollups
+    init_rollups(app)
 
-# Initialize the database and migrate with the app
-db.init_app(app)
-migrate.init_app(app, db) # Initialize Migrate with app and db
+    # Retenția notificărilor (TTL, plafon per țintă, arhivare în loturi)
+    from backend.retention import init_retention
+    init_retention(app)
 
-# !! IMPORTANT: Remove db.create_all() as migrations will handle the schema !!
-# with app.app_context():
-#    # Import models here to avoid circular imports
-#    from backend.models import Contact, Company, Interaction, Notification, Meeting 
-#    db.create_all()
-#    logger.debug(f"Database tables created at {db_path}")
+    # ETag + 304 pentru răspunsurile JSON GET (CRM_HTTP_ETAGS)
+    from backend.httpcache import init_http_cache
+    init_http_cache(app)
 
-# Import routes
-from backend.routes import register_routes  # Change to use backend package
-register_routes(app)
+    if app.config["CRM_ENABLE_CLI"]:
+        _init_cli(app)
 
-logger.debug("Application initialized with Flask-Migrate (batch mode enabled)")
+    _apps.add(app)
+    logger.debug("Application initialized")
+    return app
@@ -0,0 +1,211 @@
+"""ASGI entry point for I/O-bound serving: `uvicorn backend.asgi:app`.
+
+Endpoint-urile de citire cele mai folosite sunt servite de handler-e async
+peste engine-ul asyncio al SQLAlchemy (aiosqlite / asyncpg), cu aceleași
+modele din backend/models.py. Restul rutelor /api (scrieri, batch, PATCH etc.)
+sunt servite de aplicația Flask montată prin adaptorul WSGI, deci API-ul
+expus este identic cu cel sincron.
+
+Necesită dependențele opționale: pip install ".[asgi]"
+"""
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, date
+
+import anyio
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route, Mount
+
+from backend.app import create_app
+from backend.models import Contact, Company, SalesStage
+from backend.coldstorage import count_interactions, fetch_interactions, parse_interaction_filters, install_cold_attach
+from backend.retention import fetch_notifications, count_unread_notifications, parse_notification_args
+from backend.rollups import interaction_counts_by_type
+from backend.listing import CONTACT_LIST, COMPANY_LIST, wants_page, parse_list_args, fetch_page
+from backend import statements
+from backend.admission import Shed, admit_endpoint
+from backend.httpcache import etag_for, if_none_match, REVALIDATE_CACHE_CONTROL
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+
+
+def async_database_url(url):
+    """Transformă URL-ul sincron (ex: sqlite:///crm_lite.db) în varianta async."""
+    scheme, sep, rest = url.partition('://')
+    driver = ASYNC_DRIVERS.get(scheme.split('+')[0])
+    if driver is None:
+        raise ValueError(f"No async driver configured for database URL scheme '{scheme}'")
+    return f"{driver}{sep}{rest}"
+
+
+# ---------- Read handlers (rulează prin AsyncSession.run_sync) ----------
+
+def list_contacts(session, query, path):
+    if wants_page(query):
+        return fetch_page(session, CONTACT_LIST, parse_list_args(query, CONTACT_LIST))
+    contacts = session.scalars(
+        select(Contact).options(selectinload(Contact.company))
+    ).all()
+    return [contact.to_dict() for contact in contacts]
+
+
+def list_companies(session, query, path):
+    if wants_page(query):
+        return fetch_page(session, COMPANY_LIST, parse_list_args(query, COMPANY_LIST))
+    companies = session.scalars(select(Company)).all()
+    return [company.to_dict() for company in companies]
+
+
+def list_interactions(session, query, path):
+    return fetch_interactions(**parse_interaction_filters(query), session=session)
+
+
+def interactions_count(session, query, path):
+    return {"count": count_interactions(session=session)}
+
+
+def list_notifications(session, query, path):
+    limit, unread_only = parse_notification_args(query)
+    return [notification.to_dict() for notification in fetch_notifications(limit, unread_only, session=session)]
+
+
+def unread_notifications_count(session, query, path):
+    return {"unread_count": count_unread_notifications(session=session)}
+
+
+def list_meetings(session, query, path):
+    upcoming_after = None if query.get('all', 'false').lower() == 'true' else datetime.utcnow()
+    return [meeting.to_dict() for meeting in statements.list_meetings(upcoming_after, session=session)]
+
+
+def count_upcoming_meetings(session, query, path):
+    return {"upcoming_meetings_count": statements.count_upcoming_meetings(datetime.utcnow(), session=session)}
+
+
+def list_tasks(session, query, path):
+    tasks = statements.list_tasks(query.get('contact_id'), query.get('company_id'), query.get('status'),
+                                  session=session)
+    return [task.to_dict() for task in tasks]
+
+
+def count_tasks(session, query, path):
+    return statements.count_tasks_by_status(session=session)
+
+
+def report_interactions_by_type(session, query, path):
+    try:
+        start = date.fromisoformat(query['start']) if query.get('start') else None
+        end = date.fromisoformat(query['end']) if query.get('end') else None
+    except ValueError:
+        raise ValueError("Invalid date format for start or end")
+    company_id = int(query['company_id']) if query.get('company_id') else None
+    return interaction_counts_by_type(start, end, company_id, session=session)
+
+
+def sales_pipeline(session, query, path):
+    contacts = statements.pipeline_contacts(session=session)
+    pipeline = {stage.value: [] for stage in SalesStage}
+    for contact in contacts:
+        pipeline[contact.sales_stage.value].append(contact.to_dict())
+    return pipeline
+
+
+# (cale, handler, mesaj de eroare) - aceleași căi și răspunsuri ca rutele Flask
+ASYNC_READ_ROUTES = [
+    ('/api/contacts', list_contacts, "Failed to fetch contacts"),
+    ('/api/companies', list_companies, "Failed to fetch companies"),
+    ('/api/interactions', list_interactions, "Failed to fetch interactions"),
+    ('/api/interactions/count', interactions_count, "Failed to count interactions"),
+    ('/api/notifications', list_notifications, "Failed to fetch notifications"),
+    ('/api/notifications/unread-count', unread_notifications_count, "Failed to count unread notifications"),
+    ('/api/meetings', list_meetings, "Failed to fetch meetings"),
+    ('/api/meetings/upcoming-count', count_upcoming_meetings, "Failed to count upcoming meetings"),
+    ('/api/tasks', list_tasks, "Failed to fetch tasks"),
+    ('/api/tasks/count', count_tasks, "Failed to fetch tasks count"),
+    ('/api/reports/interactions-by-type', report_interactions_by_type, "Failed to generate report"),
+    ('/api/sales/pipeline', sales_pipeline, "Failed to fetch sales pipeline data"),
+]
+
+
+def _async_endpoint(flask_app, sessions, handler, error_message, path):
+    # Limitele de concurență sunt cele ale rutei Flask echivalente (backend/admission.py)
+    flask_endpoint = flask_app.url_map.bind('localhost').match(path, 'GET')[0]
+
+    async def endpoint(request):
+        try:
+            # Așteptarea unui permis blochează, deci rulează într-un thread, nu în event loop
+            ticket = await anyio.to_thread.run_sync(admit_endpoint, flask_app, flask_endpoint, request.query_params)
+        except Shed as shed:
+            return JSONResponse({"error": "Server is busy, please retry later"}, status_code=503,
+                                headers={'Retry-After': str(shed.retry_after)})
+        try:
+            # Contextul de aplicație dă acces la configurație (ex: cold storage) în handler-e
+            with flask_app.app_context():
+                async with sessions() as session:
+                    payload = await session.run_sync(handler, request.query_params, request.path_params)
+            response = JSONResponse(payload)
+            if flask_app.config['CRM_HTTP_ETAGS']:
+                # Aceeași revalidare ca after_request-ul din backend/httpcache.py
+                etag = etag_for(response.body)
+                headers = {'ETag': f'"{etag}"', 'Cache-Control': REVALIDATE_CACHE_CONTROL}
+                if if_none_match(request.headers.get('if-none-match'), etag):
+                    return Response(status_code=304, headers=headers)
+                response.headers.update(headers)
+            return response
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        except Exception as e:
+            logger.error(f"Error in async handler {request.url.path}: {str(e)}")
+            return JSONResponse({"error": error_message}, status_code=500)
+        finally:
+            if ticket is not None:
+                ticket.release()
+    endpoint.__name__ = handler.__name__
+    return endpoint
+
+
+def create_asgi_app(config=None):
+    """Creează aplicația ASGI: rute async de citire + aplicația Flask pentru rest."""
+    flask_app = create_app(config)
+    engine = create_async_engine(
+        async_database_url(flask_app.config['SQLALCHEMY_DATABASE_URI']),
+        **flask_app.config.get('CRM_ASYNC_ENGINE_OPTIONS', {})
+    )
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    if 'crm_cold_storage' in flask_app.extensions:
+        install_cold_attach(engine.sync_engine, flask_app.extensions['crm_cold_storage'])
+
+    routes = []
+    if not flask_app.config['CRM_TENANCY']:
+        # Engine-ul async deservește doar baza implicită; în modul multi-tenant
+        # toate cererile trec prin Flask, care rutează sesiunea per tenant
+        routes = [
+            Route(path, _async_endpoint(flask_app, sessions, handler, message, path), methods=['GET'])
+            for path, handler, message in ASYNC_READ_ROUTES
+        ]
+    # Orice altă rută (sau altă metodă pe aceeași cale) ajunge la Flask
+    routes.append(Mount('/', app=WSGIMiddleware(flask_app)))
+
+    @asynccontextmanager
+    async def lifespan(asgi_app):
+        yield
+        await engine.dispose()
+
+    asgi_app = Starlette(routes=routes, lifespan=lifespan)
+    asgi_app.state.flask_app = flask_app
+    asgi_app.state.engine = engine
+    return asgi_app
+
+
+app = create_asgi_app()
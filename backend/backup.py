@@ -0,0 +1,392 @@
+"""Backup online și restore pentru baza SQLite, fără oprirea aplicației.
+
+Backup-ul folosește API-ul de backup SQLite în pași de CRM_BACKUP_PAGES_PER_STEP
+pagini, cu o pauză între pași, astfel încât scrierile concurente nu așteaptă
+după toată copia. Dacă baza este modificată în timpul copiei, SQLite reia
+copia de la început; după CRM_BACKUP_MAX_RESTARTS reluări se folosește
+VACUUM INTO (o singură tranzacție de citire, consistentă, dar care în modul
+journal implicit ține lock-ul SHARED pe toată durata copiei).
+
+Cu cold storage activ, fișierul cold atașat este salvat lângă snapshot
+(`crm-<timestamp>.cold.db.gz`) și cele două formează un singur set: sunt
+copiate ca o stare consistentă și restaurate împreună.
+"""
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+from flask import request, jsonify, current_app
+
+from backend.admin import admin_required
+from backend.app import db, db_path
+from backend.coldstorage import COLD_SCHEMA, cold_enabled
+from backend.tenancy import tenant_engine
+
+logger = logging.getLogger(__name__)
+
+BACKUP_NAME = re.compile(r'^[A-Za-z0-9_.-]+\.db(\.gz)?$')
+# Copia cold a unui set; nu este un backup de sine stătător
+COLD_BACKUP_NAME = re.compile(r'\.cold\.db(\.gz)?$')
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupRestarted(Exception):
+    pass
+
+
+def _current_engine():
+    engine = tenant_engine() or db.engine
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        raise BackupError("Online backup is only supported for file-based SQLite databases")
+    return engine
+
+
+def _cold_path():
+    """Fișierul cold atașat bazei curente sau None (cold storage dezactivat, tenant)."""
+    return current_app.extensions['crm_cold_storage'] if cold_enabled() else None
+
+
+def cold_backup_path(path):
+    """Calea copiei cold din setul lui `path`: crm-X.db.gz -> crm-X.cold.db.gz."""
+    if path.endswith('.db.gz'):
+        return path[:-len('.db.gz')] + '.cold.db.gz'
+    root, ext = os.path.splitext(path)
+    return f"{root}.cold{ext}"
+
+
+def _compress(source_path, dest_path):
+    with open(source_path, 'rb') as source, gzip.open(dest_path, 'wb', compresslevel=6) as dest:
+        shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+
+
+def _decompress(source_path, dest_path):
+    with gzip.open(source_path, 'rb') as source, open(dest_path, 'wb') as dest:
+        shutil.copyfileobj(source, dest, COPY_CHUNK_SIZE)
+
+
+def _copy_pages(source, target, pages, sleep_seconds, max_restarts, name='main'):
+    """sqlite3 backup pas cu pas. Ridică BackupRestarted dacă sursa e modificată prea des."""
+    state = {'remaining': None, 'restarts': 0}
+
+    def progress(status, remaining, total):
+        # `remaining` crește doar când SQLite reia copia din cauza unei scrieri
+        if state['remaining'] is not None and remaining > state['remaining']:
+            state['restarts'] += 1
+            if state['restarts'] > max_restarts:
+                raise BackupRestarted()
+        state['remaining'] = remaining
+        if remaining and sleep_seconds:
+            time.sleep(sleep_seconds)  # cedează lock-ul către scrieri între pași
+
+    source.backup(target, pages=pages, progress=progress, name=name)
+    return state['restarts']
+
+
+def _copy_into(source, path, name, pages, sleep_seconds, max_restarts):
+    target = sqlite3.connect(path)
+    try:
+        return _copy_pages(source, target, pages, sleep_seconds, max_restarts, name=name)
+    finally:
+        target.close()
+
+
+def _cold_version(source):
+    # Se schimbă la fiecare commit al altei conexiuni în fișierul cold
+    return source.execute(f"PRAGMA {COLD_SCHEMA}.data_version").fetchone()[0]
+
+
+def _copy_with_cold(source, hot_path, cold_path, method, pages, sleep_seconds, max_restarts):
+    """Copiază baza principală și fișierul cold ca o singură stare consistentă.
+
+    Cu metoda 'backup' ambele sunt copiate în pași. Setul este valid doar dacă
+    fișierul cold nu s-a schimbat de la începutul copiei principale până la
+    sfârșitul copiei cold (mutarea în cold, merge-ul și ștergerile scriu în
+    ambele); altfel copia este reluată. După CRM_BACKUP_MAX_RESTARTS reluări,
+    sau cu metoda 'vacuum', ambele sunt copiate într-o singură tranzacție de
+    citire, care ține lock-ul SHARED pe ambele fișiere pe durata copiei.
+    Returnează (metoda folosită, reluări).
+    """
+    restarts = 0
+    if method == 'backup':
+        while restarts <= max_restarts:
+            version = _cold_version(source)
+            try:
+                restarts += _copy_into(source, hot_path, 'main', pages, sleep_seconds, max_restarts - restarts)
+                restarts += _copy_into(source, cold_path, COLD_SCHEMA, pages, sleep_seconds, max_restarts - restarts)
+            except BackupRestarted:
+                break
+            if _cold_version(source) == version:
+                return method, restarts
+            restarts += 1
+        restarts = max_restarts + 1
+        logger.warning("Backup restarted too often under concurrent writes; copying in one read transaction")
+        method = 'vacuum'
+    elif method != 'vacuum':
+        raise BackupError(f"Unknown backup method '{method}'")
+
+    source.execute("BEGIN")
+    try:
+        # Citirile fixează starea ambelor fișiere până la ROLLBACK
+        source.execute("SELECT count(*) FROM main.sqlite_master").fetchone()
+        source.execute(f"SELECT count(*) FROM {COLD_SCHEMA}.sqlite_master").fetchone()
+        _copy_into(source, hot_path, 'main', -1, 0, 0)
+        _copy_into(source, cold_path, COLD_SCHEMA, -1, 0, 0)
+    finally:
+        source.execute("ROLLBACK")
+    return method, restarts
+
+
+def _store(snapshot_path, dest_path, compress):
+    partial_path = dest_path + '.partial'
+    if compress:
+        _compress(snapshot_path, partial_path)
+    else:
+        shutil.copyfile(snapshot_path, partial_path)
+    # Fișierul final apare doar complet scris
+    os.replace(partial_path, dest_path)
+
+
+def backup_database(dest_path, compress=None, pages=None, sleep_ms=None, method=None):
+    """Scrie un snapshot consistent al bazei curente în `dest_path`.
+
+    `compress` implicit după extensie (.gz). Cu cold storage activ, copia
+    fișierului cold este scrisă la cold_backup_path(dest_path). Returnează
+    metadatele backup-ului.
+    """
+    config = current_app.config
+    pages = pages or config['CRM_BACKUP_PAGES_PER_STEP']
+    sleep_ms = config['CRM_BACKUP_STEP_SLEEP_MS'] if sleep_ms is None else sleep_ms
+    method = method or config['CRM_BACKUP_METHOD']
+    compress = dest_path.endswith('.gz') if compress is None else compress
+    engine = _current_engine()
+    cold_path = _cold_path()
+
+    started = time.perf_counter()
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+    snapshot_paths = []
+    for _ in range(2 if cold_path else 1):
+        fd, path = tempfile.mkstemp(prefix='.crm-backup-', suffix='.db', dir=dest_dir)
+        os.close(fd)
+        snapshot_paths.append(path)
+    snapshot_path = snapshot_paths[0]
+    restarts = 0
+    try:
+        with engine.connect() as connection:
+            source = connection.connection.driver_connection
+            if cold_path:
+                method, restarts = _copy_with_cold(
+                    source, snapshot_path, snapshot_paths[1], method,
+                    pages, sleep_ms / 1000.0, config['CRM_BACKUP_MAX_RESTARTS']
+                )
+            else:
+                if method == 'backup':
+                    try:
+                        restarts = _copy_into(source, snapshot_path, 'main', pages, sleep_ms / 1000.0,
+                                              config['CRM_BACKUP_MAX_RESTARTS'])
+                    except BackupRestarted:
+                        restarts = config['CRM_BACKUP_MAX_RESTARTS'] + 1
+                        logger.warning("Backup restarted too often under concurrent writes; using VACUUM INTO")
+                        method = 'vacuum'
+                if method == 'vacuum':
+                    os.remove(snapshot_path)
+                    source.execute("VACUUM main INTO ?", (snapshot_path,))
+                elif method != 'backup':
+                    raise BackupError(f"Unknown backup method '{method}'")
+
+        # Copia cold este scrisă prima: un snapshot principal vizibil are întotdeauna setul complet
+        if cold_path:
+            _store(snapshot_paths[1], cold_backup_path(dest_path), compress)
+        _store(snapshot_path, dest_path, compress)
+    finally:
+        for path in snapshot_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    result = {
+        'path': dest_path,
+        'name': os.path.basename(dest_path),
+        'bytes': os.path.getsize(dest_path),
+        'compressed': compress,
+        'method': method,
+        'restarts': restarts,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    if cold_path:
+        result['cold_bytes'] = os.path.getsize(cold_backup_path(dest_path))
+    logger.info(f"Database backup written: {result}")
+    return result
+
+
+def _prepare_snapshot(source_path):
+    """Decomprimă/copiază snapshot-ul într-un fișier temporar verificat cu PRAGMA quick_check."""
+    fd, snapshot_path = tempfile.mkstemp(prefix='.crm-restore-', suffix='.db')
+    os.close(fd)
+    try:
+        if source_path.endswith('.gz'):
+            _decompress(source_path, snapshot_path)
+        else:
+            shutil.copyfile(source_path, snapshot_path)
+        snapshot = sqlite3.connect(snapshot_path)
+        try:
+            try:
+                check = snapshot.execute("PRAGMA quick_check").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                raise BackupError(f"Not a valid SQLite backup: {str(e)}")
+        finally:
+            snapshot.close()
+        if check != 'ok':
+            raise BackupError(f"Backup failed integrity check: {check}")
+    except Exception:
+        os.remove(snapshot_path)
+        raise
+    return snapshot_path
+
+
+def _restore_file(snapshot_path, target, pages):
+    snapshot = sqlite3.connect(snapshot_path)
+    try:
+        snapshot.backup(target, pages=pages)
+    finally:
+        snapshot.close()
+
+
+def restore_database(source_path, pages=None):
+    """Înlocuiește conținutul bazei curente cu snapshot-ul din `source_path` (.db sau .db.gz).
+
+    Snapshot-ul este verificat (PRAGMA quick_check) înainte de restaurare.
+    Restaurarea rulează sub un lock exclusiv: celelalte conexiuni văd fie baza
+    veche, fie pe cea nouă. Cu cold storage activ, fișierul cold este
+    restaurat din același set; un backup fără copie cold este refuzat, fiindcă
+    interacțiunile arhivate după el ar apărea de două ori (hot și cold).
+    """
+    if not os.path.exists(source_path):
+        raise BackupError(f"Backup file not found: {source_path}")
+    engine = _current_engine()
+    pages = pages or current_app.config['CRM_BACKUP_PAGES_PER_STEP']
+    cold_path = _cold_path()
+    cold_source = cold_backup_path(source_path)
+    if cold_path and not os.path.exists(cold_source):
+        raise BackupError(
+            "This backup has no cold storage copy and cannot be restored while cold storage is enabled"
+        )
+    if not cold_path and os.path.exists(cold_source):
+        logger.warning(f"Cold storage is disabled; ignoring {cold_source}")
+
+    snapshots = []
+    try:
+        # Ambele snapshot-uri sunt verificate înainte de a scrie în vreuna dintre baze
+        snapshots.append(_prepare_snapshot(source_path))
+        if cold_path:
+            snapshots.append(_prepare_snapshot(cold_source))
+        db.session.remove()
+        with engine.connect() as connection:
+            if cold_path:
+                cold_target = sqlite3.connect(cold_path, timeout=30)
+                try:
+                    _restore_file(snapshots[1], cold_target, pages)
+                finally:
+                    cold_target.close()
+            _restore_file(snapshots[0], connection.connection.driver_connection, pages)
+    finally:
+        for path in snapshots:
+            os.remove(path)
+    # Conexiunile din pool pot avea schema cache-uită; le recreăm
+    engine.dispose()
+    logger.info(f"Database restored from {source_path}")
+
+
+# ---------- Snapshot directory ----------
+
+def backup_dir():
+    return current_app.config['CRM_BACKUP_DIR']
+
+
+def default_backup_name():
+    return f"crm-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.db.gz"
+
+
+def backup_path(name):
+    """Calea unui backup din CRM_BACKUP_DIR. Ridică BackupError pentru nume invalide."""
+    if not name or not BACKUP_NAME.match(name) or COLD_BACKUP_NAME.search(name):
+        raise BackupError("Invalid backup name")
+    return os.path.join(backup_dir(), name)
+
+
+def list_backups():
+    directory = backup_dir()
+    if not os.path.isdir(directory):
+        return []
+    backups = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        path = os.path.join(directory, name)
+        if BACKUP_NAME.match(name) and not COLD_BACKUP_NAME.search(name) and os.path.isfile(path):
+            backup = {
+                'name': name,
+                'bytes': os.path.getsize(path),
+                'created_at': datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+            }
+            cold_path = cold_backup_path(path)
+            if os.path.isfile(cold_path):
+                backup['cold_bytes'] = os.path.getsize(cold_path)
+            backups.append(backup)
+    return backups
+
+
+def init_backup(app):
+    app.config.setdefault('CRM_BACKUP_DIR', os.path.join(os.path.dirname(db_path), 'backups'))
+    app.config.setdefault('CRM_BACKUP_PAGES_PER_STEP', 256)
+    app.config.setdefault('CRM_BACKUP_STEP_SLEEP_MS', 5)
+    app.config.setdefault('CRM_BACKUP_MAX_RESTARTS', 3)
+    app.config.setdefault('CRM_BACKUP_METHOD', 'backup')  # 'backup' (pași) sau 'vacuum'
+
+
+def register_backup_routes(bp):
+    """Register the admin backup/restore endpoints (require CRM_ADMIN_TOKEN)."""
+
+    @bp.route('/api/admin/backups', methods=['GET'])
+    @admin_required
+    def get_backups():
+        """Listează snapshot-urile din CRM_BACKUP_DIR."""
+        return jsonify(list_backups()), 200
+
+    @bp.route('/api/admin/backups', methods=['POST'])
+    @admin_required
+    def create_backup():
+        """Creează un snapshot comprimat al bazei, fără a bloca scrierile."""
+        try:
+            result = backup_database(backup_path(default_backup_name()))
+            result.pop('path')
+            return jsonify(result), 201
+        except BackupError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error creating backup: {str(e)}")
+            return jsonify({"error": "Failed to create backup"}), 500
+
+    @bp.route('/api/admin/restore', methods=['POST'])
+    @admin_required
+    def restore_backup():
+        """Restaurează baza dintr-un snapshot. Body: {"name": "crm-20250101-120000.db.gz"}."""
+        data = request.get_json(silent=True) or {}
+        try:
+            path = backup_path(data.get('name'))
+            if not os.path.exists(path):
+                return jsonify({"error": "Backup not found"}), 404
+            restore_database(path)
+            return jsonify({"message": f"Database restored from {data['name']}"}), 200
+        except BackupError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error restoring backup: {str(e)}")
+            return jsonify({"error": "Failed to restore backup"}), 500
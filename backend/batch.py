@@ -0,0 +1,168 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from flask import request, jsonify, current_app
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import RoutingException
+
+from backend.admission import HEAVY, STANDARD, view_cost
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = '/api/batch'
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+# Antete care nu au sens pentru sub-cereri (corpul și lungimea diferă)
+SKIPPED_HEADERS = {'content-length', 'content-type', 'transfer-encoding'}
+
+_executor = None
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config['CRM_BATCH_MAX_WORKERS'],
+            thread_name_prefix='crm-batch'
+        )
+    return _executor
+
+
+def validate_batch(payload, max_requests):
+    """Validează lista de sub-cereri. Ridică ValueError cu un mesaj pentru client."""
+    if not isinstance(payload, dict) or not isinstance(payload.get('requests'), list):
+        raise ValueError("Body must be an object with a 'requests' list")
+    sub_requests = payload['requests']
+    if not sub_requests:
+        raise ValueError("'requests' must not be empty")
+    if len(sub_requests) > max_requests:
+        raise ValueError(f"A batch can contain at most {max_requests} requests")
+
+    normalized = []
+    for index, sub in enumerate(sub_requests):
+        if not isinstance(sub, dict) or not isinstance(sub.get('path'), str):
+            raise ValueError(f"Request {index}: 'path' is required")
+        method = str(sub.get('method', 'GET')).upper()
+        path = sub['path']
+        if method not in ALLOWED_METHODS:
+            raise ValueError(f"Request {index}: unsupported method {method}")
+        if not path.startswith('/api/') or path.split('?')[0].rstrip('/') == BATCH_PATH:
+            raise ValueError(f"Request {index}: path must be an /api/ route other than {BATCH_PATH}")
+        normalized.append({'method': method, 'path': path, 'body': sub.get('body')})
+    return normalized
+
+
+def _forwarded_headers():
+    return [(key, value) for key, value in request.headers.items() if key.lower() not in SKIPPED_HEADERS]
+
+
+def dispatch_sub_request(app, sub, headers):
+    """Rulează o sub-cerere prin URL map-ul Flask, în procesul curent.
+
+    Contextul de request nou reutilizează contextul de aplicație activ, deci
+    toate sub-cererile secvențiale împart aceeași sesiune db.session (și
+    aceeași conexiune).
+    """
+    options = {'method': sub['method'], 'headers': headers}
+    if sub['body'] is not None:
+        options['json'] = sub['body']
+    try:
+        with app.test_request_context(sub['path'], **options):
+            response = app.full_dispatch_request()
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        return {'status': response.status_code, 'body': body}
+    except Exception as e:
+        logger.error(f"Error dispatching batch request {sub['method']} {sub['path']}: {str(e)}")
+        return {'status': 500, 'body': {"error": "Failed to process batch request"}}
+
+
+def sub_request_cost(app, sub):
+    """Clasa de cost (backend/admission.py) a handler-ului unei sub-cereri, fără s-o execute."""
+    path, _, query = sub['path'].partition('?')
+    try:
+        endpoint, _ = app.url_map.bind('localhost').match(path, method=sub['method'])
+    except (HTTPException, RoutingException):
+        return STANDARD
+    return view_cost(app.view_functions.get(endpoint), MultiDict(parse_qsl(query, keep_blank_values=True)))
+
+
+def _dispatch_in_own_context(app, subs, headers):
+    # Thread separat => context de aplicație propriu => sesiune proprie
+    with app.app_context():
+        return [dispatch_sub_request(app, sub, headers) for sub in subs]
+
+
+def dispatch_parallel(app, sub_requests, headers):
+    """Rulează sub-cererile GET pe thread pool.
+
+    Cu admission control activ, cererile 'heavy' sunt împărțite pe cel mult
+    CRM_ADMISSION_HEAVY_LIMIT thread-uri și rulează una după alta pe fiecare:
+    un batch nu cere mai multe permise decât are clasa, deci nu așteaptă după
+    el însuși și nu este respins cu 503 pentru că le-a cerut pe toate deodată.
+    """
+    heavy = []
+    groups = []
+    for index, sub in enumerate(sub_requests):
+        if 'crm_admission' in app.extensions and sub_request_cost(app, sub) == HEAVY:
+            heavy.append(index)
+        else:
+            groups.append([index])
+    lanes = max(1, app.config['CRM_ADMISSION_HEAVY_LIMIT'])
+    groups += [heavy[lane::lanes] for lane in range(min(lanes, len(heavy)))]
+
+    executor = _get_executor(app)
+    futures = [
+        (group, executor.submit(_dispatch_in_own_context, app, [sub_requests[i] for i in group], headers))
+        for group in groups
+    ]
+    responses = [None] * len(sub_requests)
+    for group, future in futures:
+        for index, response in zip(group, future.result()):
+            responses[index] = response
+    return responses
+
+
+def init_batch(app):
+    app.config.setdefault('CRM_BATCH_MAX_REQUESTS', 20)
+    app.config.setdefault('CRM_BATCH_MAX_WORKERS', 4)
+
+
+def reset_executor():
+    """Thread pool-ul nu supraviețuiește unui fork; workerii își creează unul nou."""
+    global _executor
+    _executor = None
+
+
+def register_batch_routes(bp):
+    """Register POST /api/batch."""
+
+    @bp.route(BATCH_PATH, methods=['POST'])
+    def batch_requests():
+        """Execută mai multe cereri API într-un singur round trip.
+
+        Body: {"requests": [{"method": "GET", "path": "/api/contacts", "body": null}, ...],
+               "parallel": false}
+        Cu "parallel": true și doar cereri GET, acestea rulează pe un thread pool
+        (cele 'heavy' pe cel mult CRM_ADMISSION_HEAVY_LIMIT thread-uri).
+        """
+        app_obj = current_app._get_current_object()
+        try:
+            payload = request.get_json(silent=True)
+            sub_requests = validate_batch(payload, app_obj.config['CRM_BATCH_MAX_REQUESTS'])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        headers = _forwarded_headers()
+        read_only = all(sub['method'] == 'GET' for sub in sub_requests)
+        try:
+            if payload.get('parallel') and read_only and len(sub_requests) > 1:
+                responses = dispatch_parallel(app_obj, sub_requests, headers)
+            else:
+                responses = [dispatch_sub_request(app_obj, sub, headers) for sub in sub_requests]
+            return jsonify({"responses": responses}), 200
+        except Exception as e:
+            logger.error(f"Error processing batch: {str(e)}")
+            return jsonify({"error": "Failed to process batch"}), 500
@@ -0,0 +1,316 @@
+import logging
+import time
+from datetime import date
+
+import click
+from flask.cli import AppGroup
+
+logger = logging.getLogger(__name__)
+
+# Grupul de comenzi `flask crm ...` pentru operațiuni de întreținere
+crm_cli = AppGroup('crm', help='CRM maintenance commands.')
+
+rollups_cli = AppGroup('rollups', help='Maintain the report rollup tables.')
+crm_cli.add_command(rollups_cli)
+
+interactions_cli = AppGroup('interactions', help='Interaction cold storage.')
+crm_cli.add_command(interactions_cli)
+
+tenants_cli = AppGroup('tenants', help='Multi-tenant databases.')
+crm_cli.add_command(tenants_cli)
+
+notifications_cli = AppGroup('notifications', help='Notification retention.')
+crm_cli.add_command(notifications_cli)
+
+funnel_cli = AppGroup('funnel', help='Sales stage history and funnel aggregates.')
+crm_cli.add_command(funnel_cli)
+
+companies_cli = AppGroup('companies', help='Company maintenance.')
+crm_cli.add_command(companies_cli)
+
+email_cli = AppGroup('email', help='Inbound email ingestion.')
+crm_cli.add_command(email_cli)
+
+outbox_cli = AppGroup('outbox', help='Outbox dispatcher and webhook deliveries.')
+crm_cli.add_command(outbox_cli)
+
+
+def _parse_day(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise click.BadParameter('expected a date in YYYY-MM-DD format')
+
+
+def _tenant_options(command):
+    """Opțiunile --tenant (repetabil) și --all-tenants, ca la `outbox dispatch`."""
+    command = click.option('--all-tenants', is_flag=True, help='Run on every tenant database.')(command)
+    return click.option('--tenant', 'tenants', multiple=True,
+                        help='Tenant database to run on instead of the default one (repeatable).')(command)
+
+
+def _each_database(tenants, all_tenants):
+    """Rulează corpul buclei o dată pe fiecare bază aleasă (implicit: baza implicită).
+
+    Dă prefixul mesajelor: "" pentru baza implicită, "<tenant>: " pentru un tenant.
+    """
+    from flask import current_app
+    from backend.tenancy import database_context
+    if all_tenants:
+        tenants = _tenant_engines().list_tenants(current_app.config['CRM_TENANTS'])
+    elif tenants:
+        engines = _tenant_engines()
+        for tenant in tenants:
+            if not engines.exists(tenant):
+                raise click.ClickException(f"Unknown tenant '{tenant}'; create it with `flask crm tenants create`.")
+    app = current_app._get_current_object()
+    for tenant in tenants or [None]:
+        with database_context(app, tenant):
+            yield f'{tenant}: ' if tenant else ''
+
+
+@rollups_cli.command('rebuild')
+@click.option('--start', callback=_parse_day, help='First day to rebuild (YYYY-MM-DD).')
+@click.option('--end', callback=_parse_day, help='Last day to rebuild (YYYY-MM-DD).')
+@_tenant_options
+def rollups_rebuild(start, end, tenants, all_tenants):
+    """Recompute interaction rollups from the Interaction table."""
+    from backend.rollups import rebuild_interaction_rollups
+    for prefix in _each_database(tenants, all_tenants):
+        rows = rebuild_interaction_rollups(start, end)
+        click.echo(f'{prefix}Rebuilt {rows} interaction rollup rows.')
+
+
+@rollups_cli.command('snapshot')
+@click.option('--day', callback=_parse_day, help='Day to record the snapshot under (default: today).')
+@_tenant_options
+def rollups_snapshot(day, tenants, all_tenants):
+    """Record today's task-status and sales-stage snapshots."""
+    from backend.rollups import take_snapshots
+    for prefix in _each_database(tenants, all_tenants):
+        take_snapshots(day)
+        click.echo(f'{prefix}Snapshots recorded.')
+
+
+@notifications_cli.command('prune')
+@click.option('--ttl-days', type=int, help='Archive read notifications older than this (default: CRM_NOTIFICATION_TTL_DAYS).')
+@click.option('--max-per-target', type=int, help='Keep at most this many read notifications per contact and per company (default: CRM_NOTIFICATION_MAX_PER_TARGET).')
+@_tenant_options
+def notifications_prune(ttl_days, max_per_target, tenants, all_tenants):
+    """Move expired and over-limit notifications to the archive table."""
+    from backend.retention import prune_notifications
+    for prefix in _each_database(tenants, all_tenants):
+        result = prune_notifications(ttl_days=ttl_days, max_per_target=max_per_target)
+        click.echo(f"{prefix}Archived {result['expired']} expired and {result['over_limit']} over-limit notifications.")
+
+
+@funnel_cli.command('rebuild')
+@click.option('--backfill/--no-backfill', default=True,
+              help='First record the current stage of contacts that have no stage history.')
+@_tenant_options
+def funnel_rebuild(backfill, tenants, all_tenants):
+    """Rebuild the funnel aggregates from the stage transition history."""
+    from backend.funnel import backfill_stage_history, rebuild_funnel_rollups
+    for prefix in _each_database(tenants, all_tenants):
+        if backfill:
+            click.echo(f"{prefix}Recorded the initial stage of {backfill_stage_history()} contacts.")
+        click.echo(f"{prefix}Rebuilt {rebuild_funnel_rollups()} funnel rollup rows.")
+
+
+@companies_cli.command('recount')
+@_tenant_options
+def companies_recount(tenants, all_tenants):
+    """Recompute contacts_count for every company (backfill after upgrading)."""
+    from backend.companycounts import recount_contacts
+    for prefix in _each_database(tenants, all_tenants):
+        click.echo(f"{prefix}Corrected contacts_count of {recount_contacts()} companies.")
+
+
+@companies_cli.command('check')
+@click.option('--limit', type=int, default=20, show_default=True, help='Mismatches to list.')
+@_tenant_options
+def companies_check(limit, tenants, all_tenants):
+    """Compare contacts_count with the actual number of contacts; exits with 1 on mismatches."""
+    from backend.companycounts import find_count_mismatches
+    inconsistent = False
+    for prefix in _each_database(tenants, all_tenants):
+        mismatches = find_count_mismatches()
+        for company_id, stored, actual in mismatches[:limit]:
+            click.echo(f"{prefix}company {company_id}: contacts_count={stored}, actual={actual}")
+        if mismatches:
+            click.echo(f"{prefix}{len(mismatches)} companies have a wrong contacts_count; "
+                       f"run `flask crm companies recount`.")
+            inconsistent = True
+        else:
+            click.echo(f"{prefix}All contacts_count values are consistent.")
+    if inconsistent:
+        raise SystemExit(1)
+
+
+@email_cli.command('backfill')
+@click.option('--all', 'all_rows', is_flag=True, help='Recompute every contact, not only those without a value.')
+@_tenant_options
+def email_backfill(all_rows, tenants, all_tenants):
+    """Fill contact.email_normalized for existing contacts."""
+    from backend.inbound import backfill_normalized_emails
+    for prefix in _each_database(tenants, all_tenants):
+        click.echo(f"{prefix}Normalized the email of {backfill_normalized_emails(all_rows=all_rows)} contacts.")
+
+
+@email_cli.command('ingest')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(('auto', 'mbox', 'eml', 'ndjson')), default='auto',
+              show_default=True, help='Input format; auto uses the file extension (.eml, .ndjson/.jsonl, else mbox).')
+@click.option('--chunk-size', type=int, help='Messages per transaction (default: CRM_INGEST_CHUNK_SIZE).')
+@click.option('--tenant', help='Tenant database to write to (multi-tenant mode).')
+def email_ingest(paths, fmt, chunk_size, tenant):
+    """Log emails from mbox, EML or NDJSON files as 'Email' interactions of their senders."""
+    from itertools import chain
+    from backend.inbound import read_messages, guess_format, ingest_messages
+    _select_tenant(tenant)
+    messages = chain.from_iterable(
+        read_messages(path, guess_format(path) if fmt == 'auto' else fmt) for path in paths
+    )
+    started = time.perf_counter()
+    stats = ingest_messages(messages, chunk_size=chunk_size, commit=True)
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    click.echo(f"Read {stats['received']} messages: {stats['ingested']} logged, "
+               f"{stats['unmatched']} without a matching contact ({stats['received'] / elapsed:.0f} msg/s).")
+
+
+@outbox_cli.command('dispatch')
+@click.option('--once', is_flag=True, help='Drain the outbox and due webhook deliveries, then exit.')
+@click.option('--tenant', 'tenants', multiple=True, help='Tenant database to drain (repeatable).')
+@click.option('--all-tenants', is_flag=True, help='Drain every tenant database.')
+def outbox_dispatch(once, tenants, all_tenants):
+    """Run the outbox dispatcher in this process (for CRM_OUTBOX_DISPATCHER=external)."""
+    from flask import current_app
+    dispatcher = current_app.extensions.get('crm_outbox')
+    if dispatcher is None:
+        raise click.ClickException("The outbox is disabled (CRM_OUTBOX=false).")
+    if all_tenants:
+        tenants = _tenant_engines().list_tenants(current_app.config['CRM_TENANTS'])
+    elif tenants:
+        _tenant_engines()
+    interval = current_app.config['CRM_OUTBOX_POLL_INTERVAL_MS'] / 1000.0
+    while True:
+        for tenant in tenants or [None]:
+            stats = dispatcher.run_once(tenant)
+            if once or stats['events'] or stats['deliveries']:
+                click.echo(f"{tenant or 'default'}: dispatched {stats['events']} events, "
+                           f"attempted {stats['deliveries']} webhook deliveries.")
+        if once:
+            return
+        time.sleep(interval)
+
+
+@outbox_cli.command('prune')
+@click.option('--days', type=int, default=7, show_default=True,
+              help='Delete dispatched events and finished deliveries older than this.')
+@_tenant_options
+def outbox_prune(days, tenants, all_tenants):
+    """Delete old dispatched outbox events and finished webhook deliveries."""
+    from backend.outbox import prune_outbox
+    for prefix in _each_database(tenants, all_tenants):
+        result = prune_outbox(days)
+        click.echo(f"{prefix}Deleted {result['events']} outbox events and {result['deliveries']} webhook deliveries.")
+
+
+@interactions_cli.command('archive')
+@click.option('--older-than-days', type=int, help='Move interactions older than this (default: CRM_HOT_INTERACTION_DAYS).')
+@click.option('--batch-size', type=int, help='Rows moved per transaction (default: CRM_COLD_MOVE_BATCH).')
+def interactions_archive(older_than_days, batch_size):
+    """Move old interactions of the default database to the cold storage database."""
+    from datetime import datetime, timedelta
+    from flask import current_app
+    from backend.coldstorage import ColdStorageError, move_to_cold
+    if 'crm_cold_storage' not in current_app.extensions:
+        raise click.ClickException('Cold storage is disabled; set FLASK_CRM_COLD_STORAGE=true.')
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days) if older_than_days is not None else None
+    try:
+        moved = move_to_cold(cutoff=cutoff, batch_size=batch_size)
+    except ColdStorageError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Moved {moved} interactions to cold storage.')
+
+
+def _tenant_engines():
+    from flask import current_app
+    tenants = current_app.extensions.get('crm_tenants')
+    if tenants is None:
+        raise click.ClickException('Multi-tenant mode is disabled; set FLASK_CRM_TENANCY=true.')
+    return tenants
+
+
+@tenants_cli.command('list')
+def tenants_list():
+    """List the known tenants."""
+    from flask import current_app
+    for tenant in _tenant_engines().list_tenants(current_app.config['CRM_TENANTS']):
+        click.echo(tenant)
+
+
+@tenants_cli.command('create')
+@click.argument('name')
+def tenants_create(name):
+    """Create the database schema for a new tenant."""
+    import os
+    from backend.app import db
+    from backend.tenancy import TENANT_NAME
+    if not TENANT_NAME.match(name):
+        raise click.BadParameter('use lowercase letters, digits, "-" and "_"', param_hint='NAME')
+    tenants = _tenant_engines()
+    path = tenants.sqlite_path(name)
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    db.metadata.create_all(tenants.engine_for(name))
+    click.echo(f"Tenant '{name}' created. Later schema changes: flask db upgrade -x tenant={name}")
+
+
+def _select_tenant(tenant):
+    if tenant:
+        from flask import g
+        _tenant_engines()
+        g.db_tenant = tenant
+
+
+@crm_cli.command('backup')
+@click.argument('path', required=False)
+@click.option('--tenant', help='Back up this tenant database instead of the default one.')
+@click.option('--pages', type=int, help='Pages copied per step (default: CRM_BACKUP_PAGES_PER_STEP).')
+@click.option('--sleep-ms', type=int, help='Pause between steps so writers can proceed (default: CRM_BACKUP_STEP_SLEEP_MS).')
+@click.option('--method', type=click.Choice(['backup', 'vacuum']), help='Online backup API in steps, or VACUUM INTO.')
+@click.option('--no-compress', is_flag=True, help='Write a plain .db file instead of gzip.')
+def crm_backup(path, tenant, pages, sleep_ms, method, no_compress):
+    """Write an online snapshot of the database (default: CRM_BACKUP_DIR/crm-<timestamp>.db.gz)."""
+    from backend.backup import BackupError, backup_database, backup_path, default_backup_name
+    _select_tenant(tenant)
+    try:
+        if path is None:
+            name = default_backup_name()
+            path = backup_path(name[:-len('.gz')] if no_compress else name)
+        result = backup_database(path, compress=not no_compress, pages=pages, sleep_ms=sleep_ms, method=method)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Backup written to {result['path']} ({result['bytes']} bytes, {result['method']}, "
+               f"{result['restarts']} restarts, {result['seconds']}s)")
+    if 'cold_bytes' in result:
+        from backend.backup import cold_backup_path
+        click.echo(f"Cold storage written to {cold_backup_path(result['path'])} ({result['cold_bytes']} bytes)")
+
+
+@crm_cli.command('restore')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--tenant', help='Restore into this tenant database instead of the default one.')
+@click.confirmation_option(prompt='This replaces the current database contents. Continue?')
+def crm_restore(path, tenant):
+    """Replace the database contents with a snapshot written by `flask crm backup`."""
+    from backend.backup import BackupError, restore_database
+    _select_tenant(tenant)
+    try:
+        restore_database(path)
+    except BackupError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Database restored from {path}")
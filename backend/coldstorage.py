@@ -0,0 +1,374 @@
+"""Cold storage pentru interacțiunile istorice.
+
+Interacțiunile mai vechi de CRM_HOT_INTERACTION_DAYS sunt mutate în loturi
+într-un fișier SQLite separat, atașat (ATTACH ... AS cold) la fiecare conexiune
+nouă a engine-ului principal. Tabela `interaction` și indexurile ei rămân mici,
+iar citirile care au nevoie de istoric (interval de date mai vechi decât cel
+mai nou rând din cold, timeline care ajunge la capăt) fac UNION ALL cu
+`cold.interaction`.
+
+Mutarea folosește Core (INSERT ... SELECT + DELETE), deci nu declanșează
+evenimentele ORM: rollup-urile rămân neschimbate, fiindcă interacțiunile
+există în continuare, doar în alt segment.
+"""
+import logging
+import os
+from datetime import datetime, timedelta
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, Text, DateTime, Index,
+    event, select, func, union_all, literal_column, or_
+)
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+from backend.app import db, db_path
+from backend.models import Contact, Company, Interaction, InteractionDailyRollup
+
+logger = logging.getLogger(__name__)
+
+COLD_SCHEMA = 'cold'
+INTERACTION_COLUMNS = ('id', 'interaction_type', 'notes', 'interaction_date', 'contact_id', 'company_id')
+
+cold_metadata = MetaData()
+
+# Aceleași coloane ca Interaction, fără chei străine (alt fișier SQLite)
+cold_interaction = Table(
+    'interaction', cold_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('interaction_type', String(50), nullable=False),
+    Column('notes', Text, nullable=True),
+    Column('interaction_date', DateTime, nullable=True),
+    Column('contact_id', Integer, nullable=True),
+    Column('company_id', Integer, nullable=True),
+    Column('moved_at', DateTime, nullable=True),
+    Index('ix_cold_interaction_interaction_date', 'interaction_date'),
+    Index('ix_cold_interaction_contact_id_interaction_date', 'contact_id', 'interaction_date'),
+    Index('ix_cold_interaction_company_id_interaction_date', 'company_id', 'interaction_date'),
+    schema=COLD_SCHEMA
+)
+
+_listeners_installed = False
+
+
+def default_cold_path():
+    root, _ = os.path.splitext(db_path)
+    return f"{root}_cold.db"
+
+
+def cold_enabled():
+    # Cold storage este atașat doar bazei implicite, nu bazelor de tenant
+    return has_app_context() and 'crm_cold_storage' in current_app.extensions and not g.get('db_tenant')
+
+
+def install_cold_attach(engine, path):
+    """La fiecare conexiune nouă a engine-ului: ATTACH fișierul cold și creează schema dacă lipsește."""
+    ddl = [str(CreateTable(cold_interaction, if_not_exists=True).compile(dialect=engine.dialect))]
+    ddl += [str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            for index in cold_interaction.indexes]
+
+    @event.listens_for(engine, 'connect')
+    def attach_cold(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"ATTACH DATABASE ? AS {COLD_SCHEMA}", (path,))
+            for statement in ddl:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+# ---------- Reading ----------
+
+def _session_and_bind(session):
+    """Cold este atașat doar pe engine-ul principal: citirile cu cold ocolesc replicile."""
+    if session is not None:
+        return session, {}
+    return db.session, {'bind_arguments': {'bind': db.engine}}
+
+
+def cold_boundary(session=None):
+    """Cea mai nouă dată din cold (căutare în index) sau None dacă cold e gol/dezactivat."""
+    if not cold_enabled():
+        return None
+    session, options = _session_and_bind(session)
+    return _as_datetime(session.execute(select(func.max(cold_interaction.c.interaction_date)), **options).scalar())
+
+
+def needs_cold(start=None, session=None):
+    """Un interval care începe la `start` (None = tot istoricul) atinge segmentul cold?"""
+    boundary = cold_boundary(session)
+    return boundary is not None and (start is None or start <= boundary)
+
+
+_COUNT_HOT = select(func.count()).select_from(Interaction.__table__)
+
+
+def count_interactions(session=None):
+    """Numărul total de interacțiuni, din ambele segmente."""
+    count = (session or db.session).execute(_COUNT_HOT).scalar()
+    if cold_enabled():
+        session, options = _session_and_bind(session)
+        count += session.execute(select(func.count()).select_from(cold_interaction), **options).scalar()
+    return count
+
+
+def interaction_source(include_cold):
+    """Tabela interaction sau UNION ALL între segmentul hot și cel cold (aceleași coloane)."""
+    hot = Interaction.__table__
+    if not include_cold:
+        return hot
+    return union_all(
+        select(*[hot.c[name] for name in INTERACTION_COLUMNS]),
+        select(*[cold_interaction.c[name] for name in INTERACTION_COLUMNS])
+    ).subquery('all_interactions')
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _row_to_dict(row):
+    """Același format ca Interaction.to_dict(), pentru rânduri din hot sau cold."""
+    interaction_date = _as_datetime(row.interaction_date)
+    return {
+        'id': row.id,
+        'interaction_type': row.interaction_type,
+        'notes': row.notes,
+        'interaction_date': interaction_date.isoformat() if interaction_date else None,
+        'contact_id': row.contact_id,
+        'company_id': row.company_id,
+        'contact': {'id': row.contact_id, 'name': row.contact_name, 'email': row.contact_email}
+        if row.contact_name is not None else None,
+        'company': {'id': row.company_id, 'name': row.company_name} if row.company_name is not None else None
+    }
+
+
+def parse_interaction_filters(args):
+    """?start=&end= (YYYY-MM-DD sau ISO datetime, `end` inclusiv), ?contact_id=, ?company_id=.
+
+    Ridică ValueError pentru valori invalide.
+    """
+    def parse_bound(name, is_end):
+        value = args.get(name)
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid date format for {name}")
+        # O dată fără oră ca `end` include toată ziua respectivă
+        return parsed + timedelta(days=1) if is_end and len(value) == 10 else parsed
+
+    def parse_id(name):
+        value = args.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+
+    return {
+        'start': parse_bound('start', False),
+        'end': parse_bound('end', True),
+        'contact_id': parse_id('contact_id'),
+        'company_id': parse_id('company_id'),
+    }
+
+
+def fetch_interactions(start=None, end=None, contact_id=None, company_id=None, session=None):
+    """Interacțiunile din intervalul [start, end), cele mai recente primele.
+
+    Segmentul cold este citit doar dacă intervalul cerut începe înainte de
+    cea mai nouă interacțiune mutată acolo.
+    """
+    include_cold = needs_cold(start, session)
+    source = interaction_source(include_cold)
+    stmt = select(
+        *[source.c[name] for name in INTERACTION_COLUMNS],
+        Contact.name.label('contact_name'), Contact.email.label('contact_email'),
+        Company.name.label('company_name')
+    ).select_from(source) \
+        .outerjoin(Contact, Contact.id == source.c.contact_id) \
+        .outerjoin(Company, Company.id == source.c.company_id)
+    if start:
+        stmt = stmt.where(source.c.interaction_date >= start)
+    if end:
+        stmt = stmt.where(source.c.interaction_date < end)
+    if contact_id:
+        stmt = stmt.where(source.c.contact_id == contact_id)
+    if company_id:
+        stmt = stmt.where(source.c.company_id == company_id)
+    stmt = stmt.order_by(source.c.interaction_date.desc(), source.c.id.desc())
+
+    if include_cold:
+        session, options = _session_and_bind(session)
+    else:
+        session, options = session or db.session, {}
+    return [_row_to_dict(row) for row in session.execute(stmt, **options).all()]
+
+
+# ---------- Moving and deleting ----------
+
+class ColdStorageError(Exception):
+    pass
+
+
+def _bump_id_sequence(connection):
+    """sqlite_sequence pentru `interaction` cel puțin cât cel mai mare ID din cold.
+
+    Acoperă bazele la care tabela a fost reconstruită cu AUTOINCREMENT după ce
+    ID-uri din cold au fost deja refolosite în hot.
+    """
+    max_cold = connection.execute(select(func.max(cold_interaction.c.id))).scalar()
+    if max_cold is None:
+        return
+    updated = connection.exec_driver_sql(
+        "UPDATE sqlite_sequence SET seq = ? WHERE name = 'interaction' AND seq < ?", (max_cold, max_cold)
+    ).rowcount
+    if not updated and connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_sequence WHERE name = 'interaction'").first() is None:
+        connection.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES ('interaction', ?)", (max_cold,))
+
+
+def _uses_autoincrement(connection):
+    sql = connection.exec_driver_sql(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'interaction'"
+    ).scalar()
+    return bool(sql) and 'AUTOINCREMENT' in sql.upper()
+
+
+def move_to_cold(cutoff=None, batch_size=None):
+    """Mută în cold interacțiunile mai vechi de `cutoff`, în tranzacții de câte `batch_size` rânduri.
+
+    ID-urile rămân unice între segmente fiindcă tabela `interaction` folosește
+    AUTOINCREMENT. Un rând deja prezent în cold cu același conținut (o mutare
+    întreruptă între cele două fișiere) este doar șters din hot; un rând diferit
+    cu același ID oprește mutarea cu ColdStorageError, fără să suprascrie nimic.
+    Returnează numărul de rânduri mutate.
+    """
+    config = current_app.config
+    cutoff = cutoff or datetime.utcnow() - timedelta(days=config['CRM_HOT_INTERACTION_DAYS'])
+    batch_size = batch_size or config['CRM_COLD_MOVE_BATCH']
+    hot = Interaction.__table__
+    already_cold = select(cold_interaction.c.id)
+    columns = [hot.c[name] for name in INTERACTION_COLUMNS]
+
+    moved = 0
+    with db.engine.connect() as connection:
+        with connection.begin():
+            if not _uses_autoincrement(connection):
+                raise ColdStorageError(
+                    "The interaction table must use AUTOINCREMENT before interactions are moved to cold storage "
+                    "(rebuild it with a migration; see README)"
+                )
+            _bump_id_sequence(connection)
+        while True:
+            with connection.begin():
+                ids = connection.execute(
+                    select(hot.c.id)
+                    .where(hot.c.interaction_date < cutoff)
+                    .order_by(hot.c.interaction_date)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                conflicts = connection.execute(
+                    select(hot.c.id)
+                    .join(cold_interaction, cold_interaction.c.id == hot.c.id)
+                    .where(hot.c.id.in_(ids))
+                    .where(or_(*[
+                        cold_interaction.c[name].isnot(hot.c[name])
+                        for name in INTERACTION_COLUMNS if name != 'id'
+                    ]))
+                ).scalars().all()
+                if conflicts:
+                    raise ColdStorageError(f"Interaction ids already used in cold storage: {conflicts[:10]}")
+                connection.execute(
+                    cold_interaction.insert().from_select(
+                        [*INTERACTION_COLUMNS, 'moved_at'],
+                        select(*columns, literal_column('CURRENT_TIMESTAMP'))
+                        .where(hot.c.id.in_(ids), hot.c.id.not_in(already_cold))
+                    )
+                )
+                connection.execute(hot.delete().where(hot.c.id.in_(ids)))
+            moved += len(ids)
+    if moved:
+        logger.info(f"Moved {moved} interactions older than {cutoff.isoformat()} to cold storage")
+    return moved
+
+
+def _purge_cold_rows(connection, condition):
+    """Șterge rânduri din cold și scade din rollup-uri (Core, deci fără evenimentele ORM)."""
+    if current_app.config.get('CRM_ROLLUP_MODE', 'incremental') == 'incremental':
+        from backend.rollups import apply_count_deltas
+        day = func.date(cold_interaction.c.interaction_date)
+        company = func.coalesce(cold_interaction.c.company_id, 0)
+        rows = connection.execute(
+            select(day, cold_interaction.c.interaction_type, company, func.count())
+            .where(condition, cold_interaction.c.interaction_date.isnot(None))
+            .group_by(day, cold_interaction.c.interaction_type, company)
+        ).all()
+        deltas = {
+            (datetime.fromisoformat(str(d)).date(), interaction_type, company_id): -count
+            for d, interaction_type, company_id, count in rows
+        }
+        apply_count_deltas(connection, InteractionDailyRollup, ('day', 'interaction_type', 'company_id'), deltas)
+    return connection.execute(cold_interaction.delete().where(condition)).rowcount
+
+
+def delete_cold_interaction(interaction_id):
+    """Șterge o interacțiune din cold în tranzacția curentă. Returnează True dacă a existat."""
+    if not cold_enabled():
+        return False
+    connection = db.session.connection(bind_arguments={'bind': db.engine})
+    return _purge_cold_rows(connection, cold_interaction.c.id == interaction_id) > 0
+
+
+def reassign_cold_contacts(old_ids, new_id):
+    """Mută interacțiunile cold ale contactelor `old_ids` pe `new_id` (merge de duplicate)."""
+    if not cold_enabled():
+        return 0
+    connection = db.session.connection(bind_arguments={'bind': db.engine})
+    return connection.execute(
+        cold_interaction.update().where(cold_interaction.c.contact_id.in_(old_ids)).values(contact_id=new_id)
+    ).rowcount
+
+
+def _on_contact_delete(mapper, connection, target):
+    # Interacțiunile hot sunt șterse de cascade-ul ORM; cele cold le ștergem aici
+    if cold_enabled():
+        _purge_cold_rows(connection, cold_interaction.c.contact_id == target.id)
+
+
+def _on_company_delete(mapper, connection, target):
+    if cold_enabled():
+        _purge_cold_rows(connection, cold_interaction.c.company_id == target.id)
+
+
+def init_cold_storage(app):
+    app.config.setdefault('CRM_COLD_STORAGE', False)
+    app.config.setdefault('CRM_COLD_STORAGE_PATH', default_cold_path())
+    app.config.setdefault('CRM_HOT_INTERACTION_DAYS', 90)
+    app.config.setdefault('CRM_COLD_MOVE_BATCH', 1000)
+    if not app.config['CRM_COLD_STORAGE']:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        logger.warning("CRM_COLD_STORAGE is only supported on SQLite; cold storage disabled")
+        return
+
+    install_cold_attach(engine, app.config['CRM_COLD_STORAGE_PATH'])
+    app.extensions['crm_cold_storage'] = app.config['CRM_COLD_STORAGE_PATH']
+
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Contact, 'before_delete', _on_contact_delete)
+        event.listen(Company, 'before_delete', _on_company_delete)
+        _listeners_installed = True
+    logger.debug(f"Cold storage attached from {app.config['CRM_COLD_STORAGE_PATH']}")
@@ -0,0 +1,166 @@
+"""Company.contacts_count: numărul de contacte al fiecărei companii, ca o coloană.
+
+Contorul este actualizat în aceeași tranzacție cu scrierea care îl schimbă:
+- scrierile ORM (creare, ștergere, mutarea contactului la altă companie) prin
+  evenimentele de flush de mai jos;
+- PATCH-ul cu un singur UPDATE prin hook-ul de istoric din backend/updates.py;
+- căile bulk care scriu direct cu Core (ex: merge-ul de duplicate) apelând
+  apply_company_count_deltas.
+
+`flask crm companies recount` recalculează toate contoarele (backfill) și
+`flask crm companies check` raportează diferențele.
+"""
+import logging
+from collections import Counter
+
+from sqlalchemy import event, select, update, func, bindparam, inspect
+from sqlalchemy.orm import Session, object_session
+
+from backend.app import db
+from backend.models import Company, Contact
+
+logger = logging.getLogger(__name__)
+
+_listeners_installed = False
+
+
+def apply_company_count_deltas(connection, deltas):
+    """Adaugă delta-urile {company_id: delta} la Company.contacts_count.
+
+    Nu modifică `version` și `updated_at`: contorul nu este editat de client,
+    deci nu trebuie să invalideze un If-Match pe companie.
+    """
+    rows = [{'company_id': company_id, 'delta': delta} for company_id, delta in deltas.items()
+            if company_id is not None and delta]
+    if not rows:
+        return
+    table = Company.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == bindparam('company_id'))
+        .values(contacts_count=table.c.contacts_count + bindparam('delta'),
+                version=table.c.version, updated_at=table.c.updated_at),
+        rows
+    )
+
+
+def _pending_deltas(target):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault('company_count_deltas', Counter())
+
+
+def _on_contact_insert(mapper, connection, target):
+    deltas = _pending_deltas(target)
+    if deltas is not None and target.company_id is not None:
+        deltas[target.company_id] += 1
+
+
+def _on_contact_update(mapper, connection, target):
+    deltas = _pending_deltas(target)
+    if deltas is None:
+        return
+    history = inspect(target).attrs.company_id.load_history()
+    if history.has_changes():
+        old = history.deleted[0] if history.deleted else None
+        if old != target.company_id:
+            deltas[old] -= 1
+            deltas[target.company_id] += 1
+
+
+def _on_contact_delete(mapper, connection, target):
+    deltas = _pending_deltas(target)
+    if deltas is None:
+        return
+    history = inspect(target).attrs.company_id.history
+    company_id = history.deleted[0] if history.deleted else target.company_id
+    if company_id is not None:
+        deltas[company_id] -= 1
+
+
+def _on_after_flush(session, flush_context):
+    deltas = session.info.pop('company_count_deltas', None)
+    if deltas:
+        apply_company_count_deltas(session.connection(), deltas)
+        session.info.setdefault('company_count_stale', set()).update(deltas)
+
+
+def _on_after_flush_postexec(session, flush_context):
+    # Instanțele Company din sesiune au acum un contor vechi: îl recitim la nevoie
+    for company_id in session.info.pop('company_count_stale', ()):
+        if company_id is None:
+            continue
+        company = session.identity_map.get(Session.identity_key(Company, company_id))
+        if company is not None:
+            session.expire(company, ['contacts_count'])
+
+
+def record_patch_company_change(connection, row, old_company_id):
+    """Hook pentru PATCH (backend/updates.py): contactul a trecut la altă companie."""
+    apply_company_count_deltas(connection, Counter({old_company_id: -1, row.company_id: 1}))
+
+
+def install_company_count_listeners():
+    """Register the ORM events that keep Company.contacts_count up to date."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Contact, 'after_insert', _on_contact_insert)
+    event.listen(Contact, 'after_update', _on_contact_update)
+    event.listen(Contact, 'after_delete', _on_contact_delete)
+    event.listen(db.session, 'after_flush', _on_after_flush)
+    event.listen(db.session, 'after_flush_postexec', _on_after_flush_postexec)
+    _listeners_installed = True
+
+
+# ---------- Backfill / verificare ----------
+
+def _actual_counts():
+    contact = Contact.__table__
+    return (
+        select(contact.c.company_id, func.count().label('actual'))
+        .where(contact.c.company_id.isnot(None))
+        .group_by(contact.c.company_id)
+        .subquery()
+    )
+
+
+def find_count_mismatches(limit=None):
+    """Companiile al căror contor diferă de numărul real de contacte: [(id, stocat, real)]."""
+    company = Company.__table__
+    actual = _actual_counts()
+    real = func.coalesce(actual.c.actual, 0)
+    stmt = (
+        select(company.c.id, company.c.contacts_count, real)
+        .outerjoin(actual, actual.c.company_id == company.c.id)
+        .where(company.c.contacts_count != real)
+        .order_by(company.c.id)
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    return [tuple(row) for row in db.session.execute(stmt)]
+
+
+def recount_contacts():
+    """Recalculează contacts_count pentru toate companiile. Returnează câte rânduri au fost corectate."""
+    company = Company.__table__
+    contact = Contact.__table__
+    real = (
+        select(func.count()).select_from(contact)
+        .where(contact.c.company_id == company.c.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(company)
+        .where(company.c.contacts_count != real)
+        .values(contacts_count=real, version=company.c.version, updated_at=company.c.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    logger.info(f"Recounted contacts for {result.rowcount} companies")
+    return result.rowcount
+
+
+def init_company_counts(app):
+    install_company_count_listeners()
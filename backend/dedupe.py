@@ -0,0 +1,341 @@
+"""Detectarea și unificarea contactelor duplicate.
+
+Comparația tuturor perechilor este O(n²); în schimb fiecare contact primește
+câteva chei de blocare (blocking keys) și sunt comparate doar contactele care
+au cel puțin o cheie comună:
+
+- email normalizat (litere mici, fără +eticheta, fără punctele din Gmail);
+- ultimele 9 cifre ale telefonului (ignoră prefixul de țară/0 inițial);
+- benzi MinHash peste trigramele numelui normalizat: nume cu trigrame
+  comune ajung, cu probabilitate mare, în aceeași bandă.
+
+Blocurile mai mari decât CRM_DEDUPE_MAX_BLOCK_SIZE (ex: un număr de telefon
+folosit de o centrală) sunt ignorate pentru a păstra costul liniar.
+"""
+import logging
+import random
+import re
+import unicodedata
+import zlib
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from flask import request, jsonify, current_app
+from sqlalchemy import select, update, delete, insert, and_, literal
+
+from backend.app import db
+from backend.coldstorage import reassign_cold_contacts
+from backend.companycounts import apply_company_count_deltas
+from backend.models import (
+    Contact, Interaction, Task, Notification, NotificationArchive, SalesStageTransition, meeting_attendees
+)
+from backend.admission import cost_class, HEAVY
+from backend.outbox import emit_events, outbox_enabled
+from backend.routing import read_only
+from backend.writequeue import run_write, WriteTimeout, write_timeout_response
+
+logger = logging.getLogger(__name__)
+
+PHONE_KEY_DIGITS = 9
+MIN_PHONE_DIGITS = 7
+NAME_BANDS = 4
+NAME_ROWS_PER_BAND = 2
+GMAIL_DOMAINS = ('gmail.com', 'googlemail.com')
+# Câmpurile completate pe contactul păstrat dacă lipsesc, din duplicate
+FILLABLE_FIELDS = ('phone', 'company_id', 'sales_stage')
+
+_MINHASH_MASKS = [random.Random(seed).getrandbits(32) for seed in range(NAME_BANDS * NAME_ROWS_PER_BAND)]
+_NON_ALNUM = re.compile(r'[^a-z0-9 ]+')
+_NON_DIGIT = re.compile(r'\D+')
+
+
+class MergeError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# ---------- Normalization ----------
+
+def normalize_email(email):
+    email = (email or '').strip().lower()
+    local, at, domain = email.rpartition('@')
+    if not at or not local:
+        return email or None
+    local = local.split('+', 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local, domain = local.replace('.', ''), 'gmail.com'
+    return f"{local}@{domain}"
+
+
+def normalize_phone(phone):
+    """Ultimele PHONE_KEY_DIGITS cifre, sau None pentru numere prea scurte."""
+    digits = _NON_DIGIT.sub('', phone or '')
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def normalize_name(name):
+    """Fără diacritice și punctuație, cu cuvintele sortate ("Popescu, Ion" == "ion popescu")."""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode().lower()
+    return ' '.join(sorted(_NON_ALNUM.sub(' ', text).split()))
+
+
+def name_trigrams(normalized_name):
+    padded = f"  {normalized_name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_similarity(a, b):
+    """Similaritate Jaccard între mulțimile de trigrame."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _minhash_bands(trigrams):
+    if not trigrams:
+        return []
+    # Fiecare trigramă este hash-uită o singură dată; cele k funcții MinHash
+    # sunt permutări (XOR cu o mască fixă) ale acestui hash
+    hashes = [zlib.crc32(gram.encode()) for gram in trigrams]
+    signature = [min(map(mask.__xor__, hashes)) for mask in _MINHASH_MASKS]
+    return [
+        ('n', band, tuple(signature[band * NAME_ROWS_PER_BAND:(band + 1) * NAME_ROWS_PER_BAND]))
+        for band in range(NAME_BANDS)
+    ]
+
+
+class ContactKey:
+    """Forma normalizată a unui contact, folosită la blocare și la scor."""
+    __slots__ = ('id', 'email', 'phone', 'trigrams', 'company_id')
+
+    def __init__(self, contact_id, name, email, phone, company_id):
+        self.id = contact_id
+        self.email = normalize_email(email)
+        self.phone = normalize_phone(phone)
+        self.trigrams = name_trigrams(normalize_name(name))
+        self.company_id = company_id
+
+    def blocking_keys(self):
+        keys = _minhash_bands(self.trigrams)
+        if self.email:
+            keys.append(('e', self.email))
+        if self.phone:
+            keys.append(('p', self.phone))
+        return keys
+
+
+def score_pair(a, b):
+    """Returnează (scor în [0, 1], motive)."""
+    reasons = []
+    similarity = name_similarity(a.trigrams, b.trigrams)
+    score = similarity
+    if a.company_id and b.company_id and a.company_id != b.company_id:
+        score *= 0.85
+    if a.email and a.email == b.email:
+        reasons.append('email')
+        score = 1.0
+    if a.phone and a.phone == b.phone:
+        reasons.append('phone')
+        score = max(score, 0.6 + 0.4 * similarity)
+    if similarity >= 0.5:
+        reasons.append('name')
+    return round(score, 3), reasons
+
+
+# ---------- Detection ----------
+
+def find_duplicate_groups(min_score=None, max_block_size=None, session=None):
+    """Grupurile de contacte probabil duplicate, cele mai sigure primele.
+
+    Perechile cu scor >= `min_score` sunt unite (union-find) în grupuri;
+    scorul unui grup este cel mai mic scor dintre perechile care l-au format.
+    """
+    config = current_app.config
+    min_score = config['CRM_DEDUPE_MIN_SCORE'] if min_score is None else min_score
+    max_block_size = max_block_size or config['CRM_DEDUPE_MAX_BLOCK_SIZE']
+    session = session or db.session
+
+    keys = {}
+    blocks = defaultdict(list)
+    rows = session.execute(select(Contact.id, Contact.name, Contact.email, Contact.phone, Contact.company_id))
+    for row in rows:
+        key = ContactKey(*row)
+        keys[key.id] = key
+        for blocking_key in key.blocking_keys():
+            blocks[blocking_key].append(key.id)
+
+    candidates = set()
+    skipped = 0
+    for ids in blocks.values():
+        if len(ids) > max_block_size:
+            skipped += 1
+            continue
+        candidates.update(combinations(ids, 2))
+    if skipped:
+        logger.debug(f"Dedupe skipped {skipped} blocks larger than {max_block_size}")
+
+    parent = {}
+
+    def find(contact_id):
+        while parent.get(contact_id, contact_id) != contact_id:
+            contact_id = parent[contact_id]
+        return contact_id
+
+    matches = []
+    for first, second in candidates:
+        score, reasons = score_pair(keys[first], keys[second])
+        if score >= min_score:
+            matches.append((first, second, score, reasons))
+            root_a, root_b = find(first), find(second)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = defaultdict(lambda: {'ids': set(), 'score': 1.0, 'reasons': set()})
+    for first, second, score, reasons in matches:
+        group = groups[find(first)]
+        group['ids'].update((first, second))
+        group['score'] = min(group['score'], score)
+        group['reasons'].update(reasons)
+    return sorted(
+        ({'ids': sorted(g['ids']), 'score': g['score'], 'reasons': sorted(g['reasons'])} for g in groups.values()),
+        key=lambda g: (-g['score'], g['ids'][0])
+    )
+
+
+# ---------- Merge ----------
+
+def merge_contacts(survivor_id, duplicate_ids, fill_missing=True):
+    """Unifică `duplicate_ids` în `survivor_id`, în tranzacția curentă.
+
+    Toate referințele sunt mutate cu instrucțiuni set-based (un UPDATE per
+    tabelă, indiferent câte rânduri au duplicatele), apoi duplicatele sunt
+    șterse. Returnează numărul de rânduri mutate per tabelă.
+    """
+    duplicate_ids = sorted({int(i) for i in duplicate_ids} - {survivor_id})
+    if not duplicate_ids:
+        raise MergeError("No duplicate contacts to merge")
+    survivor = db.session.get(Contact, survivor_id)
+    if survivor is None:
+        raise MergeError("Contact not found", 404)
+    duplicates = db.session.scalars(
+        select(Contact).where(Contact.id.in_(duplicate_ids)).order_by(Contact.id)
+    ).all()
+    missing = set(duplicate_ids) - {c.id for c in duplicates}
+    if missing:
+        raise MergeError(f"Contacts not found: {sorted(missing)}", 404)
+
+    if fill_missing:
+        for field in FILLABLE_FIELDS:
+            if not getattr(survivor, field):
+                value = next((getattr(c, field) for c in duplicates if getattr(c, field)), None)
+                if value:
+                    setattr(survivor, field, value)
+    db.session.flush()
+
+    def repoint(column):
+        stmt = update(column.table).where(column.in_(duplicate_ids)).values({column.name: survivor_id})
+        return db.session.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+    moved = {
+        'interactions': repoint(Interaction.__table__.c.contact_id),
+        'tasks': repoint(Task.__table__.c.contact_id),
+        'notifications': repoint(Notification.__table__.c.link_contact_id),
+        'archived_notifications': repoint(NotificationArchive.__table__.c.link_contact_id),
+        'cold_interactions': reassign_cold_contacts(duplicate_ids, survivor_id),
+        'stage_transitions': repoint(SalesStageTransition.__table__.c.contact_id),
+    }
+
+    # Participările la întâlniri: cheia primară (meeting_id, contact_id) interzice
+    # dubluri, deci inserăm doar întâlnirile unde contactul păstrat nu participă deja
+    attendees = meeting_attendees.c
+    already_attending = select(attendees.meeting_id).where(attendees.contact_id == survivor_id)
+    moved['meetings'] = db.session.execute(
+        insert(meeting_attendees).from_select(
+            ['meeting_id', 'contact_id'],
+            select(attendees.meeting_id, literal(survivor_id)).where(
+                and_(attendees.contact_id.in_(duplicate_ids), attendees.meeting_id.not_in(already_attending))
+            ).distinct()
+        )
+    ).rowcount
+    db.session.execute(delete(meeting_attendees).where(attendees.contact_id.in_(duplicate_ids)))
+
+    # DELETE direct: referințele au fost deja mutate, cascade-ul ORM nu mai are ce șterge
+    db.session.execute(
+        delete(Contact).where(Contact.id.in_(duplicate_ids)).execution_options(synchronize_session=False)
+    )
+    # DELETE-ul Core nu trece prin evenimentele ORM: contoarele companiilor sunt actualizate aici
+    removed = Counter(contact.company_id for contact in duplicates)
+    apply_company_count_deltas(db.session.connection(), {company_id: -count for company_id, count in removed.items()})
+    if outbox_enabled():
+        emit_events(db.session.connection(), [
+            ('contact.merged', survivor_id, {'id': survivor_id, 'merged_ids': duplicate_ids, 'moved': moved})
+        ])
+    for contact in duplicates:
+        db.session.expunge(contact)
+    # Relațiile contactului păstrat (meetings) sunt recitite după merge
+    db.session.expire(survivor)
+    logger.info(f"Merged contacts {duplicate_ids} into {survivor_id}: {moved}")
+    return moved
+
+
+def init_dedupe(app):
+    app.config.setdefault('CRM_DEDUPE_MIN_SCORE', 0.8)
+    app.config.setdefault('CRM_DEDUPE_MAX_BLOCK_SIZE', 50)
+
+
+def register_dedupe_routes(bp):
+    """Register the duplicate detection and merge endpoints."""
+
+    @bp.route('/api/contacts/duplicates', methods=['GET'])
+    @read_only
+    @cost_class(HEAVY)
+    def get_duplicate_contacts():
+        """Grupuri de contacte probabil duplicate. Query: min_score, limit (implicit 100)."""
+        try:
+            try:
+                min_score = float(request.args['min_score']) if 'min_score' in request.args else None
+                limit = int(request.args.get('limit', 100))
+            except ValueError:
+                return jsonify({"error": "min_score must be a number and limit an integer"}), 400
+            groups = find_duplicate_groups(min_score=min_score)
+            total = len(groups)
+            groups = groups[:max(limit, 0)]
+            contacts = {
+                c.id: c for c in db.session.scalars(
+                    select(Contact).where(Contact.id.in_({i for g in groups for i in g['ids']}))
+                )
+            }
+            for group in groups:
+                group['contacts'] = [
+                    {**contacts[i].to_dict_simple(), 'phone': contacts[i].phone, 'company_id': contacts[i].company_id}
+                    for i in group['ids'] if i in contacts
+                ]
+            return jsonify({'total': total, 'groups': groups}), 200
+        except Exception as e:
+            logger.error(f"Error finding duplicate contacts: {str(e)}")
+            return jsonify({"error": "Failed to find duplicate contacts"}), 500
+
+    @bp.route('/api/contacts/<int:contact_id>/merge', methods=['POST'])
+    def merge_contact_duplicates(contact_id):
+        """Unifică duplicatele în contactul `contact_id`. Body: {"duplicate_ids": [..], "fill_missing": true}."""
+        data = request.get_json(silent=True) or {}
+        duplicate_ids = data.get('duplicate_ids')
+        if not isinstance(duplicate_ids, list) or not all(isinstance(i, int) for i in duplicate_ids):
+            return jsonify({"error": "Field 'duplicate_ids' must be a list of contact IDs"}), 400
+
+        def unit():
+            moved = merge_contacts(contact_id, duplicate_ids, fill_missing=data.get('fill_missing', True))
+            return {'contact': db.session.get(Contact, contact_id).to_dict(), 'moved': moved}
+
+        try:
+            return jsonify(run_write(current_app, unit)), 200
+        except MergeError as e:
+            return jsonify({"error": str(e)}), e.status_code
+        except WriteTimeout as e:
+            return write_timeout_response(e)
+        except Exception as e:
+            logger.error(f"Error merging contacts into {contact_id}: {str(e)}")
+            return jsonify({"error": f"Failed to merge contacts into {contact_id}"}), 500
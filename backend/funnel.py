@@ -0,0 +1,354 @@
+"""Istoricul etapelor de vânzare și raportul de funnel.
+
+Fiecare schimbare a `Contact.sales_stage` adaugă un rând în
+sales_stage_transition, în aceeași tranzacție cu schimbarea:
+- scrierile ORM (POST/PUT /api/contacts, merge) prin evenimentele de flush;
+- PATCH-ul cu un singur UPDATE (backend/updates.py) apelează direct
+  `record_stage_transitions`.
+
+Tot în aceeași tranzacție sunt actualizate agregatele din care citește
+`/api/reports/funnel`, astfel încât costul raportului depinde de lungimea
+intervalului, nu de numărul de tranziții:
+- sales_funnel_daily_rollup: tranziții (din, în) pe zi, cel mult 49 de rânduri/zi;
+- sales_outcome_rollup: câștigate/pierdute per companie, pe zi și pe lună.
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import request, jsonify
+from sqlalchemy import event, func, select, insert, delete, inspect, and_, or_
+from sqlalchemy.orm import object_session
+
+from backend.app import db
+from backend.routing import read_only
+from backend.rollups import apply_count_deltas, parse_report_range, _as_date
+from backend.models import (
+    Contact, Company, SalesStage, SalesStageTransition, SalesFunnelDailyRollup, SalesOutcomeRollup
+)
+
+logger = logging.getLogger(__name__)
+
+# Ordinea etapelor în pipeline; CLOSED_LOST nu este o "avansare"
+STAGE_ORDER = ['PROSPECTING', 'QUALIFICATION', 'PROPOSAL', 'NEGOTIATION', 'CLOSED_WON']
+WON, LOST = SalesStage.CLOSED_WON.value, SalesStage.CLOSED_LOST.value
+DEFAULT_COMPANY_LIMIT = 20
+
+_FUNNEL_KEY = ('day', 'from_stage', 'to_stage')
+_FUNNEL_VALUES = ('count', 'timed_count', 'days_total')
+_OUTCOME_KEY = ('grain', 'period', 'company_id')
+_OUTCOME_VALUES = ('won', 'lost')
+_listeners_installed = False
+
+StageChange = namedtuple('StageChange', 'contact_id company_id from_stage to_stage')
+
+
+def stage_value(stage):
+    """SalesStage, numele unei etape sau None -> string/None, așa cum e stocat în istoric."""
+    if isinstance(stage, SalesStage):
+        return stage.value
+    return stage or None
+
+
+# ---------- Writing ----------
+
+def record_stage_transitions(connection, changes, now=None):
+    """Adaugă tranzițiile `changes` (StageChange) și actualizează agregatele, pe `connection`.
+
+    Timpul petrecut în etapa veche se calculează față de ultima tranziție a
+    contactului (o căutare în indexul (contact_id, transitioned_at) per lot).
+    """
+    changes = [c for c in changes if stage_value(c.from_stage) != stage_value(c.to_stage)]
+    if not changes:
+        return 0
+    now = now or datetime.utcnow()
+    table = SalesStageTransition.__table__
+    contact_ids = {c.contact_id for c in changes}
+    entered_at = dict(connection.execute(
+        select(table.c.contact_id, func.max(table.c.transitioned_at))
+        .where(table.c.contact_id.in_(contact_ids))
+        .group_by(table.c.contact_id)
+    ).all())
+
+    rows = []
+    funnel_deltas, outcome_deltas = {}, {}
+    for change in changes:
+        previous = entered_at.get(change.contact_id)
+        if isinstance(previous, str):
+            previous = datetime.fromisoformat(previous)
+        days = (now - previous).total_seconds() / 86400 if previous and change.from_stage else None
+        row = {
+            'contact_id': change.contact_id,
+            'company_id': change.company_id,
+            'from_stage': stage_value(change.from_stage),
+            'to_stage': stage_value(change.to_stage),
+            'transitioned_at': now,
+            'days_in_stage': days,
+        }
+        rows.append(row)
+        # Aceeași schimbare de două ori în lot: a doua pornește de la prima
+        entered_at[change.contact_id] = now
+        _add_deltas(funnel_deltas, outcome_deltas, now.date(), change.company_id,
+                    row['from_stage'], row['to_stage'], days)
+
+    connection.execute(insert(table), rows)
+    _apply_deltas(connection, funnel_deltas, outcome_deltas)
+    return len(rows)
+
+
+def _add_deltas(funnel_deltas, outcome_deltas, day, company_id, from_stage, to_stage, days, count=1, timed=None):
+    timed = (days is not None) * count if timed is None else timed
+    key = (day, from_stage or '', to_stage or '')
+    old = funnel_deltas.get(key, (0, 0, 0.0))
+    funnel_deltas[key] = (old[0] + count, old[1] + timed, old[2] + (days or 0.0))
+    if to_stage in (WON, LOST):
+        outcome = (count, 0) if to_stage == WON else (0, count)
+        for grain, period in (('D', day), ('M', day.replace(day=1))):
+            key = (grain, period, company_id or 0)
+            old = outcome_deltas.get(key, (0, 0))
+            outcome_deltas[key] = (old[0] + outcome[0], old[1] + outcome[1])
+
+
+def _apply_deltas(connection, funnel_deltas, outcome_deltas):
+    apply_count_deltas(connection, SalesFunnelDailyRollup, _FUNNEL_KEY, funnel_deltas, value_column=_FUNNEL_VALUES)
+    apply_count_deltas(connection, SalesOutcomeRollup, _OUTCOME_KEY, outcome_deltas, value_column=_OUTCOME_VALUES)
+
+
+def _pending_changes(target):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault('sales_stage_changes', [])
+
+
+def _on_contact_insert(mapper, connection, target):
+    changes = _pending_changes(target)
+    if changes is not None and target.sales_stage:
+        changes.append(StageChange(target.id, target.company_id, None, target.sales_stage))
+
+
+def _on_contact_update(mapper, connection, target):
+    changes = _pending_changes(target)
+    if changes is None:
+        return
+    history = inspect(target).attrs.sales_stage.load_history()
+    if history.has_changes():
+        old = history.deleted[0] if history.deleted else None
+        changes.append(StageChange(target.id, target.company_id, old, target.sales_stage))
+
+
+def _on_after_flush(session, flush_context):
+    changes = session.info.pop('sales_stage_changes', None)
+    if changes:
+        record_stage_transitions(session.connection(), changes)
+
+
+def record_patch_stage_change(connection, row, old_stage):
+    """Hook pentru PATCH (backend/updates.py): rândul RETURNING și etapa dinainte."""
+    record_stage_transitions(connection, [StageChange(row.id, row.company_id, old_stage, row.sales_stage)])
+
+
+def install_funnel_listeners():
+    """Register the ORM events that record sales stage transitions."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Contact, 'after_insert', _on_contact_insert)
+    event.listen(Contact, 'after_update', _on_contact_update)
+    event.listen(db.session, 'after_flush', _on_after_flush)
+    _listeners_installed = True
+
+
+# ---------- Backfill / rebuild ----------
+
+def backfill_stage_history():
+    """Tranziția inițială (None -> etapa curentă, la data creării) pentru contactele fără istoric."""
+    table = SalesStageTransition.__table__
+    contact = Contact.__table__
+    has_history = select(table.c.contact_id).where(table.c.contact_id == contact.c.id).exists()
+    source = select(
+        contact.c.id, contact.c.company_id, contact.c.sales_stage,
+        func.coalesce(contact.c.created_at, func.current_timestamp())
+    ).where(contact.c.sales_stage.isnot(None), ~has_history)
+    result = db.session.execute(
+        insert(table).from_select(['contact_id', 'company_id', 'to_stage', 'transitioned_at'], source)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def rebuild_funnel_rollups():
+    """Recalculează agregatele funnel-ului din istoricul complet."""
+    table = SalesStageTransition.__table__
+    day = func.date(table.c.transitioned_at)
+    source = select(
+        day, table.c.company_id, table.c.from_stage, table.c.to_stage,
+        func.count(), func.count(table.c.days_in_stage), func.sum(table.c.days_in_stage)
+    ).group_by(day, table.c.company_id, table.c.from_stage, table.c.to_stage)
+
+    funnel_deltas, outcome_deltas = {}, {}
+    for d, company_id, from_stage, to_stage, count, timed, days_total in db.session.execute(source):
+        _add_deltas(funnel_deltas, outcome_deltas, _as_date(d), company_id, from_stage, to_stage,
+                    days_total, count=count, timed=timed)
+
+    db.session.execute(delete(SalesFunnelDailyRollup))
+    db.session.execute(delete(SalesOutcomeRollup))
+    _apply_deltas(db.session.connection(), funnel_deltas, outcome_deltas)
+    db.session.commit()
+    return len(funnel_deltas) + len(outcome_deltas)
+
+
+# ---------- Reading ----------
+
+def _ratio(numerator, denominator, digits=4):
+    return round(numerator / denominator, digits) if denominator else None
+
+
+def _stage_rows(session, start, end, company_id):
+    """(from_stage, to_stage, count, timed_count, days_total) în interval.
+
+    Fără companie: din agregatele zilnice. Pentru o singură companie: direct din
+    istoric, prin indexul (company_id, transitioned_at).
+    """
+    if company_id is None:
+        rollup = SalesFunnelDailyRollup
+        return session.execute(
+            select(rollup.from_stage, rollup.to_stage, func.sum(rollup.count),
+                   func.sum(rollup.timed_count), func.sum(rollup.days_total))
+            .where(rollup.day >= start, rollup.day <= end)
+            .group_by(rollup.from_stage, rollup.to_stage)
+        ).all()
+    table = SalesStageTransition.__table__
+    return session.execute(
+        select(table.c.from_stage, table.c.to_stage, func.count(),
+               func.count(table.c.days_in_stage), func.sum(table.c.days_in_stage))
+        .where(table.c.company_id == company_id,
+               table.c.transitioned_at >= datetime.combine(start, datetime.min.time()),
+               table.c.transitioned_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        .group_by(table.c.from_stage, table.c.to_stage)
+    ).all()
+
+
+def funnel_report(start, end, company_id=None, company_limit=DEFAULT_COMPANY_LIMIT, session=None):
+    """Conversia pe etape, durata medie în fiecare etapă și win rate-ul per companie."""
+    session = session or db.session
+    stages = {
+        stage.value: {'stage': stage.value, 'entered': 0, 'exited': 0, 'advanced': 0, 'lost': 0,
+                      'timed': 0, 'days_total': 0.0}
+        for stage in SalesStage
+    }
+    for from_stage, to_stage, count, timed, days_total in _stage_rows(session, start, end, company_id):
+        if to_stage in stages:
+            stages[to_stage]['entered'] += count
+        if from_stage in stages:
+            entry = stages[from_stage]
+            entry['exited'] += count
+            entry['timed'] += timed
+            entry['days_total'] += days_total or 0.0
+            if to_stage == LOST:
+                entry['lost'] += count
+            elif from_stage in STAGE_ORDER and to_stage in STAGE_ORDER \
+                    and STAGE_ORDER.index(to_stage) > STAGE_ORDER.index(from_stage):
+                entry['advanced'] += count
+
+    for entry in stages.values():
+        timed, days_total = entry.pop('timed'), entry.pop('days_total')
+        entry['avg_days_in_stage'] = _ratio(days_total, timed, 2)
+        entry['conversion_rate'] = _ratio(entry['advanced'], entry['exited'])
+
+    won, lost = stages[WON]['entered'], stages[LOST]['entered']
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'company_id': company_id,
+        'stages': list(stages.values()),
+        'won': won,
+        'lost': lost,
+        'win_rate': _ratio(won, won + lost),
+        'companies': win_rate_by_company(start, end, company_id, company_limit, session),
+    }
+
+
+def _outcome_windows(start, end):
+    """Împarte [start, end] în (grain, de la, până la): lunile complete 'M', capetele 'D'."""
+    first_full = start if start.day == 1 else (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    after_end = end + timedelta(days=1)
+    last_full_end = after_end.replace(day=1)  # prima zi după ultima lună completă
+    if first_full >= last_full_end:
+        return [('D', start, end)]
+    windows = [('M', first_full, last_full_end - timedelta(days=1))]
+    if start < first_full:
+        windows.append(('D', start, first_full - timedelta(days=1)))
+    if last_full_end <= end:
+        windows.append(('D', last_full_end, end))
+    return windows
+
+
+def win_rate_by_company(start, end, company_id=None, limit=DEFAULT_COMPANY_LIMIT, session=None):
+    """Companiile cu cele mai multe contacte închise (câștigate sau pierdute) în interval."""
+    session = session or db.session
+    rollup = SalesOutcomeRollup
+    windows = [
+        and_(rollup.grain == grain, rollup.period >= low, rollup.period <= high)
+        for grain, low, high in _outcome_windows(start, end)
+    ]
+    conditions = [or_(*windows), rollup.company_id != 0]
+    if company_id is not None:
+        conditions.append(rollup.company_id == company_id)
+    won, lost = func.sum(rollup.won), func.sum(rollup.lost)
+    rows = session.execute(
+        select(rollup.company_id, won, lost).where(*conditions)
+        .group_by(rollup.company_id)
+        .having(won + lost > 0)
+        .order_by((won + lost).desc(), rollup.company_id)
+        .limit(limit)
+    ).all()
+    names = dict(session.execute(
+        select(Company.id, Company.name).where(Company.id.in_([row[0] for row in rows]))
+    ).all()) if rows else {}
+    return [
+        {'company_id': company, 'company_name': names.get(company), 'won': won_count, 'lost': lost_count,
+         'win_rate': _ratio(won_count, won_count + lost_count)}
+        for company, won_count, lost_count in rows
+    ]
+
+
+def init_funnel(app):
+    install_funnel_listeners()
+
+
+def register_funnel_routes(bp):
+    """Register the sales funnel report endpoint."""
+
+    @bp.route('/api/reports/funnel', methods=['GET'])
+    @read_only
+    def get_report_funnel():
+        """Conversie, zile medii per etapă și win rate per companie, din agregatele zilnice.
+
+        Query: start, end (YYYY-MM-DD, implicit ultimele 30 de zile), company_id, companies (limită).
+        """
+        try:
+            start, end, _ = parse_report_range(request.args)
+            company_id = request.args.get('company_id', type=int)
+            company_limit = min(max(request.args.get('companies', DEFAULT_COMPANY_LIMIT, type=int), 0), 100)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            return jsonify(funnel_report(start, end, company_id, company_limit)), 200
+        except Exception as e:
+            logger.error(f"Error generating funnel report: {str(e)}")
+            return jsonify({"error": "Failed to generate report"}), 500
+
+    @bp.route('/api/contacts/<int:contact_id>/stage-history', methods=['GET'])
+    @read_only
+    def get_contact_stage_history(contact_id):
+        """Tranzițiile de etapă ale unui contact, cele mai recente primele."""
+        try:
+            transitions = db.session.scalars(
+                select(SalesStageTransition).where(SalesStageTransition.contact_id == contact_id)
+                .order_by(SalesStageTransition.transitioned_at.desc(), SalesStageTransition.id.desc())
+            ).all()
+            return jsonify([t.to_dict() for t in transitions]), 200
+        except Exception as e:
+            logger.error(f"Error fetching stage history for contact {contact_id}: {str(e)}")
+            return jsonify({"error": f"Failed to fetch stage history for contact {contact_id}"}), 500
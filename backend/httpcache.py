@@ -0,0 +1,71 @@
+import logging
+
+from flask import request, jsonify
+from werkzeug.http import generate_etag, parse_etags
+
+logger = logging.getLogger(__name__)
+
+# Răspunsurile GET sunt revalidate de client (queryCache.js) la fiecare citire
+# învechită; cu ETag, un răspuns neschimbat costă un 304 fără body.
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+# Endpoint-urile de administrare nu sunt niciodată puse în cache
+UNCACHED_PREFIXES = ('/api/admin',)
+
+
+def etag_for(body):
+    """ETag tare pentru body-ul (bytes) unui răspuns."""
+    return generate_etag(body)
+
+
+def version_etag(version, body):
+    """ETag-ul unei entități versionate: "<versiune>.<hash body>".
+
+    Versiunea poate fi trimisă înapoi în If-Match (backend/updates.py); hash-ul
+    schimbă ETag-ul și când se schimbă date care nu cresc versiunea
+    (contacts_count, lista de interacțiuni).
+    """
+    return f"{version}.{etag_for(body)}"
+
+
+def versioned_response(payload, version):
+    """Răspuns JSON cu ETag-ul de versiune; add_etag nu îl mai înlocuiește."""
+    response = jsonify(payload)
+    response.set_etag(version_etag(version, response.get_data()))
+    return response
+
+
+def if_none_match(header_value, etag):
+    """True dacă antetul If-None-Match al clientului conține deja `etag`."""
+    if not header_value:
+        return False
+    return parse_etags(header_value).contains_weak(etag)
+
+
+def _cacheable(response):
+    return (
+        request.method == 'GET'
+        and response.status_code == 200
+        and response.mimetype == 'application/json'
+        and not response.direct_passthrough
+        and not request.path.startswith(UNCACHED_PREFIXES)
+    )
+
+
+def init_http_cache(app):
+    """ETag + 304 pentru răspunsurile JSON ale cererilor GET (CRM_HTTP_ETAGS)."""
+    app.config.setdefault('CRM_HTTP_ETAGS', True)
+    if not app.config['CRM_HTTP_ETAGS']:
+        return
+
+    @app.after_request
+    def add_etag(response):
+        if not _cacheable(response):
+            return response
+        # Entitățile versionate au deja ETag-ul "<versiune>.<hash>" (versioned_response)
+        if 'ETag' not in response.headers:
+            response.set_etag(etag_for(response.get_data()))
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+        # Transformă răspunsul în 304 (fără body) dacă ETag-ul clientului e același
+        return response.make_conditional(request)
+
+    logger.debug("HTTP ETags enabled for JSON GET responses")
@@ -0,0 +1,354 @@
+"""Ingestia în bloc a emailurilor primite ca interacțiuni de tip 'Email'.
+
+Mesajele (mbox, EML sau NDJSON) sunt procesate în loturi: expeditorii unui
+lot sunt rezolvați la contacte cu un singur SELECT ... WHERE email_normalized
+IN (...), iar interacțiunile și notificările sunt inserate cu câte un INSERT
+executemany. Rollup-urile de interacțiuni sunt actualizate cu
+apply_count_deltas, în aceeași tranzacție.
+
+Contact.email_normalized (indexat) păstrează emailul normalizat ca în
+backend/dedupe.py: litere mici, fără +eticheta, fără punctele din Gmail.
+"""
+import email
+import json
+import logging
+import mailbox
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+from email import policy
+from email.utils import parseaddr, parsedate_to_datetime
+
+from flask import request, jsonify, current_app
+from sqlalchemy import event, select, update, insert, bindparam
+
+from backend.app import db
+from backend.dedupe import normalize_email
+from backend.models import Contact, Company, Interaction, Notification, InteractionDailyRollup
+from backend.rollups import apply_count_deltas, _interaction_key, _ROLLUP_KEY
+from backend.outbox import emit_events, notification_message, outbox_enabled
+from backend.writequeue import run_write, WriteTimeout, write_timeout_response
+
+logger = logging.getLogger(__name__)
+
+INTERACTION_TYPE = 'Email'
+FORMATS = ('mbox', 'eml', 'ndjson')
+MAX_NOTES_CHARS = 4000
+
+InboundEmail = namedtuple('InboundEmail', 'sender subject body sent_at')
+
+_listeners_installed = False
+
+
+# ---------- Contact.email_normalized ----------
+
+def _set_normalized_email(mapper, connection, target):
+    target.email_normalized = normalize_email(target.email)
+
+
+def install_email_listeners():
+    """Register the ORM events that keep Contact.email_normalized in sync with email."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Contact, 'before_insert', _set_normalized_email)
+    event.listen(Contact, 'before_update', _set_normalized_email)
+    _listeners_installed = True
+
+
+def backfill_normalized_emails(batch_size=1000, all_rows=False):
+    """Completează email_normalized pentru contactele existente. Returnează câte au fost actualizate."""
+    table = Contact.__table__
+    stmt = select(table.c.id, table.c.email).order_by(table.c.id)
+    if not all_rows:
+        stmt = stmt.where(table.c.email_normalized.is_(None))
+    rows = db.session.execute(stmt).all()
+    update_stmt = (
+        update(table).where(table.c.id == bindparam('contact_id'))
+        # Nu schimbă versiunea: valoarea e derivată, nu o modificare a contactului
+        .values(email_normalized=bindparam('normalized'), version=table.c.version, updated_at=table.c.updated_at)
+    )
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        db.session.execute(update_stmt, [
+            {'contact_id': row.id, 'normalized': normalize_email(row.email)} for row in chunk
+        ])
+        db.session.commit()
+    return len(rows)
+
+
+# ---------- Parsing ----------
+
+def _naive_utc(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _message_text(message):
+    body = message.get_body(preferencelist=('plain', 'html'))
+    if body is None:
+        return ''
+    try:
+        return body.get_content().strip()
+    except (LookupError, KeyError):
+        # Charset necunoscut
+        return body.get_payload(decode=True).decode('utf-8', errors='replace').strip()
+
+
+def from_email_message(message):
+    """email.message.EmailMessage -> InboundEmail."""
+    sent_at = None
+    if message['Date']:
+        try:
+            sent_at = _naive_utc(parsedate_to_datetime(str(message['Date'])))
+        except (TypeError, ValueError):
+            sent_at = None
+    return InboundEmail(
+        sender=parseaddr(str(message['From'] or ''))[1],
+        subject=str(message['Subject'] or '').strip(),
+        body=_message_text(message),
+        sent_at=sent_at,
+    )
+
+
+def parse_eml(data):
+    return from_email_message(email.message_from_bytes(data, policy=policy.default))
+
+
+def split_mbox(data):
+    """Împarte conținutul unui fișier mbox (bytes) în mesaje, după liniile "From "."""
+    messages, current = [], []
+    for line in data.splitlines(keepends=True):
+        if line.startswith(b'From ') and (current or not messages):
+            if current:
+                messages.append(b''.join(current))
+            current = []
+            continue
+        # mboxrd: ">From " din corp a fost escapat la scriere
+        current.append(line[1:] if line.startswith(b'>From ') else line)
+    if current:
+        messages.append(b''.join(current))
+    return messages
+
+
+def from_dict(item):
+    """Un mesaj NDJSON/JSON: {"from", "subject", "body", "date" (ISO 8601)}."""
+    if not isinstance(item, dict):
+        raise ValueError("Each message must be an object")
+    sent_at = None
+    if item.get('date'):
+        try:
+            sent_at = _naive_utc(datetime.fromisoformat(str(item['date']).replace('Z', '+00:00')))
+        except ValueError:
+            raise ValueError(f"Invalid date: {item['date']}")
+    return InboundEmail(
+        sender=parseaddr(str(item.get('from') or ''))[1],
+        subject=str(item.get('subject') or '').strip(),
+        body=str(item.get('body') or '').strip(),
+        sent_at=sent_at,
+    )
+
+
+def parse_ndjson(lines):
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield from_dict(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}")
+
+
+def read_messages(path, fmt):
+    """Mesajele unui fișier (generator), pentru CLI. `fmt` este unul dintre FORMATS."""
+    if fmt == 'mbox':
+        for message in mailbox.mbox(path, factory=lambda f: email.message_from_binary_file(f, policy=policy.default),
+                                    create=False):
+            yield from_email_message(message)
+    elif fmt == 'eml':
+        with open(path, 'rb') as f:
+            yield parse_eml(f.read())
+    else:
+        with open(path, encoding='utf-8') as f:
+            yield from parse_ndjson(f)
+
+
+def guess_format(path):
+    lower = path.lower()
+    if lower.endswith('.eml'):
+        return 'eml'
+    if lower.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'mbox'
+
+
+# ---------- Ingestion ----------
+
+def _notes(message):
+    notes = f"Subject: {message.subject}" if message.subject else ''
+    if message.body:
+        notes = f"{notes}\n\n{message.body}" if notes else message.body
+    return notes[:MAX_NOTES_CHARS] or None
+
+
+def _resolve_senders(normalized_emails):
+    """{email normalizat: contact} cu un singur SELECT pe indexul email_normalized.
+
+    Dacă mai multe contacte au același email normalizat, îl alegem pe cel mai vechi.
+    """
+    contact = Contact.__table__
+    company = Company.__table__
+    rows = db.session.execute(
+        select(contact.c.id, contact.c.name, contact.c.company_id, contact.c.email_normalized,
+               company.c.name.label('company_name'))
+        .outerjoin(company, company.c.id == contact.c.company_id)
+        .where(contact.c.email_normalized.in_(normalized_emails))
+        .order_by(contact.c.id.desc())
+    ).all()
+    return {row.email_normalized: row for row in rows}
+
+
+def _insert_returning_ids(table, rows):
+    if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+    # Fără RETURNING la executemany: câte un INSERT
+    return [db.session.execute(insert(table).values(**row)).inserted_primary_key[0] for row in rows]
+
+
+def _insert_notifications(contacts, interaction_ids, now):
+    db.session.execute(insert(Notification.__table__), [
+        {
+            'message': notification_message(
+                INTERACTION_TYPE, contact.name, contact.company_name if contact.company_id else None
+            ),
+            'is_read': False,
+            'created_at': now,
+            'link_contact_id': contact.id,
+            'link_company_id': contact.company_id,
+            'link_interaction_id': interaction_id,
+        }
+        for contact, interaction_id in zip(contacts, interaction_ids)
+    ])
+
+
+def ingest_chunk(messages):
+    """Inserează interacțiunile unui lot, fără commit. Returnează (inserate, fără contact)."""
+    senders = [normalize_email(message.sender) if message.sender else None for message in messages]
+    wanted = {sender for sender in senders if sender}
+    contacts = _resolve_senders(wanted) if wanted else {}
+
+    now = datetime.utcnow()
+    matched, interaction_rows = [], []
+    for message, sender in zip(messages, senders):
+        contact = contacts.get(sender)
+        if contact is None:
+            continue
+        matched.append(contact)
+        interaction_rows.append({
+            'interaction_type': INTERACTION_TYPE,
+            'notes': _notes(message),
+            'interaction_date': message.sent_at or now,
+            'contact_id': contact.id,
+            'company_id': contact.company_id,
+        })
+    if not interaction_rows:
+        return 0, len(messages)
+
+    interaction_ids = _insert_returning_ids(Interaction.__table__, interaction_rows)
+    if outbox_enabled():
+        # Notificările sunt construite de dispatcher-ul outbox-ului
+        emit_events(db.session.connection(), [
+            ('interaction.created', interaction_id, {'id': interaction_id, **row})
+            for row, interaction_id in zip(interaction_rows, interaction_ids)
+        ])
+    else:
+        _insert_notifications(matched, interaction_ids, now)
+
+    # INSERT-urile Core nu trec prin listener-ele ORM ale rollup-urilor
+    deltas = Counter(
+        _interaction_key(row['interaction_date'], INTERACTION_TYPE, row['company_id']) for row in interaction_rows
+    )
+    apply_count_deltas(db.session.connection(), InteractionDailyRollup, _ROLLUP_KEY, deltas)
+    return len(interaction_rows), len(messages) - len(interaction_rows)
+
+
+def _chunks(messages, size):
+    chunk = []
+    for message in messages:
+        chunk.append(message)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ingest_messages(messages, chunk_size=None, commit=False):
+    """Ingestă mesajele în loturi. Cu commit=True (CLI) fiecare lot este propria tranzacție.
+
+    Returnează {"received", "ingested", "unmatched"}.
+    """
+    chunk_size = chunk_size or current_app.config['CRM_INGEST_CHUNK_SIZE']
+    stats = {'received': 0, 'ingested': 0, 'unmatched': 0}
+    for chunk in _chunks(messages, chunk_size):
+        ingested, unmatched = ingest_chunk(chunk)
+        stats['received'] += len(chunk)
+        stats['ingested'] += ingested
+        stats['unmatched'] += unmatched
+        if commit:
+            db.session.commit()
+    return stats
+
+
+def parse_request_messages():
+    """Mesajele din corpul cererii, după Content-Type. Ridică ValueError dacă sunt invalide."""
+    mimetype = request.mimetype
+    if mimetype == 'application/json':
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or not isinstance(payload.get('messages'), list):
+            raise ValueError("Body must be an object with a 'messages' list")
+        return [from_dict(item) for item in payload['messages']]
+    if mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return list(parse_ndjson(request.get_data(as_text=True).splitlines()))
+    if mimetype == 'application/mbox':
+        return [parse_eml(data) for data in split_mbox(request.get_data())]
+    if mimetype == 'message/rfc822':
+        return [parse_eml(request.get_data())]
+    raise ValueError("Unsupported Content-Type; use application/json, application/x-ndjson, "
+                     "application/mbox or message/rfc822")
+
+
+def init_inbound(app):
+    app.config.setdefault('CRM_INGEST_CHUNK_SIZE', 1000)
+    app.config.setdefault('CRM_INGEST_MAX_MESSAGES', 10000)
+    install_email_listeners()
+
+
+def register_inbound_routes(bp):
+    """Register the bulk email ingestion endpoint."""
+
+    @bp.route('/api/interactions/ingest', methods=['POST'])
+    def ingest_interactions():
+        """Emailuri primite -> interacțiuni 'Email' + notificări, într-o singură tranzacție.
+
+        Expeditorii fără contact sunt ignorați și numărați în "unmatched".
+        """
+        try:
+            messages = parse_request_messages()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        max_messages = current_app.config['CRM_INGEST_MAX_MESSAGES']
+        if len(messages) > max_messages:
+            return jsonify({"error": f"At most {max_messages} messages per request"}), 413
+        try:
+            stats = run_write(current_app, lambda: ingest_messages(messages))
+            return jsonify(stats), 200
+        except WriteTimeout as e:
+            return write_timeout_response(e)
+        except Exception as e:
+            logger.error(f"Error ingesting emails: {str(e)}")
+            return jsonify({"error": "Failed to ingest emails"}), 500
@@ -0,0 +1,172 @@
+import base64
+import json
+import logging
+
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.orm import selectinload
+
+from backend.models import Contact, Company, ContactType, SalesStage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Parametrii care cer răspunsul paginat; fără ei /api/contacts și /api/companies
+# returnează lista completă, ca înainte (Dashboard, formulare, clienți vechi)
+LIST_PARAMS = ('q', 'sort', 'cursor', 'limit', 'company_id', 'contact_type', 'sales_stage')
+
+
+class ListSpec:
+    """Ce se poate căuta, filtra și sorta pentru o listă paginată."""
+
+    def __init__(self, model, sorts, search_columns, options=()):
+        # sort -> (coloana, descrescător); 'created' folosește ID-ul, care crește odată cu created_at
+        self.model = model
+        self.sorts = sorts
+        self.search_columns = search_columns
+        self.options = options
+
+
+CONTACT_LIST = ListSpec(
+    Contact,
+    sorts={
+        'name': (Contact.name, False), '-name': (Contact.name, True),
+        'created': (Contact.id, False), '-created': (Contact.id, True),
+    },
+    search_columns=(Contact.name, Contact.email, Contact.phone),
+    # Contact.to_dict() include compania
+    options=(selectinload(Contact.company),),
+)
+
+COMPANY_LIST = ListSpec(
+    Company,
+    sorts={
+        'name': (Company.name, False), '-name': (Company.name, True),
+        'created': (Company.id, False), '-created': (Company.id, True),
+    },
+    search_columns=(Company.name, Company.website, Company.address),
+)
+
+
+def wants_page(args):
+    return any(name in args for name in LIST_PARAMS)
+
+
+def encode_cursor(sort, value, item_id):
+    raw = json.dumps([sort, value, item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Decodifică un cursor opac în (valoare, id). Cursorul e valabil doar pentru sortarea cu care a fost creat."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if cursor_sort != sort:
+            raise ValueError
+        return value, int(item_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _enum_value(enum, value, name):
+    try:
+        return enum(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value}")
+
+
+def parse_list_args(args, spec):
+    """Citește q, filtrele, sort, cursor și limit. Ridică ValueError dacă sunt invalide."""
+    sort = args.get('sort') or 'name'
+    if sort not in spec.sorts:
+        raise ValueError(f"sort must be one of: {', '.join(spec.sorts)}")
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    cursor = decode_cursor(args['cursor'], sort) if args.get('cursor') else None
+
+    filters = {}
+    if spec.model is Contact:
+        if args.get('company_id'):
+            try:
+                filters['company_id'] = int(args['company_id'])
+            except ValueError:
+                raise ValueError("company_id must be an integer")
+        if args.get('contact_type'):
+            filters['contact_type'] = _enum_value(ContactType, args['contact_type'], 'contact_type')
+        if args.get('sales_stage'):
+            filters['sales_stage'] = _enum_value(SalesStage, args['sales_stage'], 'sales_stage')
+    return {
+        'q': (args.get('q') or '').strip(),
+        'filters': filters,
+        'sort': sort,
+        'cursor': cursor,
+        'limit': limit,
+    }
+
+
+def _search_condition(spec, q):
+    conditions = [column.icontains(q, autoescape=True) for column in spec.search_columns]
+    if spec.model is Contact:
+        # Căutarea după numele companiei, ca în filtrul vechi din ContactList.js
+        conditions.append(Contact.company_id.in_(
+            select(Company.id).where(Company.name.icontains(q, autoescape=True))
+        ))
+    return or_(*conditions)
+
+
+def _filtered(spec, params):
+    stmt = select(spec.model)
+    if params['q']:
+        stmt = stmt.where(_search_condition(spec, params['q']))
+    for name, value in params['filters'].items():
+        stmt = stmt.where(getattr(spec.model, name) == value)
+    return stmt
+
+
+def fetch_page(session, spec, params, with_total=None):
+    """O pagină ordonată după (coloana de sortare, id), cu paginare keyset.
+
+    Returnează {"items", "next_cursor", "total"}. `total` este calculat doar
+    pentru prima pagină (fără cursor), unde clientul îl folosește pentru
+    înălțimea listei virtualizate.
+    """
+    column, descending = spec.sorts[params['sort']]
+    id_column = spec.model.id
+    stmt = _filtered(spec, params)
+    if params['cursor']:
+        value, item_id = params['cursor']
+        if column is id_column:
+            stmt = stmt.where(id_column < item_id if descending else id_column > item_id)
+        elif descending:
+            stmt = stmt.where(or_(column < value, and_(column == value, id_column < item_id)))
+        else:
+            stmt = stmt.where(or_(column > value, and_(column == value, id_column > item_id)))
+    if column is id_column:
+        order = (id_column.desc(),) if descending else (id_column,)
+    else:
+        order = (column.desc(), id_column.desc()) if descending else (column, id_column)
+    rows = session.scalars(
+        stmt.options(*spec.options).order_by(*order).limit(params['limit'] + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > params['limit']:
+        rows = rows[:params['limit']]
+        last = rows[-1]
+        next_cursor = encode_cursor(params['sort'], getattr(last, column.key), last.id)
+
+    if with_total is None:
+        with_total = params['cursor'] is None
+    total = None
+    if with_total:
+        total = session.scalar(select(func.count()).select_from(_filtered(spec, params).subquery()))
+    return {
+        'items': [row.to_dict() for row in rows],
+        'next_cursor': next_cursor,
+        'total': total,
+    }
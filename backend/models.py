@@ -1,6 +1,8 @@
 from backend.app import db
 from datetime import datetime
+from sqlalchemy import literal_column
 from enum import Enum as PyEnum
+import json
 import logging
 
 # Get a logger instance
@@ -28,17 +30,36 @@ class TaskStatus(PyEnum):
     COMPLETED = 'Completed'
     OVERDUE = 'Overdue'
 
+def version_column():
+    """Coloană de versiune pentru concurență optimistă (If-Match / ETag).
+
+    Este incrementată de baza de date la fiecare UPDATE, atât din ORM cât și
+    din instrucțiunile Core (vezi backend/updates.py).
+    """
+    return db.Column(db.Integer, nullable=False, default=1, server_default='1',
+                     onupdate=literal_column('version + 1'))
+
 class Contact(db.Model):
     """Model for storing contact information."""
-    
+    # Lista paginată /api/contacts?sort=name parcurge indexul pe nume; cel pe
+    # company_id servește filtrul ?company_id= și recalcularea Company.contacts_count
+    __table_args__ = (
+        db.Index('ix_contact_name', 'name'),
+        db.Index('ix_contact_company_id', 'company_id'),
+        db.Index('ix_contact_email_normalized', 'email_normalized'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), nullable=False)
+    # Emailul normalizat (vezi backend/inbound.py), pentru căutarea expeditorilor
+    email_normalized = db.Column(db.String(120), nullable=True)
     phone = db.Column(db.String(20), nullable=True)
     contact_type = db.Column(db.Enum(ContactType, native_enum=False, validate_strings=True), nullable=False, default=ContactType.LEAD)
     sales_stage = db.Column(db.Enum(SalesStage, native_enum=False, validate_strings=True), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = version_column()
 
     # Add relationship with Company
     company_id = db.Column(db.Integer, db.ForeignKey('company.id'))
@@ -71,6 +92,7 @@ class Contact(db.Model):
             'sales_stage': sales_stage_value,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version,
             'company_id': self.company_id,
             'company': self.company.to_dict() if self.company else None,
             # Optionally include interactions count or simplified list
@@ -96,9 +118,13 @@ class Company(db.Model):
     address = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = version_column()
     
     # One-to-many relationship with contacts
     contacts = db.relationship('Contact', back_populates='company', lazy=True)
+    # Numărul de contacte, actualizat în aceeași tranzacție cu scrierile pe
+    # contacte (backend/companycounts.py); to_dict() nu mai încarcă lista de contacte
+    contacts_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # One-to-many relationship with interactions
     interactions = db.relationship('Interaction', back_populates='company', lazy='dynamic', cascade="all, delete-orphan")
@@ -121,7 +147,8 @@ class Company(db.Model):
             'address': self.address,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'contacts_count': len(self.contacts),
+            'version': self.version,
+            'contacts_count': self.contacts_count,
             # Optionally include interactions count or simplified list
             # 'interactions_count': self.interactions.count()
             # 'tasks_count': self.tasks.count()
@@ -136,10 +163,19 @@ class Company(db.Model):
 
 class Interaction(db.Model):
     """Model pentru stocarea interacțiunilor/activităților."""
+    # Indexuri compuse pentru timeline-ul paginat al unui contact/al unei companii
+    __table_args__ = (
+        db.Index('ix_interaction_contact_id_interaction_date', 'contact_id', 'interaction_date'),
+        db.Index('ix_interaction_company_id_interaction_date', 'company_id', 'interaction_date'),
+        # AUTOINCREMENT: ID-urile șterse nu sunt refolosite, deci rămân unice și
+        # față de interacțiunile mutate în cold storage (backend/coldstorage.py)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     interaction_type = db.Column(db.String(50), nullable=False)  # e.g., 'Call', 'Email', 'Meeting', 'Note'
     notes = db.Column(db.Text, nullable=True)
-    interaction_date = db.Column(db.DateTime, default=datetime.utcnow)
+    interaction_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     # Legături către Contact și Companie (opționale, dar cel puțin una trebuie să fie prezentă)
     contact_id = db.Column(db.Integer, db.ForeignKey('contact.id'), nullable=True)
@@ -168,6 +204,13 @@ class Interaction(db.Model):
 
 class Notification(db.Model):
     """Model pentru stocarea notificărilor de sistem."""
+    __table_args__ = (
+        # Lista "necitite întâi, apoi cele mai recente" și numărul de necitite
+        db.Index('ix_notification_is_read_created_at', 'is_read', 'created_at'),
+        # Plafonul de notificări citite per contact și per companie (vezi backend/retention.py)
+        db.Index('ix_notification_contact_read', 'link_contact_id', 'is_read', 'created_at'),
+        db.Index('ix_notification_company_read', 'link_company_id', 'is_read', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     message = db.Column(db.String(255), nullable=False)
     is_read = db.Column(db.Boolean, default=False, nullable=False)
@@ -195,10 +238,41 @@ class Notification(db.Model):
             'link_interaction_id': self.link_interaction_id
         }
 
+class NotificationArchive(db.Model):
+    """Notificări mutate din tabela activă de politica de retenție (backend/retention.py).
+
+    Fără chei străine: arhiva rămâne validă și după ștergerea contactelor/companiilor.
+    """
+    __tablename__ = 'notification_archive'
+    id = db.Column(db.Integer, primary_key=True)
+    # ID-ul din tabela notification (SQLite poate refolosi ID-ul celui mai mare rând șters)
+    notification_id = db.Column(db.Integer, nullable=False, index=True)
+    message = db.Column(db.String(255), nullable=False)
+    is_read = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, index=True)
+    link_contact_id = db.Column(db.Integer, nullable=True)
+    link_company_id = db.Column(db.Integer, nullable=True)
+    link_interaction_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.notification_id,
+            'message': self.message,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'link_contact_id': self.link_contact_id,
+            'link_company_id': self.link_company_id,
+            'link_interaction_id': self.link_interaction_id,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
 # Tabela de asociere pentru relația many-to-many între Meeting și Contact (participanți)
 meeting_attendees = db.Table('meeting_attendees',
     db.Column('meeting_id', db.Integer, db.ForeignKey('meeting.id'), primary_key=True),
-    db.Column('contact_id', db.Integer, db.ForeignKey('contact.id'), primary_key=True)
+    db.Column('contact_id', db.Integer, db.ForeignKey('contact.id'), primary_key=True),
+    # Cheia primară începe cu meeting_id; indexul permite căutarea întâlnirilor unui contact
+    db.Index('ix_meeting_attendees_contact_id', 'contact_id')
 )
 
 class Meeting(db.Model):
@@ -212,9 +286,10 @@ class Meeting(db.Model):
     status = db.Column(db.String(20), default='confirmed')  # confirmed, tentative, cancelled
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = version_column()
     
     # Legătura cu compania (opțional)
-    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True, index=True)
     company = db.relationship('Company', back_populates='meetings')
     
     # Relația many-to-many cu contactele (participanții)
@@ -235,6 +310,7 @@ class Meeting(db.Model):
             'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version,
             'company_id': self.company_id,
             'company_name': self.company.name if self.company else None,
             'attendees': [{'id': contact.id, 'name': contact.name} for contact in self.attendees]
@@ -250,10 +326,11 @@ class Task(db.Model):
     status = db.Column(db.Enum(TaskStatus), nullable=False, default=TaskStatus.PENDING)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = version_column()
 
     # Legături către Contact și Companie (cel puțin una ar trebui să fie prezentă, de obicei)
-    contact_id = db.Column(db.Integer, db.ForeignKey('contact.id'), nullable=True)
-    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True)
+    contact_id = db.Column(db.Integer, db.ForeignKey('contact.id'), nullable=True, index=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True, index=True)
 
     # Optional: Link to the user who is assigned the task, if user model exists
     # assigned_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
@@ -275,8 +352,173 @@ class Task(db.Model):
             'status': self.status.value if self.status else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version,
             'contact_id': self.contact_id,
             'company_id': self.company_id,
             'contact_name': self.contact.name if self.contact else None,
             'company_name': self.company.name if self.company else None
         }
+
+# === Tabele de rollup pentru rapoarte ===
+# Agregate zilnice menținute incremental (vezi backend/rollups.py), astfel încât
+# rapoartele citesc doar fereastra de zile cerută, nu tot istoricul.
+class InteractionDailyRollup(db.Model):
+    """Daily interaction counts keyed by (day, interaction_type, company_id)."""
+    __tablename__ = 'interaction_daily_rollup'
+    day = db.Column(db.Date, primary_key=True)
+    interaction_type = db.Column(db.String(50), primary_key=True)
+    # 0 = interacțiune fără companie (cheia primară nu poate conține NULL)
+    company_id = db.Column(db.Integer, primary_key=True, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'interaction_type': self.interaction_type,
+            'company_id': self.company_id or None,
+            'count': self.count
+        }
+
+class TaskStatusSnapshot(db.Model):
+    """Number of tasks in each status, captured once per day."""
+    __tablename__ = 'task_status_snapshot'
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)  # numele membrului TaskStatus (ex: PENDING)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class SalesStageSnapshot(db.Model):
+    """Number of contacts in each sales stage, captured once per day."""
+    __tablename__ = 'sales_stage_snapshot'
+    day = db.Column(db.Date, primary_key=True)
+    stage = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# === Istoricul etapelor de vânzare ===
+class SalesStageTransition(db.Model):
+    """Append-only history of sales stage changes (see backend/funnel.py).
+
+    Fără chei străine: istoricul rămâne și după ștergerea contactului.
+    """
+    __tablename__ = 'sales_stage_transition'
+    __table_args__ = (
+        # Ultima tranziție a unui contact (timpul petrecut în etapa curentă)
+        db.Index('ix_sales_stage_transition_contact_id_transitioned_at', 'contact_id', 'transitioned_at'),
+        # Funnel-ul unei singure companii se calculează direct din istoric
+        db.Index('ix_sales_stage_transition_company_id_transitioned_at', 'company_id', 'transitioned_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    contact_id = db.Column(db.Integer, nullable=False)
+    company_id = db.Column(db.Integer, nullable=True)
+    from_stage = db.Column(db.String(20), nullable=True)  # None = contactul intră în pipeline
+    to_stage = db.Column(db.String(20), nullable=True)  # None = contactul iese din pipeline
+    transitioned_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Zile petrecute în from_stage; None dacă intrarea în etapă nu a fost înregistrată
+    days_in_stage = db.Column(db.Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'contact_id': self.contact_id,
+            'company_id': self.company_id,
+            'from_stage': self.from_stage,
+            'to_stage': self.to_stage,
+            'transitioned_at': self.transitioned_at.isoformat() if self.transitioned_at else None,
+            'days_in_stage': self.days_in_stage
+        }
+
+class SalesFunnelDailyRollup(db.Model):
+    """Daily transition counts keyed by (day, from_stage, to_stage), for all companies."""
+    __tablename__ = 'sales_funnel_daily_rollup'
+    day = db.Column(db.Date, primary_key=True)
+    # '' în loc de NULL (cheia primară nu poate conține NULL)
+    from_stage = db.Column(db.String(20), primary_key=True, default='')
+    to_stage = db.Column(db.String(20), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    # Tranzițiile cu days_in_stage cunoscut și suma zilelor lor (media = days_total / timed_count)
+    timed_count = db.Column(db.Integer, nullable=False, default=0)
+    days_total = db.Column(db.Float, nullable=False, default=0.0)
+
+class SalesOutcomeRollup(db.Model):
+    """Won/lost closes per company, per day ('D') and per month ('M').
+
+    Un interval lung citește lunile complete din rândurile 'M' și doar
+    capetele din rândurile 'D'.
+    """
+    __tablename__ = 'sales_outcome_rollup'
+    grain = db.Column(db.String(1), primary_key=True)
+    period = db.Column(db.Date, primary_key=True)  # ziua, respectiv prima zi a lunii
+    company_id = db.Column(db.Integer, primary_key=True, default=0)
+    won = db.Column(db.Integer, nullable=False, default=0)
+    lost = db.Column(db.Integer, nullable=False, default=0)
+
+# === Outbox (vezi backend/outbox.py) ===
+class OutboxEvent(db.Model):
+    """Change events written in the same transaction as the change itself.
+
+    Dispatcher-ul le citește în loturi și construiește notificările și
+    livrările de webhook-uri, în afara request-ului care a făcut schimbarea.
+    """
+    __tablename__ = 'outbox_event'
+    __table_args__ = (
+        # Evenimentele nedispecerizate, în ordinea scrierii
+        db.Index('ix_outbox_event_dispatched_at_id', 'dispatched_at', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)  # ex: interaction.created, contact.updated
+    entity_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # După un eșec: reîncercat nu mai devreme de acest moment (backoff)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)  # dispatch-uri eșuate
+    last_error = db.Column(db.Text, nullable=True)
+    dispatched_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'entity_id': self.entity_id,
+            'payload': json.loads(self.payload),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'dispatched_at': self.dispatched_at.isoformat() if self.dispatched_at else None
+        }
+
+class WebhookDelivery(db.Model):
+    """One outbox event to be POSTed to one webhook URL, retried with backoff.
+
+    Fără cheie străină către outbox_event: evenimentele dispecerizate pot fi
+    șterse (`flask crm outbox prune`) înainte ca livrarea să reușească.
+    """
+    __tablename__ = 'webhook_delivery'
+    __table_args__ = (
+        db.Index('ix_webhook_delivery_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, nullable=False)
+    url = db.Column(db.String(500), nullable=False)
+    body = db.Column(db.Text, nullable=False)  # JSON trimis
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, delivered, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_until = db.Column(db.DateTime, nullable=True)
+    last_status_code = db.Column(db.Integer, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'url': self.url,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_status_code': self.last_status_code,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'delivered_at': self.delivered_at.isoformat() if self.delivered_at else None
+        }
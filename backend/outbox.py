@@ -0,0 +1,598 @@
+"""Transactional outbox: evenimentele de schimbare sunt scrise în aceeași
+tranzacție cu schimbarea, iar efectele secundare rulează în afara request-ului.
+
+Scriere: evenimentele ORM pe Interaction, Task, Meeting și Contact adaugă un
+rând în `outbox_event` la flush (ex: interaction.created, task.updated). Căile
+Core (PATCH, ingestia de emailuri, merge-ul de duplicate) apelează emit_events.
+
+Dispatch: un dispatcher citește loturi de evenimente și, într-o singură
+tranzacție per lot (SELECT ... FOR UPDATE SKIP LOCKED pe PostgreSQL; pe SQLite
+scrierile sunt oricum serializate, deci mai multe procese pot rula în paralel):
+- construiește notificările pentru interaction.created;
+- creează câte o livrare în `webhook_delivery` per URL din CRM_WEBHOOK_URLS;
+- marchează evenimentele ca dispecerizate.
+După commit sunt apelați consumatorii înregistrați cu register_outbox_consumer
+(ex: invalidarea unui cache). Livrările de webhook-uri sunt trimise de un pool
+de CRM_WEBHOOK_WORKERS thread-uri, cu reîncercări și backoff exponențial.
+
+Dispatcher-ul rulează într-un thread al fiecărui proces (CRM_OUTBOX_DISPATCHER=
+thread, trezit imediat după commit-urile care au scris evenimente), ca proces
+separat: `flask crm outbox dispatch` (external), sau la sfârșitul request-ului
+care a scris evenimentele (inline; implicit pentru SQLite în memorie, unde toate
+thread-urile ar folosi aceeași conexiune).
+"""
+import enum
+import fnmatch
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+
+from flask import jsonify, current_app, g, has_app_context
+from sqlalchemy import event, select, update, insert, delete, func, or_, inspect
+from sqlalchemy.sql import ClauseElement
+
+from backend.app import db
+from backend.admin import admin_required
+from backend.models import (
+    Contact, Company, Interaction, Meeting, Task, Notification, OutboxEvent, WebhookDelivery
+)
+from backend.tenancy import current_tenant
+
+logger = logging.getLogger(__name__)
+
+# Modelele care produc evenimente: model -> prefixul tipului de eveniment
+EVENT_SOURCES = {Interaction: 'interaction', Task: 'task', Meeting: 'meeting', Contact: 'contact'}
+# Coloane actualizate la orice UPDATE; o schimbare doar a lor nu este un eveniment
+BOOKKEEPING_COLUMNS = {'version', 'updated_at'}
+MAX_MESSAGE_CHARS = 255  # Notification.message
+MAX_BACKOFF_SECONDS = 3600
+LEASE_MARGIN_SECONDS = 30
+
+_listeners_installed = False
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value):
+    return json.dumps(value, default=_json_default)
+
+
+def outbox_enabled():
+    return has_app_context() and current_app.config.get('CRM_OUTBOX', False)
+
+
+def notification_message(interaction_type, contact_name=None, company_name=None):
+    """Mesajul notificării pentru o interacțiune nouă (același text ca înainte de outbox)."""
+    target_info = f"Contact: {contact_name}" if contact_name is not None else f"Company: {company_name}"
+    if contact_name is not None and company_name is not None:
+        target_info = f"Contact: {contact_name} (Company: {company_name})"
+    message = f"New interaction '{interaction_type}' added for {target_info}."
+    return message if len(message) <= MAX_MESSAGE_CHARS else message[:MAX_MESSAGE_CHARS - 1] + '…'
+
+
+# ---------- Scriere (în tranzacția schimbării) ----------
+
+def emit_events(connection, events):
+    """Inserează evenimentele [(event_type, entity_id, payload)] în tranzacția curentă."""
+    if not events:
+        return
+    now = datetime.utcnow()
+    connection.execute(insert(OutboxEvent.__table__), [
+        {'event_type': event_type, 'entity_id': entity_id, 'payload': dumps(payload),
+         'created_at': now, 'attempts': 0}
+        for event_type, entity_id, payload in events
+    ])
+    db.session.info['outbox_written'] = True
+
+
+def patch_event_hook(source):
+    """Hook pentru PATCH (backend/updates.py): '<source>.updated' cu câmpurile trimise."""
+    def hook(connection, row, fields):
+        if not outbox_enabled():
+            return
+        payload = {key: value for key, value in row._mapping.items()}
+        payload['changed'] = sorted(fields)
+        emit_events(connection, [(f"{source}.updated", row.id, payload)])
+    return hook
+
+
+def _snapshot(mapper, target):
+    # Doar valorile deja încărcate: accesarea unui atribut expirat ar emite un SELECT în flush
+    state = inspect(target)
+    values = {}
+    for attr in mapper.column_attrs:
+        value = state.dict.get(attr.key)
+        if attr.key in state.dict and not isinstance(value, ClauseElement):
+            values[attr.key] = value
+    return values
+
+
+def _pending(target):
+    session = inspect(target).session
+    if session is None or not outbox_enabled():
+        return None
+    return session.info.setdefault('outbox_events', [])
+
+
+def _on_insert(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append((f"{EVENT_SOURCES[mapper.class_]}.created", target.id, _snapshot(mapper, target)))
+
+
+def _on_update(mapper, connection, target):
+    pending = _pending(target)
+    if pending is None:
+        return
+    state = inspect(target)
+    changed = sorted(
+        attr.key for attr in mapper.column_attrs
+        if attr.key not in BOOKKEEPING_COLUMNS and state.attrs[attr.key].history.has_changes()
+    )
+    if changed:
+        payload = _snapshot(mapper, target)
+        payload['changed'] = changed
+        pending.append((f"{EVENT_SOURCES[mapper.class_]}.updated", target.id, payload))
+
+
+def _on_delete(mapper, connection, target):
+    pending = _pending(target)
+    if pending is not None:
+        pending.append((f"{EVENT_SOURCES[mapper.class_]}.deleted", target.id, _snapshot(mapper, target)))
+
+
+def _on_after_flush(session, flush_context):
+    events = session.info.pop('outbox_events', None)
+    if events:
+        emit_events(session.connection(), events)
+
+
+def _on_after_commit(session):
+    if session.info.pop('outbox_written', False) and has_app_context():
+        dispatcher = current_app.extensions.get('crm_outbox')
+        if dispatcher is not None:
+            dispatcher.notify(current_tenant())
+
+
+def _on_after_rollback(session):
+    session.info.pop('outbox_events', None)
+    session.info.pop('outbox_written', None)
+
+
+def install_outbox_listeners():
+    """Register the ORM events that write outbox rows for changed entities."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    for model in EVENT_SOURCES:
+        event.listen(model, 'after_insert', _on_insert)
+        event.listen(model, 'after_update', _on_update)
+        event.listen(model, 'after_delete', _on_delete)
+    event.listen(db.session, 'after_flush', _on_after_flush)
+    event.listen(db.session, 'after_commit', _on_after_commit)
+    event.listen(db.session, 'after_rollback', _on_after_rollback)
+    _listeners_installed = True
+
+
+# ---------- Dispatch ----------
+
+def _claim(table, conditions, batch_size, lease_seconds, columns):
+    """Revendică cel mult `batch_size` rânduri: claimed_until = acum + lease, attempts + 1.
+
+    Folosit pentru livrările de webhook-uri, trimise în afara unei tranzacții.
+    Condiția de revendicare este repetată în UPDATE, deci un rând preluat între
+    timp de alt proces nu este revendicat de două ori.
+    """
+    now = datetime.utcnow()
+    claimable = [*conditions, or_(table.c.claimed_until.is_(None), table.c.claimed_until < now)]
+    ids = db.session.scalars(select(table.c.id).where(*claimable).order_by(table.c.id).limit(batch_size)).all()
+    if not ids:
+        return []
+    until = now + timedelta(seconds=lease_seconds)
+    stmt = (
+        update(table).where(table.c.id.in_(ids), *claimable)
+        .values(claimed_until=until, attempts=table.c.attempts + 1)
+    )
+    if db.session.get_bind().dialect.update_returning:
+        rows = db.session.execute(stmt.returning(*columns)).all()
+    else:
+        db.session.execute(stmt)
+        rows = db.session.execute(
+            select(*columns).where(table.c.id.in_(ids), table.c.claimed_until == until)
+        ).all()
+    db.session.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+
+def pending_events(batch_size, max_attempts):
+    """Următorul lot de evenimente nedispecerizate, blocate în tranzacția curentă."""
+    table = OutboxEvent.__table__
+    now = datetime.utcnow()
+    return db.session.execute(
+        select(table.c.id, table.c.event_type, table.c.entity_id, table.c.payload, table.c.created_at,
+               table.c.attempts)
+        .where(table.c.dispatched_at.is_(None), table.c.attempts < max_attempts,
+               or_(table.c.next_attempt_at.is_(None), table.c.next_attempt_at <= now))
+        .order_by(table.c.id).limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def build_notifications(events):
+    """Notificările pentru interaction.created, cu numele contactelor/companiilor citite în lot."""
+    created = [(event, json.loads(event.payload)) for event in events if event.event_type == 'interaction.created']
+    if not created:
+        return 0
+    # Interacțiunile șterse între timp nu mai primesc notificare
+    existing = set(db.session.scalars(
+        select(Interaction.id).where(Interaction.id.in_([event.entity_id for event, _ in created]))
+    ))
+    created = [(event, payload) for event, payload in created if event.entity_id in existing]
+    contact_ids = {payload.get('contact_id') for _, payload in created} - {None}
+    company_ids = {payload.get('company_id') for _, payload in created} - {None}
+    contact_names = dict(db.session.execute(
+        select(Contact.id, Contact.name).where(Contact.id.in_(contact_ids))
+    ).all()) if contact_ids else {}
+    company_names = dict(db.session.execute(
+        select(Company.id, Company.name).where(Company.id.in_(company_ids))
+    ).all()) if company_ids else {}
+
+    rows = []
+    for event, payload in created:
+        contact_id, company_id = payload.get('contact_id'), payload.get('company_id')
+        rows.append({
+            'message': notification_message(
+                payload.get('interaction_type'),
+                contact_names.get(contact_id) if contact_id else None,
+                company_names.get(company_id) if company_id else None,
+            ),
+            'is_read': False,
+            'created_at': event.created_at,
+            'link_contact_id': contact_id,
+            'link_company_id': company_id,
+            'link_interaction_id': event.entity_id,
+        })
+    if rows:
+        db.session.execute(insert(Notification.__table__), rows)
+    return len(rows)
+
+
+def webhook_body(event):
+    return dumps({
+        'id': event.id,
+        'type': event.event_type,
+        'created_at': event.created_at,
+        'data': json.loads(event.payload),
+    })
+
+
+def enqueue_webhooks(events, urls, patterns):
+    rows = [
+        {'event_id': event.id, 'url': url, 'body': webhook_body(event), 'status': 'pending',
+         'attempts': 0, 'next_attempt_at': datetime.utcnow(), 'created_at': datetime.utcnow()}
+        for event in events
+        if any(fnmatch.fnmatchcase(event.event_type, pattern) for pattern in patterns)
+        for url in urls
+    ]
+    if rows:
+        db.session.execute(insert(WebhookDelivery.__table__), rows)
+    return len(rows)
+
+
+def _mark_dispatched(ids):
+    """Returnează False dacă alt dispatcher a marcat deja o parte din evenimente."""
+    table = OutboxEvent.__table__
+    result = db.session.execute(
+        update(table).where(table.c.id.in_(ids), table.c.dispatched_at.is_(None))
+        .values(dispatched_at=datetime.utcnow(), last_error=None)
+    )
+    return result.rowcount == len(ids)
+
+
+def _mark_failed(event, error):
+    # Reîncercat după backoff; după CRM_OUTBOX_MAX_ATTEMPTS rămâne nedispecerizat (vezi /api/admin/outbox)
+    table = OutboxEvent.__table__
+    retry_at = datetime.utcnow() + timedelta(seconds=min(2 ** event.attempts, MAX_BACKOFF_SECONDS))
+    db.session.execute(
+        update(table).where(table.c.id == event.id)
+        .values(attempts=table.c.attempts + 1, next_attempt_at=retry_at, last_error=str(error)[:1000])
+    )
+
+
+def parse_list(value):
+    if isinstance(value, (list, tuple)):
+        return [item for item in value if item]
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class OutboxDispatcher:
+    """Golește outbox-ul și trimite webhook-urile. Un thread per proces (vezi start)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.consumers = []
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._tenants = set()
+        self._pid = None
+        self._pool = None
+        self.stats = {'events': 0, 'notifications': 0, 'webhooks_enqueued': 0, 'webhooks_delivered': 0,
+                      'webhooks_failed': 0, 'errors': 0}
+
+    def notify(self, tenant=None):
+        """Un commit a scris evenimente: dispatcher-ul pornește imediat, nu la următorul poll."""
+        with self._lock:
+            self._tenants.add(tenant)
+        self._wake.set()
+
+    def _count(self, name, value):
+        with self._lock:
+            self.stats[name] += value
+
+    def _pool_for_process(self):
+        # Pool-ul nu supraviețuiește unui fork: îl recreăm în fiecare proces
+        if self._pool is None or self._pid != os.getpid():
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.app.config['CRM_WEBHOOK_WORKERS'], thread_name_prefix='crm-webhook'
+            )
+            self._pid = os.getpid()
+        return self._pool
+
+    # --- evenimente ---
+
+    def _dispatch_batch(self, events):
+        config = self.app.config
+        try:
+            notifications = build_notifications(events)
+            webhooks = enqueue_webhooks(events, parse_list(config['CRM_WEBHOOK_URLS']),
+                                        parse_list(config['CRM_WEBHOOK_EVENTS']))
+            if not _mark_dispatched([event.id for event in events]):
+                db.session.rollback()
+                return
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(events) > 1:
+                # Izolăm evenimentul care eșuează: restul lotului este dispecerizat normal
+                for single in events:
+                    self._dispatch_batch([single])
+                return
+            logger.error(f"Error dispatching outbox event {events[0].id}: {str(e)}")
+            self._count('errors', 1)
+            _mark_failed(events[0], e)
+            db.session.commit()
+            return
+        self._count('events', len(events))
+        self._count('notifications', notifications)
+        self._count('webhooks_enqueued', webhooks)
+        for consumer in self.consumers:
+            try:
+                consumer(events)
+            except Exception as e:
+                logger.error(f"Outbox consumer {getattr(consumer, '__name__', consumer)} failed: {str(e)}")
+
+    def drain_events(self):
+        config = self.app.config
+        total = 0
+        while True:
+            events = pending_events(config['CRM_OUTBOX_BATCH_SIZE'], config['CRM_OUTBOX_MAX_ATTEMPTS'])
+            if not events:
+                db.session.rollback()
+                return total
+            self._dispatch_batch(events)
+            total += len(events)
+
+    # --- webhook-uri ---
+
+    def _post(self, delivery):
+        request = urllib.request.Request(
+            delivery.url, data=delivery.body.encode(), method='POST',
+            headers={'Content-Type': 'application/json', 'User-Agent': 'simple-crm-lite-webhooks',
+                     'X-CRM-Delivery': str(delivery.id), 'X-CRM-Event-Id': str(delivery.event_id)},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.app.config['CRM_WEBHOOK_TIMEOUT_SECONDS']) as response:
+                return response.status, None
+        except urllib.error.HTTPError as e:
+            return e.code, f"HTTP {e.code}"
+        except Exception as e:
+            return None, str(e) or type(e).__name__
+
+    def deliver_webhooks(self):
+        """Trimite livrările scadente în paralel; returnează câte au fost încercate."""
+        config = self.app.config
+        table = WebhookDelivery.__table__
+        # Lease-ul acoperă cel mai lung lot posibil: fiecare worker trimite pe rând, fiecare cerere expiră după timeout
+        rounds = math.ceil(config['CRM_OUTBOX_BATCH_SIZE'] / config['CRM_WEBHOOK_WORKERS'])
+        lease = rounds * config['CRM_WEBHOOK_TIMEOUT_SECONDS'] + LEASE_MARGIN_SECONDS
+        total = 0
+        while True:
+            deliveries = _claim(
+                table, [table.c.status == 'pending', table.c.next_attempt_at <= datetime.utcnow()],
+                config['CRM_OUTBOX_BATCH_SIZE'], lease,
+                (table.c.id, table.c.event_id, table.c.url, table.c.body, table.c.attempts)
+            )
+            if not deliveries:
+                return total
+            results = list(self._pool_for_process().map(self._post, deliveries))
+            now = datetime.utcnow()
+            for delivery, (status_code, error) in zip(deliveries, results):
+                values = {'last_status_code': status_code, 'claimed_until': None}
+                if status_code is not None and 200 <= status_code < 300:
+                    values.update(status='delivered', delivered_at=now, last_error=None)
+                    self._count('webhooks_delivered', 1)
+                elif delivery.attempts >= config['CRM_WEBHOOK_MAX_ATTEMPTS']:
+                    values.update(status='failed', last_error=error)
+                    self._count('webhooks_failed', 1)
+                    logger.warning(f"Webhook delivery {delivery.id} to {delivery.url} failed permanently: {error}")
+                else:
+                    backoff = min(2 ** delivery.attempts, MAX_BACKOFF_SECONDS)
+                    values.update(next_attempt_at=now + timedelta(seconds=backoff), last_error=error)
+                db.session.execute(update(table).where(table.c.id == delivery.id).values(**values))
+            db.session.commit()
+            total += len(deliveries)
+
+    # --- bucla ---
+
+    def run_once(self, tenant=None):
+        """Golește outbox-ul și livrările scadente ale bazei date (implicită sau a tenant-ului)."""
+        with self.app.app_context():
+            if tenant is not None:
+                g.db_tenant = tenant
+            try:
+                return {'events': self.drain_events(), 'deliveries': self.deliver_webhooks()}
+            finally:
+                db.session.remove()
+
+    def run_pending(self):
+        """Golește bazele care au primit evenimente de la ultimul apel (modul inline)."""
+        with self._lock:
+            tenants, self._tenants = self._tenants, set()
+        for tenant in tenants:
+            self.run_once(tenant)
+
+    def run_forever(self):
+        interval = self.app.config['CRM_OUTBOX_POLL_INTERVAL_MS'] / 1000.0
+        delay = self.app.config['CRM_OUTBOX_BATCH_DELAY_MS'] / 1000.0
+        while True:
+            if self._wake.wait(interval) and delay:
+                # Evenimentele commit-urilor apropiate sunt dispecerizate împreună:
+                # o tranzacție a dispatcher-ului la câteva request-uri, nu la fiecare
+                time.sleep(delay)
+            self._wake.clear()
+            with self._lock:
+                # Baza implicită la fiecare poll (reîncercări); tenanții doar când au scris evenimente
+                tenants, self._tenants = self._tenants | {None}, set()
+            for tenant in tenants:
+                try:
+                    self.run_once(tenant)
+                except Exception as e:
+                    logger.error(f"Error running outbox dispatcher for {tenant or 'default database'}: {str(e)}")
+
+    def start(self):
+        """Pornește thread-ul dispatcher-ului în procesul curent (o singură dată per proces)."""
+        if self.app.extensions.get('crm_outbox_thread_pid') == os.getpid():
+            return None
+        self.app.extensions['crm_outbox_thread_pid'] = os.getpid()
+        thread = threading.Thread(target=self.run_forever, name='crm-outbox-dispatcher', daemon=True)
+        thread.start()
+        logger.debug("Outbox dispatcher thread started")
+        return thread
+
+
+def register_outbox_consumer(app, consumer):
+    """`consumer(events)` este apelat după commit-ul fiecărui lot dispecerizat, în thread-ul dispatcher-ului."""
+    app.extensions['crm_outbox'].consumers.append(consumer)
+
+
+def prune_outbox(days):
+    """Șterge evenimentele dispecerizate și livrările încheiate mai vechi de `days` zile."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    events = OutboxEvent.__table__
+    deliveries = WebhookDelivery.__table__
+    result = {
+        'events': db.session.execute(
+            delete(events).where(events.c.dispatched_at < cutoff)
+        ).rowcount,
+        'deliveries': db.session.execute(
+            delete(deliveries).where(deliveries.c.status != 'pending', deliveries.c.created_at < cutoff)
+        ).rowcount,
+    }
+    db.session.commit()
+    return result
+
+
+def outbox_status():
+    config = current_app.config
+    events = OutboxEvent.__table__
+    deliveries = WebhookDelivery.__table__
+    undispatched = events.c.dispatched_at.is_(None)
+    oldest = db.session.scalar(
+        select(func.min(events.c.created_at)).where(undispatched, events.c.attempts < config['CRM_OUTBOX_MAX_ATTEMPTS'])
+    )
+    dispatcher = current_app.extensions.get('crm_outbox')
+    return {
+        'pending_events': db.session.scalar(
+            select(func.count()).where(undispatched, events.c.attempts < config['CRM_OUTBOX_MAX_ATTEMPTS'])
+        ),
+        'failed_events': db.session.scalar(
+            select(func.count()).where(undispatched, events.c.attempts >= config['CRM_OUTBOX_MAX_ATTEMPTS'])
+        ),
+        'oldest_pending_seconds': round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else None,
+        'webhook_deliveries': dict(db.session.execute(
+            select(deliveries.c.status, func.count()).group_by(deliveries.c.status)
+        ).all()),
+        'dispatcher': config['CRM_OUTBOX_DISPATCHER'],
+        'process_stats': dict(dispatcher.stats) if dispatcher else None,
+    }
+
+
+def _default_dispatcher_mode(app):
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    return 'inline' if uri in ('sqlite://', 'sqlite:///:memory:') else 'thread'
+
+
+def init_outbox(app):
+    """Outbox-ul și dispatcher-ul (CRM_OUTBOX, CRM_OUTBOX_*, CRM_WEBHOOK_*)."""
+    app.config.setdefault('CRM_OUTBOX', True)
+    app.config.setdefault('CRM_OUTBOX_DISPATCHER', None)  # thread, inline sau external
+    app.config.setdefault('CRM_OUTBOX_BATCH_SIZE', 200)
+    app.config.setdefault('CRM_OUTBOX_POLL_INTERVAL_MS', 1000)
+    app.config.setdefault('CRM_OUTBOX_BATCH_DELAY_MS', 50)
+    app.config.setdefault('CRM_OUTBOX_MAX_ATTEMPTS', 10)
+    app.config.setdefault('CRM_WEBHOOK_URLS', '')
+    app.config.setdefault('CRM_WEBHOOK_EVENTS', '*')
+    app.config.setdefault('CRM_WEBHOOK_TIMEOUT_SECONDS', 5)
+    app.config.setdefault('CRM_WEBHOOK_MAX_ATTEMPTS', 8)
+    app.config.setdefault('CRM_WEBHOOK_WORKERS', 4)
+    if app.config['CRM_OUTBOX_DISPATCHER'] is None:
+        app.config['CRM_OUTBOX_DISPATCHER'] = _default_dispatcher_mode(app)
+    if app.config['CRM_OUTBOX_DISPATCHER'] not in ('thread', 'inline', 'external'):
+        raise ValueError("CRM_OUTBOX_DISPATCHER must be 'thread', 'inline' or 'external'")
+    if not app.config['CRM_OUTBOX']:
+        return
+
+    install_outbox_listeners()
+    dispatcher = app.extensions['crm_outbox'] = OutboxDispatcher(app)
+
+    if app.config['CRM_OUTBOX_DISPATCHER'] == 'thread':
+        # Pornit la prima cerere din fiecare proces, nu la import (compatibil cu --preload)
+        @app.before_request
+        def ensure_outbox_dispatcher():
+            dispatcher.start()
+    elif app.config['CRM_OUTBOX_DISPATCHER'] == 'inline':
+        @app.teardown_request
+        def dispatch_outbox_inline(exc):
+            try:
+                dispatcher.run_pending()
+            except Exception as e:
+                logger.error(f"Error running outbox dispatcher: {str(e)}")
+
+
+def register_outbox_routes(bp):
+    """Register the outbox monitoring endpoint."""
+
+    @bp.route('/api/admin/outbox', methods=['GET'])
+    @admin_required
+    def get_outbox_status():
+        """Evenimente în așteptare, eșuate și starea livrărilor de webhook-uri."""
+        if 'crm_outbox' not in current_app.extensions:
+            return jsonify({"enabled": False}), 200
+        try:
+            return jsonify({"enabled": True, **outbox_status()}), 200
+        except Exception as e:
+            logger.error(f"Error reading outbox status: {str(e)}")
+            return jsonify({"error": "Failed to read outbox status"}), 500
@@ -0,0 +1,441 @@
+"""Profilare la cerere pentru administratori: CPU per cerere și alocări de memorie.
+
+O cerere cu `?_profile=1` și antetul X-Admin-Token valid este rulată normal,
+dar răspunsul ei este înlocuit cu profilul:
+
+- `_profile=1` / `_profile=sample`: un sampler (thread separat) citește stiva
+  cererii la fiecare CRM_PROFILE_SAMPLE_INTERVAL_MS și returnează stivele în
+  format "collapsed" (o linie `cadru;cadru;... număr`), gata pentru
+  flamegraph.pl, speedscope sau inferno;
+- `_profile=cprofile`: cProfile, raportul pstats sortat după timpul cumulat;
+- `_profile=pstats`: cProfile, fișierul binar pstats (snakeviz, gprof2dot).
+
+Profilarea înfășoară toată aplicația WSGI, deci include rutarea, hook-urile
+before/after_request, to_dict, încărcările lazy și serializarea JSON. Fără
+token valid parametrul este ignorat și cererea rulează neprofilată.
+
+Pentru memorie, `POST /api/admin/profile/memory` pornește tracemalloc și ia
+un snapshot de referință; `GET` compară un snapshot nou cu referința (pe linie,
+fișier, traceback sau endpoint), iar la sfârșitul ferestrei snapshot-ul final
+este păstrat și tracemalloc oprit. Totul este per proces (per worker).
+"""
+import cProfile
+import functools
+import inspect
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode
+
+from flask import request, jsonify, current_app
+from werkzeug.wrappers import Response
+
+from backend.admin import admin_required, token_matches
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PARAM = '_profile'
+PROFILE_LIMIT_PARAM = '_profile_limit'
+PROFILE_MODES = {'1': 'sample', 'sample': 'sample', 'cprofile': 'cprofile', 'pstats': 'pstats'}
+MEMORY_GROUPS = ('lineno', 'filename', 'traceback', 'endpoint')
+
+# O singură cerere profilată odată per proces: cProfile nu poate rula de două
+# ori simultan, iar sampler-ul modifică sys.setswitchinterval
+_profile_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_path(filename):
+    """Calea fișierului relativă la cea mai lungă intrare din sys.path."""
+    best = filename
+    for entry in sys.path:
+        if entry and filename.startswith(entry.rstrip(os.sep) + os.sep):
+            relative = filename[len(entry.rstrip(os.sep)) + 1:]
+            if len(relative) < len(best):
+                best = relative
+    return best
+
+
+def _frame_label(code):
+    return f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Citește periodic stiva unui thread și numără stivele identice.
+
+    Stivele sunt tăiate la `root_frame` (cadrul care a pornit profilarea), deci
+    încep cu aplicația WSGI, nu cu serverul. Thread-ul sampler-ului are nevoie de
+    GIL ca să citească stiva, de aceea intervalul de comutare al interpretorului
+    este coborât la intervalul de eșantionare cât timp rulează.
+    """
+
+    def __init__(self, thread_id, root_frame, interval, root_label):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.root_label = root_label
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._switch_interval = None
+
+    def _stack(self, frame):
+        labels = []
+        while frame is not None and frame is not self.root_frame:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.append(self.root_label)
+        return ';'.join(reversed(labels))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[self._stack(frame)] += 1
+
+    def start(self):
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread = threading.Thread(target=self._run, name='crm-profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+def _requested_mode(query_string):
+    """(mod, limită, query string fără parametrii de profilare) sau None."""
+    if PROFILE_PARAM not in query_string:
+        return None
+    params = parse_qsl(query_string, keep_blank_values=True)
+    values = dict(params)
+    if PROFILE_PARAM not in values:
+        return None
+    rest = [(key, value) for key, value in params if not key.startswith(PROFILE_PARAM)]
+    return values[PROFILE_PARAM], values.get(PROFILE_LIMIT_PARAM), urlencode(rest)
+
+
+class ProfilingMiddleware:
+    """Înfășoară app.wsgi_app; cererile fără `_profile` trec neatinse."""
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        requested = _requested_mode(environ.get('QUERY_STRING', ''))
+        if requested is None or not token_matches(
+                self.app.config.get('CRM_ADMIN_TOKEN'), environ.get('HTTP_X_ADMIN_TOKEN')):
+            return self.wsgi_app(environ, start_response)
+
+        value, limit, query_string = requested
+        mode = PROFILE_MODES.get(value)
+        if mode is None:
+            return _json_error(f"Unknown profile mode '{value}' (expected one of: sample, cprofile, pstats)", 400)(
+                environ, start_response)
+        if not _profile_lock.acquire(blocking=False):
+            return _json_error("Another request is being profiled", 409)(environ, start_response)
+        try:
+            environ = dict(environ, QUERY_STRING=query_string)
+            return self._profile(environ, mode, limit)(environ, start_response)
+        finally:
+            _profile_lock.release()
+
+    def _run(self, environ):
+        """Rulează cererea până la capăt (inclusiv body-ul) și returnează statusul."""
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['status'] = status
+            return lambda data: None
+
+        body = self.wsgi_app(environ, capture)
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        return captured.get('status', '500 INTERNAL SERVER ERROR')
+
+    def _profile(self, environ, mode, limit):
+        label = f"{environ.get('REQUEST_METHOD', 'GET')} {environ.get('PATH_INFO', '/')}"
+        headers = {'X-Profile-Mode': mode}
+        started = time.perf_counter()
+        if mode == 'sample':
+            interval = self.app.config['CRM_PROFILE_SAMPLE_INTERVAL_MS'] / 1000.0
+            sampler = StackSampler(threading.get_ident(), sys._getframe(), interval, label)
+            sampler.start()
+            try:
+                status = self._run(environ)
+            finally:
+                sampler.stop()
+            body, mimetype = sampler.collapsed(), 'text/plain'
+            headers['X-Profile-Samples'] = str(sum(sampler.counts.values()))
+            headers['Content-Disposition'] = 'attachment; filename="profile.collapsed"'
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                status = self._run(environ)
+            finally:
+                profiler.disable()
+            if mode == 'pstats':
+                profiler.create_stats()
+                body, mimetype = marshal.dumps(profiler.stats), 'application/octet-stream'
+                headers['Content-Disposition'] = 'attachment; filename="profile.pstats"'
+            else:
+                out = io.StringIO()
+                stats = pstats.Stats(profiler, stream=out)
+                stats.sort_stats('cumulative').print_stats(int(limit) if limit and limit.isdigit() else 50)
+                body, mimetype = f"{label}\n{out.getvalue()}", 'text/plain'
+        headers['X-Profile-Status'] = status.split(' ', 1)[0]
+        headers['X-Profile-Duration-Ms'] = f"{1000 * (time.perf_counter() - started):.2f}"
+        logger.info(f"Profiled {label} ({mode}, {headers['X-Profile-Duration-Ms']} ms)")
+        return Response(body, mimetype=mimetype, headers=headers)
+
+
+def _json_error(message, status):
+    return Response(json.dumps({"error": message}), status=status, mimetype='application/json')
+
+
+def _view_line_ranges(view_functions):
+    """{fișier: [(prima linie, ultima linie, endpoint)]} pentru funcțiile view.
+
+    Funcțiile imbricate (closure-uri, generatoare) au liniile în același
+    interval, deci alocările lor sunt atribuite tot endpoint-ului.
+    """
+    ranges = defaultdict(list)
+    for endpoint, view in view_functions.items():
+        code = getattr(inspect.unwrap(view), '__code__', None)
+        if code is None:
+            continue
+        lines = [line for _, _, line in code.co_lines() if line is not None]
+        ranges[code.co_filename].append((code.co_firstlineno, max(lines, default=code.co_firstlineno), endpoint))
+    return ranges
+
+
+def _endpoint_for(traceback, ranges):
+    """Cel mai apropiat cadru (dinspre alocare spre rădăcină) aflat într-un view."""
+    for frame in reversed(traceback):
+        for first, last, endpoint in ranges.get(frame.filename, ()):
+            if first <= frame.lineno <= last:
+                return endpoint
+    return None
+
+
+class MemoryProfiler:
+    """Snapshot-uri tracemalloc: o referință și diferențe față de ea.
+
+    tracemalloc este global în proces, deci există o singură instanță
+    (`memory_profiler`) pentru toate aplicațiile din proces.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer = None
+        self._owns_tracing = False
+        self.baseline = None
+        self.final = None
+        self.started_at = None
+        self.ends_at = None
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def start(self, frames, seconds):
+        """Pornește (sau repornește) fereastra: snapshot de referință acum, final după `seconds`."""
+        with self._lock:
+            self._cancel_timer()
+            if self._owns_tracing and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._owns_tracing = True
+            self.baseline = self._snapshot()
+            self.final = None
+            self.started_at = datetime.utcnow()
+            self.ends_at = datetime.utcfromtimestamp(time.time() + seconds)
+            self._timer = threading.Timer(seconds, self.finish)
+            self._timer.daemon = True
+            self._timer.start()
+        logger.info(f"Memory profiling started ({frames} frames, {seconds}s window)")
+        return self.status()
+
+    def finish(self):
+        """Sfârșitul ferestrei: păstrează snapshot-ul final și oprește tracemalloc."""
+        with self._lock:
+            if self.baseline is None or self.final is not None:
+                return
+            self._cancel_timer()
+            self.final = self._snapshot()
+            self.ends_at = datetime.utcnow()
+            self._stop_tracing()
+        logger.info("Memory profiling window finished")
+
+    def reset(self):
+        with self._lock:
+            self._cancel_timer()
+            self._stop_tracing()
+            self.baseline = self.final = self.started_at = self.ends_at = None
+
+    def _cancel_timer(self):
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.cancel()
+        self._timer = None
+
+    def _stop_tracing(self):
+        if self._owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracing = False
+
+    def status(self):
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'tracing': tracemalloc.is_tracing(),
+            'frames': tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            'window_started_at': self.started_at.isoformat() if self.started_at else None,
+            'window_ends_at': self.ends_at.isoformat() if self.ends_at else None,
+            'finished': self.final is not None,
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'tracemalloc_overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+        }
+
+    def report(self, group_by, limit, view_functions):
+        """Primele `limit` diferențe față de referință, ordonate după memoria adăugată.
+
+        Returnează None dacă nu există o fereastră pornită.
+        """
+        with self._lock:
+            baseline, snapshot = self.baseline, self.final
+            if baseline is None:
+                return None
+            if snapshot is None:
+                snapshot = self._snapshot()
+        if group_by == 'endpoint':
+            entries = self._by_endpoint(snapshot.compare_to(baseline, 'traceback'), view_functions)
+        else:
+            entries = [
+                {
+                    'location': _location(stat.traceback, group_by),
+                    'size_diff': stat.size_diff,
+                    'size': stat.size,
+                    'count_diff': stat.count_diff,
+                    'count': stat.count,
+                }
+                for stat in snapshot.compare_to(baseline, group_by)
+            ]
+        entries = sorted(entries, key=lambda entry: entry['size_diff'], reverse=True)[:limit]
+        return {**self.status(), 'group_by': group_by, 'top': entries}
+
+    @staticmethod
+    def _by_endpoint(diffs, view_functions):
+        ranges = _view_line_ranges(view_functions)
+        totals = defaultdict(lambda: {'size_diff': 0, 'size': 0, 'count_diff': 0, 'count': 0})
+        for stat in diffs:
+            total = totals[_endpoint_for(stat.traceback, ranges)]
+            total['size_diff'] += stat.size_diff
+            total['size'] += stat.size
+            total['count_diff'] += stat.count_diff
+            total['count'] += stat.count
+        # None = alocări fără un view în traceback (alte thread-uri, importuri
+        # sau traceback-uri mai adânci decât CRM_PROFILE_MEMORY_FRAMES)
+        return [{'endpoint': endpoint, **total} for endpoint, total in totals.items()]
+
+
+def _location(traceback, group_by):
+    if group_by == 'filename':
+        return _short_path(traceback[0].filename)
+    if group_by == 'lineno':
+        return f"{_short_path(traceback[0].filename)}:{traceback[0].lineno}"
+    # 'traceback': de la alocare spre rădăcină
+    return [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in reversed(traceback)]
+
+
+memory_profiler = MemoryProfiler()
+
+
+def init_profiling(app):
+    """Profilarea cererilor cu `?_profile=` (doar cu CRM_ADMIN_TOKEN setat)."""
+    app.config.setdefault('CRM_PROFILING', True)
+    app.config.setdefault('CRM_PROFILE_SAMPLE_INTERVAL_MS', 1)
+    app.config.setdefault('CRM_PROFILE_MEMORY_FRAMES', 32)
+    app.config.setdefault('CRM_PROFILE_MEMORY_MAX_SECONDS', 600)
+    if not app.config['CRM_PROFILING']:
+        return
+    app.wsgi_app = ProfilingMiddleware(app, app.wsgi_app)
+    logger.debug("Request profiling enabled (?_profile=)")
+
+
+def register_profiling_routes(bp):
+    """Register the tracemalloc endpoints (require CRM_ADMIN_TOKEN)."""
+
+    @bp.route('/api/admin/profile/memory', methods=['POST'])
+    @admin_required
+    def start_memory_profile():
+        """Pornește o fereastră tracemalloc. Body opțional: {"seconds": 60, "frames": 32}."""
+        data = request.get_json(silent=True) or {}
+        max_seconds = current_app.config['CRM_PROFILE_MEMORY_MAX_SECONDS']
+        try:
+            seconds = float(data.get('seconds', min(60, max_seconds)))
+            frames = int(data.get('frames', current_app.config['CRM_PROFILE_MEMORY_FRAMES']))
+        except (TypeError, ValueError):
+            return jsonify({"error": "seconds and frames must be numbers"}), 400
+        if not 0 < seconds <= max_seconds:
+            return jsonify({"error": f"seconds must be between 0 and {max_seconds}"}), 400
+        if not 1 <= frames <= 256:
+            return jsonify({"error": "frames must be between 1 and 256"}), 400
+        try:
+            return jsonify(memory_profiler.start(frames, seconds)), 201
+        except Exception as e:
+            logger.error(f"Error starting memory profiling: {str(e)}")
+            return jsonify({"error": "Failed to start memory profiling"}), 500
+
+    @bp.route('/api/admin/profile/memory', methods=['GET'])
+    @admin_required
+    def get_memory_profile():
+        """Alocările adăugate de la snapshot-ul de referință.
+
+        Query: group_by=lineno|filename|traceback|endpoint (implicit lineno), limit=20.
+        """
+        group_by = request.args.get('group_by', 'lineno')
+        if group_by not in MEMORY_GROUPS:
+            return jsonify({"error": f"group_by must be one of: {', '.join(MEMORY_GROUPS)}"}), 400
+        limit = request.args.get('limit', 20, type=int)
+        try:
+            report = memory_profiler.report(group_by, max(1, limit), current_app.view_functions)
+        except Exception as e:
+            logger.error(f"Error building memory profile: {str(e)}")
+            return jsonify({"error": "Failed to build memory profile"}), 500
+        if report is None:
+            return jsonify({"error": "Memory profiling is not running (POST /api/admin/profile/memory)"}), 409
+        return jsonify(report), 200
+
+    @bp.route('/api/admin/profile/memory', methods=['DELETE'])
+    @admin_required
+    def stop_memory_profile():
+        """Oprește tracemalloc și renunță la snapshot-uri."""
+        memory_profiler.reset()
+        return jsonify(memory_profiler.status()), 200
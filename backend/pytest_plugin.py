@@ -0,0 +1,76 @@
+"""Fixture-uri pytest peste bazele șablon din backend/testing.py.
+
+Activare, în conftest.py:
+
+    pytest_plugins = ['backend.pytest_plugin']
+
+- `crm_app`: aplicația de test, pe o copie a șablonului făcută o dată per sesiune;
+- `crm_db` / `crm_client`: db.session și clientul de test într-o tranzacție
+  anulată după fiecare test;
+- `crm_isolated_app`: o aplicație cu propria copie în memorie, pentru testele
+  care scriu din alte thread-uri (/api/batch) sau verifică commit-uri reale.
+
+Setul de date se alege suprascriind `crm_seed` (ex: 100k interacțiuni), iar
+configurația aplicației suprascriind `crm_config`. Șabloanele sunt păstrate în
+cache-ul pytest (.pytest_cache) între rulări.
+"""
+import pytest
+
+from backend.app import create_app, db
+from backend.testing import (
+    default_template_dir, template_database, clone_database, clone_into_app, transactional_session, seed_sample_data
+)
+
+# Dispecerul outbox rulează la sfârșitul cererii, pe conexiunea testului
+TEST_CONFIG = {'TESTING': True, 'CRM_OUTBOX_DISPATCHER': 'inline'}
+
+
+@pytest.fixture(scope='session')
+def crm_seed():
+    """(funcție de seed, parametri) pentru baza șablon."""
+    return seed_sample_data, {'contacts': 200, 'interactions': 2000, 'tasks': 200, 'meetings': 50}
+
+
+@pytest.fixture(scope='session')
+def crm_config():
+    """Configurație suplimentară pentru aplicațiile de test."""
+    return {}
+
+
+@pytest.fixture(scope='session')
+def crm_template(request, crm_seed):
+    seeder, params = crm_seed
+    cache = getattr(request.config, 'cache', None)  # None cu -p no:cacheprovider
+    directory = str(cache.mkdir('crm-templates')) if cache is not None else default_template_dir()
+    return template_database(seeder, directory=directory, **params)
+
+
+@pytest.fixture(scope='session')
+def crm_app(crm_template, crm_config, tmp_path_factory):
+    path = tmp_path_factory.mktemp('crm') / 'crm.db'
+    clone_database(crm_template, str(path))
+    app = create_app({**TEST_CONFIG, **crm_config, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{path}"})
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def crm_db(crm_app):
+    with transactional_session(crm_app) as session:
+        yield session
+
+
+@pytest.fixture
+def crm_client(crm_app, crm_db):
+    return crm_app.test_client()
+
+
+@pytest.fixture
+def crm_isolated_app(crm_template, crm_config):
+    app = clone_into_app(
+        create_app({**TEST_CONFIG, **crm_config, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'}), crm_template
+    )
+    yield app
+    with app.app_context():
+        db.engine.dispose()
@@ -0,0 +1,203 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, insert, delete, func, literal
+
+from backend.app import db
+from backend.models import Notification, NotificationArchive
+from backend.tenancy import known_databases, database_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+ARCHIVED_COLUMNS = (
+    'message', 'is_read', 'created_at', 'link_contact_id', 'link_company_id', 'link_interaction_id'
+)
+
+
+# ---------- Reading (unread-first) ----------
+
+def fetch_notifications(limit=DEFAULT_PAGE_SIZE, unread_only=False, session=None):
+    """Notificările necitite (cele mai recente primele), apoi cele citite, cel mult `limit`.
+
+    Două interogări separate în loc de ORDER BY is_read, created_at DESC: fiecare
+    este o parcurgere a indexului (is_read, created_at) oprită după `limit` rânduri,
+    deci costul nu depinde de mărimea tabelei.
+    """
+    session = session or db.session
+    notifications = session.scalars(
+        select(Notification).where(Notification.is_read.is_(False))
+        .order_by(Notification.created_at.desc()).limit(limit)
+    ).all()
+    remaining = limit - len(notifications)
+    if remaining > 0 and not unread_only:
+        notifications += session.scalars(
+            select(Notification).where(Notification.is_read.is_(True))
+            .order_by(Notification.created_at.desc()).limit(remaining)
+        ).all()
+    return notifications
+
+
+# Cerută de fiecare pagină (badge-ul din Navbar): construită o dată, vezi backend/statements.py
+_COUNT_UNREAD = select(func.count(Notification.id)).where(Notification.is_read.is_(False))
+
+
+def count_unread_notifications(session=None):
+    session = session or db.session
+    return session.scalar(_COUNT_UNREAD)
+
+
+def parse_notification_args(args):
+    """Citește ?limit= și ?unread= din query string. Ridică ValueError dacă sunt invalide."""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    unread_only = str(args.get('unread', 'false')).lower() == 'true'
+    return limit, unread_only
+
+
+# ---------- Retention ----------
+
+def _expired_read_ids(cutoff, batch_size):
+    # Folosește indexul (is_read, created_at)
+    return db.session.scalars(
+        select(Notification.id)
+        .where(Notification.is_read.is_(True), Notification.created_at < cutoff)
+        .order_by(Notification.created_at)
+        .limit(batch_size)
+    ).all()
+
+
+def _over_limit_targets(max_per_target):
+    """(coloană, țintă) pentru fiecare contact și companie cu peste `max_per_target` notificări citite.
+
+    O singură numărare per coloană și per prune, doar pe index. Companiile sunt
+    numărate după ce contactele au fost arhivate (generatorul e leneș).
+    """
+    for column in (Notification.link_contact_id, Notification.link_company_id):
+        # is_read în FILTER, nu în WHERE: planificatorul parcurge indexul (țintă, is_read, created_at)
+        # în ordinea țintelor, fără B-tree temporar pentru GROUP BY
+        targets = db.session.scalars(
+            select(column).where(column.isnot(None)).group_by(column)
+            .having(func.count().filter(Notification.is_read.is_(True)) > max_per_target)
+        ).all()
+        for target in targets:
+            yield column, target
+
+
+def _over_limit_ids(column, target, max_per_target, batch_size):
+    # LIMIT batch_size OFFSET max_per_target pe indexul (țintă, is_read, created_at):
+    # costul depinde de notificările țintei, nu de mărimea tabelei
+    return db.session.scalars(
+        select(Notification.id)
+        .where(column == target, Notification.is_read.is_(True))
+        .order_by(Notification.created_at.desc(), Notification.id.desc())
+        .offset(max_per_target)
+        .limit(batch_size)
+    ).all()
+
+
+def archive_notifications(ids, archived_at=None):
+    """Mută notificările în notification_archive (INSERT ... SELECT + DELETE), în tranzacția curentă."""
+    if not ids:
+        return 0
+    archived_at = archived_at or datetime.utcnow()
+    source = select(
+        Notification.id, *[getattr(Notification, column) for column in ARCHIVED_COLUMNS], literal(archived_at)
+    ).where(Notification.id.in_(ids))
+    db.session.execute(
+        insert(NotificationArchive).from_select(['notification_id', *ARCHIVED_COLUMNS, 'archived_at'], source)
+    )
+    db.session.execute(
+        delete(Notification).where(Notification.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    return len(ids)
+
+
+def _archive_in_batches(select_ids):
+    moved = 0
+    while True:
+        ids = select_ids()
+        if not ids:
+            return moved
+        # O tranzacție scurtă per lot: scrierile concurente nu așteaptă după tot prune-ul
+        moved += archive_notifications(ids)
+        db.session.commit()
+
+
+def prune_notifications(ttl_days=None, max_per_target=None, batch_size=None, now=None):
+    """Aplică politica de retenție. Returnează {'expired': n, 'over_limit': m}.
+
+    - notificările citite mai vechi de `ttl_days` zile sunt arhivate;
+    - pentru fiecare contact și fiecare companie legată rămân cel mult
+      `max_per_target` notificări citite, cele mai vechi sunt arhivate;
+      notificările necitite nu sunt arhivate niciodată.
+    Valorile lipsă sunt luate din configurația aplicației; 0 dezactivează regula.
+    """
+    config = current_app.config
+    ttl_days = config['CRM_NOTIFICATION_TTL_DAYS'] if ttl_days is None else ttl_days
+    max_per_target = config['CRM_NOTIFICATION_MAX_PER_TARGET'] if max_per_target is None else max_per_target
+    batch_size = batch_size or config['CRM_NOTIFICATION_ARCHIVE_BATCH']
+
+    result = {'expired': 0, 'over_limit': 0}
+    try:
+        if ttl_days:
+            cutoff = (now or datetime.utcnow()) - timedelta(days=ttl_days)
+            result['expired'] = _archive_in_batches(lambda: _expired_read_ids(cutoff, batch_size))
+        if max_per_target:
+            for column, target in _over_limit_targets(max_per_target):
+                result['over_limit'] += _archive_in_batches(
+                    lambda: _over_limit_ids(column, target, max_per_target, batch_size)
+                )
+    except Exception:
+        db.session.rollback()
+        raise
+    if result['expired'] or result['over_limit']:
+        logger.info(f"Archived notifications: {result}")
+    return result
+
+
+def start_retention_scheduler(app):
+    """Pornește un thread daemon care rulează periodic `prune_notifications` pe fiecare bază."""
+    interval = app.config.get('CRM_NOTIFICATION_RETENTION_INTERVAL_SECONDS', 0)
+    if not interval:
+        return None
+    if app.extensions.get('crm_retention_scheduler_pid') == os.getpid():
+        return None
+    app.extensions['crm_retention_scheduler_pid'] = os.getpid()
+
+    def loop():
+        while True:
+            for tenant in known_databases(app):
+                with database_context(app, tenant):
+                    try:
+                        prune_notifications()
+                    except Exception as e:
+                        logger.error(f"Error pruning notifications of {tenant or 'default database'}: {str(e)}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name='crm-notification-retention', daemon=True)
+    thread.start()
+    logger.debug(f"Notification retention scheduler started (every {interval}s)")
+    return thread
+
+
+def init_retention(app):
+    app.config.setdefault('CRM_NOTIFICATION_TTL_DAYS', 30)
+    app.config.setdefault('CRM_NOTIFICATION_MAX_PER_TARGET', 50)
+    app.config.setdefault('CRM_NOTIFICATION_ARCHIVE_BATCH', 500)
+    app.config.setdefault('CRM_NOTIFICATION_RETENTION_INTERVAL_SECONDS', 0)
+
+    if app.config['CRM_NOTIFICATION_RETENTION_INTERVAL_SECONDS']:
+        # Pornit la prima cerere din fiecare proces, nu la import (compatibil cu --preload)
+        @app.before_request
+        def ensure_retention_scheduler():
+            start_retention_scheduler(app)
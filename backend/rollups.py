@@ -0,0 +1,435 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from flask import request, jsonify
+from sqlalchemy import event, func, select, insert, update, delete, and_, inspect
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.orm import object_session
+
+from backend.app import db
+from backend.routing import read_only
+from backend.coldstorage import cold_enabled, interaction_source
+from backend.tenancy import known_databases, database_context
+from backend.models import (
+    Interaction, Task, Contact, TaskStatus, SalesStage,
+    InteractionDailyRollup, TaskStatusSnapshot, SalesStageSnapshot
+)
+
+logger = logging.getLogger(__name__)
+
+# Tipurile de interacțiuni afișate mereu în rapoarte, chiar dacă au count 0
+INTERACTION_TYPES = ['Call', 'Email', 'Meeting', 'Note']
+GRANULARITIES = ('day', 'week', 'month')
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 3660
+# Intervalul scheduler-ului în modul batch când CRM_ROLLUP_INTERVAL_SECONDS lipsește
+DEFAULT_BATCH_INTERVAL_SECONDS = 300
+
+_ROLLUP_KEY = ('day', 'interaction_type', 'company_id')
+_listeners_installed = False
+
+
+# ---------- Incremental maintenance ----------
+
+def _interaction_key(interaction_date, interaction_type, company_id):
+    day = (interaction_date or datetime.utcnow()).date()
+    return (day, interaction_type, company_id or 0)
+
+
+def _pending_deltas(target):
+    session = object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault('interaction_rollup_deltas', Counter())
+
+
+def _old_value(state, attr):
+    history = state.attrs[attr].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.obj(), attr)
+
+
+def _on_interaction_insert(mapper, connection, target):
+    deltas = _pending_deltas(target)
+    if deltas is not None:
+        deltas[_interaction_key(target.interaction_date, target.interaction_type, target.company_id)] += 1
+
+
+def _on_interaction_update(mapper, connection, target):
+    deltas = _pending_deltas(target)
+    if deltas is None:
+        return
+    state = inspect(target)
+    old_key = _interaction_key(
+        _old_value(state, 'interaction_date'),
+        _old_value(state, 'interaction_type'),
+        _old_value(state, 'company_id')
+    )
+    new_key = _interaction_key(target.interaction_date, target.interaction_type, target.company_id)
+    if old_key != new_key:
+        deltas[old_key] -= 1
+        deltas[new_key] += 1
+
+
+def _on_interaction_delete(mapper, connection, target):
+    deltas = _pending_deltas(target)
+    if deltas is not None:
+        deltas[_interaction_key(target.interaction_date, target.interaction_type, target.company_id)] -= 1
+
+
+def _on_after_flush(session, flush_context):
+    deltas = session.info.pop('interaction_rollup_deltas', None)
+    if deltas:
+        apply_count_deltas(session.connection(), InteractionDailyRollup, _ROLLUP_KEY, deltas)
+
+
+def apply_count_deltas(connection, model, key_names, deltas, value_column='count'):
+    """Adaugă delta-urile {cheie: delta} peste rândurile de rollup existente (upsert).
+
+    Folosit atât de listener-ul de flush cât și de căile bulk care scriu
+    direct cu Core și nu trec prin evenimentele ORM. Cu un tuple de coloane
+    în `value_column`, fiecare delta este un tuple de aceeași lungime.
+    """
+    table = model.__table__
+    multiple = isinstance(value_column, tuple)
+    value_columns = value_column if multiple else (value_column,)
+    rows = []
+    for key, delta in deltas.items():
+        values = delta if multiple else (delta,)
+        if any(values):
+            rows.append(dict(zip(key_names, key), **dict(zip(value_columns, values))))
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_names],
+            set_={column: table.c[column] + stmt.excluded[column] for column in value_columns}
+        )
+        connection.execute(stmt, rows)
+        return
+
+    # Fallback portabil: UPDATE, apoi INSERT dacă rândul nu există încă
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(and_(*[table.c[name] == row[name] for name in key_names]))
+            .values({column: table.c[column] + row[column] for column in value_columns})
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+
+def install_rollup_listeners():
+    """Register the ORM events that keep interaction rollups up to date."""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Interaction, 'after_insert', _on_interaction_insert)
+    event.listen(Interaction, 'after_update', _on_interaction_update)
+    event.listen(Interaction, 'after_delete', _on_interaction_delete)
+    event.listen(db.session, 'after_flush', _on_after_flush)
+    _listeners_installed = True
+
+
+# ---------- Batch maintenance ----------
+
+def rebuild_interaction_rollups(start=None, end=None):
+    """Recalculează rollup-urile din tabela Interaction pentru intervalul [start, end].
+
+    Fără interval, reconstruiește totul (backfill după instalare sau după o
+    perioadă în care modul incremental a fost dezactivat).
+    """
+    rollup = InteractionDailyRollup.__table__
+    # Include și interacțiunile mutate în cold storage (backend/coldstorage.py)
+    include_cold = cold_enabled()
+    source_table = interaction_source(include_cold)
+    day_expr = func.date(source_table.c.interaction_date)
+    company_expr = func.coalesce(source_table.c.company_id, 0)
+
+    clear = delete(rollup)
+    source = select(
+        day_expr,
+        source_table.c.interaction_type,
+        company_expr,
+        func.count(source_table.c.id)
+    ).where(source_table.c.interaction_date.isnot(None))
+
+    if start:
+        clear = clear.where(rollup.c.day >= start)
+        source = source.where(source_table.c.interaction_date >= datetime.combine(start, datetime.min.time()))
+    if end:
+        clear = clear.where(rollup.c.day <= end)
+        source = source.where(source_table.c.interaction_date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+
+    source = source.group_by(day_expr, source_table.c.interaction_type, company_expr)
+
+    db.session.execute(clear)
+    rows = [
+        {'day': _as_date(day), 'interaction_type': interaction_type, 'company_id': company_id, 'count': count}
+        for day, interaction_type, company_id, count in db.session.execute(
+            source, bind_arguments={'bind': db.engine} if include_cold else None
+        ).all()
+    ]
+    if rows:
+        db.session.execute(insert(rollup), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def take_snapshots(day=None):
+    """Salvează numărul curent de task-uri pe status și de contacte pe etapă de vânzare."""
+    day = day or date.today()
+
+    task_counts = db.session.query(Task.status, func.count(Task.id)).group_by(Task.status).all()
+    stage_counts = db.session.query(Contact.sales_stage, func.count(Contact.id)).filter(
+        Contact.sales_stage.isnot(None)
+    ).group_by(Contact.sales_stage).all()
+
+    db.session.execute(delete(TaskStatusSnapshot).where(TaskStatusSnapshot.day == day))
+    db.session.execute(delete(SalesStageSnapshot).where(SalesStageSnapshot.day == day))
+    if task_counts:
+        db.session.execute(insert(TaskStatusSnapshot), [
+            {'day': day, 'status': status.name, 'count': count} for status, count in task_counts
+        ])
+    if stage_counts:
+        db.session.execute(insert(SalesStageSnapshot), [
+            {'day': day, 'stage': stage.value, 'count': count} for stage, count in stage_counts
+        ])
+    db.session.commit()
+
+
+def run_periodic_batch(app):
+    """One scheduler tick: refresh recent rollups (batch mode) and today's snapshots.
+
+    Runs on the default database and on every known tenant database.
+    """
+    for tenant in known_databases(app):
+        with database_context(app, tenant):
+            try:
+                if app.config.get('CRM_ROLLUP_MODE', 'incremental') == 'batch':
+                    today = date.today()
+                    days = app.config.get('CRM_ROLLUP_BATCH_DAYS', 2)
+                    rebuild_interaction_rollups(today - timedelta(days=days - 1), today)
+                take_snapshots()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error refreshing report rollups for {tenant or 'default database'}: {str(e)}")
+
+
+def start_rollup_scheduler(app):
+    """Pornește un thread daemon care rulează periodic `run_periodic_batch`."""
+    interval = app.config.get('CRM_ROLLUP_INTERVAL_SECONDS', 0)
+    if not interval:
+        return None
+    if app.extensions.get('crm_rollup_scheduler_pid') == os.getpid():
+        return None
+    app.extensions['crm_rollup_scheduler_pid'] = os.getpid()
+
+    def loop():
+        while True:
+            run_periodic_batch(app)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name='crm-rollup-scheduler', daemon=True)
+    thread.start()
+    logger.debug(f"Rollup scheduler started (every {interval}s)")
+    return thread
+
+
+def init_rollups(app):
+    app.config.setdefault('CRM_ROLLUP_MODE', 'incremental')  # 'incremental' sau 'batch'
+    app.config.setdefault('CRM_ROLLUP_INTERVAL_SECONDS', 0)
+    app.config.setdefault('CRM_ROLLUP_BATCH_DAYS', 2)
+    if app.config['CRM_ROLLUP_MODE'] == 'incremental':
+        install_rollup_listeners()
+    elif not app.config['CRM_ROLLUP_INTERVAL_SECONDS']:
+        # Fără listener-e și fără scheduler rapoartele ar rămâne înghețate
+        logger.warning(
+            "CRM_ROLLUP_MODE=batch needs CRM_ROLLUP_INTERVAL_SECONDS; "
+            f"refreshing rollups every {DEFAULT_BATCH_INTERVAL_SECONDS}s"
+        )
+        app.config['CRM_ROLLUP_INTERVAL_SECONDS'] = DEFAULT_BATCH_INTERVAL_SECONDS
+
+    if app.config['CRM_ROLLUP_INTERVAL_SECONDS']:
+        # Pornit la prima cerere din fiecare proces, nu la import (compatibil cu --preload)
+        @app.before_request
+        def ensure_rollup_scheduler():
+            start_rollup_scheduler(app)
+
+
+# ---------- Reading ----------
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def iter_periods(start, end, granularity):
+    current = period_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == 'day':
+            current += timedelta(days=1)
+        elif granularity == 'week':
+            current += timedelta(days=7)
+        else:
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def parse_report_range(args):
+    """Citește start/end/granularity din query string. Ridică ValueError pentru valori invalide."""
+    end = date.fromisoformat(args['end']) if args.get('end') else date.today()
+    start = date.fromisoformat(args['start']) if args.get('start') else end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    granularity = args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if start > end:
+        raise ValueError("start must be before end")
+    if (end - start).days > MAX_WINDOW_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_WINDOW_DAYS} days")
+    return start, end, granularity
+
+
+def interaction_counts_by_type(start=None, end=None, company_id=None, session=None):
+    """Returnează {tip: count} din rollup-uri, opțional limitat la un interval de zile.
+
+    `session` permite rularea pe altă sesiune decât db.session (ex: handler-ele ASGI).
+    """
+    query = (session or db.session).query(
+        InteractionDailyRollup.interaction_type,
+        func.sum(InteractionDailyRollup.count)
+    )
+    if start:
+        query = query.filter(InteractionDailyRollup.day >= start)
+    if end:
+        query = query.filter(InteractionDailyRollup.day <= end)
+    if company_id is not None:
+        query = query.filter(InteractionDailyRollup.company_id == company_id)
+    report = {interaction_type: int(count or 0) for interaction_type, count in query.group_by(InteractionDailyRollup.interaction_type).all()}
+    for interaction_type in INTERACTION_TYPES:
+        report.setdefault(interaction_type, 0)
+    return report
+
+
+def _snapshot_series(model, key_attr, start, end, granularity, all_keys):
+    """Pentru fiecare perioadă, păstrează ultimul snapshot disponibil din acea perioadă."""
+    key_column = getattr(model, key_attr)
+    rows = db.session.query(model.day, key_column, model.count).filter(
+        model.day >= start, model.day <= end
+    ).order_by(model.day).all()
+
+    latest = {}
+    for day, key, count in rows:
+        bucket = period_start(day, granularity)
+        entry = latest.get(bucket)
+        if entry is None or entry['as_of'] < day:
+            entry = latest[bucket] = {'as_of': day, 'counts': {k: 0 for k in all_keys}}
+        entry['counts'][key] = count
+
+    return [
+        {
+            'period': period.isoformat(),
+            'as_of': latest[period]['as_of'].isoformat() if period in latest else None,
+            'counts': latest[period]['counts'] if period in latest else None
+        }
+        for period in iter_periods(start, end, granularity)
+    ]
+
+
+def register_report_routes(bp):
+    """Register the rollup-backed report endpoints."""
+
+    @bp.route('/api/reports/interactions-timeseries', methods=['GET'])
+    @read_only
+    def get_report_interactions_timeseries():
+        """Interactions per period and type, read from the daily rollups."""
+        try:
+            start, end, granularity = parse_report_range(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            query = db.session.query(
+                InteractionDailyRollup.day,
+                InteractionDailyRollup.interaction_type,
+                func.sum(InteractionDailyRollup.count)
+            ).filter(InteractionDailyRollup.day >= start, InteractionDailyRollup.day <= end)
+
+            company_id = request.args.get('company_id', type=int)
+            if company_id is not None:
+                query = query.filter(InteractionDailyRollup.company_id == company_id)
+            interaction_type = request.args.get('interaction_type')
+            if interaction_type:
+                query = query.filter(InteractionDailyRollup.interaction_type == interaction_type)
+
+            rows = query.group_by(InteractionDailyRollup.day, InteractionDailyRollup.interaction_type).all()
+
+            buckets = {
+                period: {'period': period.isoformat(), 'counts': {t: 0 for t in INTERACTION_TYPES}, 'total': 0}
+                for period in iter_periods(start, end, granularity)
+            }
+            for day, row_type, count in rows:
+                bucket = buckets[period_start(_as_date(day), granularity)]
+                bucket['counts'][row_type] = bucket['counts'].get(row_type, 0) + int(count)
+                bucket['total'] += int(count)
+
+            return jsonify({
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'granularity': granularity,
+                'series': list(buckets.values())
+            }), 200
+        except Exception as e:
+            logger.error(f"Error generating interactions timeseries report: {str(e)}")
+            return jsonify({"error": "Failed to generate report"}), 500
+
+    @bp.route('/api/reports/task-status-history', methods=['GET'])
+    @read_only
+    def get_report_task_status_history():
+        """Task counts per status over time, from the daily snapshots."""
+        try:
+            start, end, granularity = parse_report_range(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            series = _snapshot_series(TaskStatusSnapshot, 'status', start, end, granularity,
+                                      list(TaskStatus.__members__.keys()))
+            return jsonify({'start': start.isoformat(), 'end': end.isoformat(),
+                            'granularity': granularity, 'series': series}), 200
+        except Exception as e:
+            logger.error(f"Error generating task status history report: {str(e)}")
+            return jsonify({"error": "Failed to generate report"}), 500
+
+    @bp.route('/api/reports/sales-stage-history', methods=['GET'])
+    @read_only
+    def get_report_sales_stage_history():
+        """Contacts per sales stage over time, from the daily snapshots."""
+        try:
+            start, end, granularity = parse_report_range(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            series = _snapshot_series(SalesStageSnapshot, 'stage', start, end, granularity,
+                                      [stage.value for stage in SalesStage])
+            return jsonify({'start': start.isoformat(), 'end': end.isoformat(),
+                            'granularity': granularity, 'series': series}), 200
+        except Exception as e:
+            logger.error(f"Error generating sales stage history report: {str(e)}")
+            return jsonify({"error": "Failed to generate report"}), 500
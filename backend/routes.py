@@ -1,19 +1,103 @@
 import logging
-from flask import request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from backend.app import db
 from backend.models import Contact, Company, Interaction, Notification, Meeting, Task
-from sqlalchemy import func
-from datetime import datetime
-from backend.models import TaskStatus
+from datetime import datetime, date
+from backend.rollups import interaction_counts_by_type, register_report_routes
+from backend.timeline import register_timeline_routes
+from backend.updates import PatchError, conditional_update, serialize_row, register_patch_routes
+from backend.batch import register_batch_routes, init_batch
+from backend.writequeue import run_write, WriteTimeout, write_timeout_response
+from backend.routing import read_only
+from backend.coldstorage import count_interactions, fetch_interactions, parse_interaction_filters, delete_cold_interaction
+from backend.retention import fetch_notifications, count_unread_notifications, parse_notification_args
+from backend.admin import init_admin
+from backend.backup import register_backup_routes, init_backup
+from backend.dedupe import register_dedupe_routes, init_dedupe
+from backend.funnel import register_funnel_routes, init_funnel
+from backend.admission import cost_class, HEAVY, STANDARD, init_admission, register_admission_routes
+from backend.companycounts import init_company_counts
+from backend.inbound import init_inbound, register_inbound_routes
+from backend.outbox import init_outbox, register_outbox_routes, outbox_enabled, notification_message
+from backend.profiling import init_profiling, register_profiling_routes
+from backend.listing import CONTACT_LIST, COMPANY_LIST, wants_page, parse_list_args, fetch_page
+from backend.httpcache import versioned_response
+from backend import statements
 
 logger = logging.getLogger(__name__)
 
-def register_routes(app):
-    """Register all routes with the Flask application."""
+def create_interaction_record(interaction_type, notes, contact_id, company_id):
+    """Inserează o interacțiune și notificarea asociată, fără commit.
+
+    Cu CRM_OUTBOX activ notificarea este construită de dispatcher-ul outbox-ului
+    (evenimentul interaction.created este scris la flush), nu în request.
+    Ridică LookupError dacă contactul sau compania nu există.
+    Returnează interacțiunea serializată (ID-ul e disponibil după flush).
+    """
+    contact = company = None
+    # Opțional: Verifică dacă contact_id sau company_id sunt valide
+    if contact_id:
+        contact = Contact.query.get(contact_id)
+        if not contact:
+            raise LookupError(f"Contact with ID {contact_id} not found")
+    if company_id:
+        company = Company.query.get(company_id)
+        if not company:
+            raise LookupError(f"Company with ID {company_id} not found")
+
+    # Creează noua interacțiune
+    new_interaction = Interaction(
+        interaction_type=interaction_type,
+        notes=notes,
+        contact_id=contact_id,
+        company_id=company_id
+    )
+    db.session.add(new_interaction)
+    # Dăm flush pentru a obține ID-ul interacțiunii înainte de commit
+    db.session.flush()
+    if outbox_enabled():
+        return new_interaction.to_dict()
+
+    # Creează noua notificare
+    new_notification = Notification(
+        message=notification_message(
+            interaction_type, contact.name if contact else None, company.name if company else None
+        ),
+        link_contact_id=contact_id,
+        link_company_id=company_id,
+        link_interaction_id=new_interaction.id # Legăm de ID-ul interacțiunii create
+    )
+    db.session.add(new_notification)
+    db.session.flush()
+
+    return new_interaction.to_dict()
+
+def list_cost(args):
+    # O pagină (vezi backend/listing.py) e ieftină; lista completă citește tot tabelul
+    return STANDARD if wants_page(args) else HEAVY
+
+def register_routes(bp):
+    """Register all API routes on the given blueprint."""
     
-    @app.route('/api/contacts', methods=['GET'])
+    @bp.route('/api/contacts', methods=['GET'])
+    @read_only
+    @cost_class(list_cost)
     def get_contacts():
-        """Get all contacts."""
+        """Get all contacts.
+
+        Cu ?q=, ?company_id=, ?contact_type=, ?sales_stage=, ?sort=, ?limit= sau
+        ?cursor= returnează o pagină: {"items", "next_cursor", "total"}.
+        """
+        if wants_page(request.args):
+            try:
+                params = parse_list_args(request.args, CONTACT_LIST)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            try:
+                return jsonify(fetch_page(db.session, CONTACT_LIST, params)), 200
+            except Exception as e:
+                logger.error(f"Error fetching contacts page: {str(e)}")
+                return jsonify({"error": "Failed to fetch contacts"}), 500
         try:
             # This fetches ALL contacts without pagination
             contacts = Contact.query.all() 
@@ -22,7 +106,7 @@ def register_routes(app):
             logger.error(f"Error fetching contacts: {str(e)}")
             return jsonify({"error": "Failed to fetch contacts"}), 500
     
-    @app.route('/api/contacts/<int:contact_id>', methods=['GET'])
+    @bp.route('/api/contacts/<int:contact_id>', methods=['GET'])
     def get_contact(contact_id):
         """Get a specific contact by ID."""
         try:
@@ -31,12 +115,12 @@ def register_routes(app):
                 return jsonify({"error": "Contact not found"}), 404
             contact_data = contact.to_dict()
             contact_data['interactions'] = [interaction.to_dict() for interaction in contact.interactions.order_by(Interaction.interaction_date.desc()).all()]
-            return jsonify(contact_data), 200
+            return versioned_response(contact_data, contact.version), 200
         except Exception as e:
             logger.error(f"Error fetching contact {contact_id}: {str(e)}")
             return jsonify({"error": f"Failed to fetch contact with ID {contact_id}"}), 500
     
-    @app.route('/api/contacts', methods=['POST'])
+    @bp.route('/api/contacts', methods=['POST'])
     def create_contact():
         """Create a new contact."""
         try:
@@ -67,7 +151,7 @@ def register_routes(app):
             logger.error(f"Error creating contact: {str(e)}")
             return jsonify({"error": "Failed to create contact"}), 500
     
-    @app.route('/api/contacts/<int:contact_id>', methods=['PUT'])
+    @bp.route('/api/contacts/<int:contact_id>', methods=['PUT'])
     def update_contact(contact_id):
         """Update an existing contact."""
         try:
@@ -110,7 +194,7 @@ def register_routes(app):
             logger.error(f"Error updating contact {contact_id}: {str(e)}")
             return jsonify({"error": f"Failed to update contact with ID {contact_id}"}), 500
     
-    @app.route('/api/contacts/<int:contact_id>', methods=['DELETE'])
+    @bp.route('/api/contacts/<int:contact_id>', methods=['DELETE'])
     def delete_contact(contact_id):
         """Delete a contact."""
         try:
@@ -127,14 +211,29 @@ def register_routes(app):
             logger.error(f"Error deleting contact {contact_id}: {str(e)}")
             return jsonify({"error": f"Failed to delete contact with ID {contact_id}"}), 500
     
-    @app.route('/api', methods=['GET'])
+    @bp.route('/api', methods=['GET'])
     def index():
         """Root endpoint for health check."""
         return jsonify({"status": "API is running"}), 200
 
-    @app.route('/api/companies', methods=['GET'])
+    @bp.route('/api/companies', methods=['GET'])
+    @read_only
+    @cost_class(list_cost)
     def get_companies():
-        """Get all companies."""
+        """Get all companies.
+
+        Cu ?q=, ?sort=, ?limit= sau ?cursor= returnează o pagină: {"items", "next_cursor", "total"}.
+        """
+        if wants_page(request.args):
+            try:
+                params = parse_list_args(request.args, COMPANY_LIST)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            try:
+                return jsonify(fetch_page(db.session, COMPANY_LIST, params)), 200
+            except Exception as e:
+                logger.error(f"Error fetching companies page: {str(e)}")
+                return jsonify({"error": "Failed to fetch companies"}), 500
         try:
             companies = Company.query.all()
             return jsonify([company.to_dict() for company in companies]), 200
@@ -142,7 +241,7 @@ def register_routes(app):
             logger.error(f"Error fetching companies: {str(e)}")
             return jsonify({"error": "Failed to fetch companies"}), 500
 
-    @app.route('/api/companies/<int:company_id>', methods=['GET'])
+    @bp.route('/api/companies/<int:company_id>', methods=['GET'])
     def get_company(company_id):
         """Get a specific company by ID."""
         try:
@@ -151,12 +250,12 @@ def register_routes(app):
                 return jsonify({"error": "Company not found"}), 404
             company_data = company.to_dict()
             company_data['interactions'] = [interaction.to_dict() for interaction in company.interactions.order_by(Interaction.interaction_date.desc()).all()]
-            return jsonify(company_data), 200
+            return versioned_response(company_data, company.version), 200
         except Exception as e:
             logger.error(f"Error fetching company {company_id}: {str(e)}")
             return jsonify({"error": f"Failed to fetch company with ID {company_id}"}), 500
 
-    @app.route('/api/companies', methods=['POST'])
+    @bp.route('/api/companies', methods=['POST'])
     def create_company():
         """Create a new company."""
         try:
@@ -181,7 +280,7 @@ def register_routes(app):
             logger.error(f"Error creating company: {str(e)}")
             return jsonify({"error": "Failed to create company"}), 500
 
-    @app.route('/api/companies/<int:company_id>', methods=['PUT'])
+    @bp.route('/api/companies/<int:company_id>', methods=['PUT'])
     def update_company(company_id):
         """Update an existing company."""
         try:
@@ -204,7 +303,7 @@ def register_routes(app):
             logger.error(f"Error updating company {company_id}: {str(e)}")
             return jsonify({"error": f"Failed to update company"}), 500
 
-    @app.route('/api/companies/<int:company_id>', methods=['DELETE'])
+    @bp.route('/api/companies/<int:company_id>', methods=['DELETE'])
     def delete_company(company_id):
         """Delete a company."""
         try:
@@ -221,7 +320,7 @@ def register_routes(app):
             logger.error(f"Error deleting company {company_id}: {str(e)}")
             return jsonify({"error": "Failed to delete company"}), 500
 
-    @app.route('/api/interactions', methods=['POST'])
+    @bp.route('/api/interactions', methods=['POST'])
     def create_interaction():
         """Creează o nouă interacțiune și o notificare asociată."""
         try:
@@ -240,83 +339,58 @@ def register_routes(app):
             if not contact_id and not company_id:
                 return jsonify({"error": "Either contact_id or company_id must be provided"}), 400
             
-            # Opțional: Verifică dacă contact_id sau company_id sunt valide
-            if contact_id:
-                contact = Contact.query.get(contact_id)
-                if not contact:
-                    return jsonify({"error": f"Contact with ID {contact_id} not found"}), 404
-            if company_id:
-                company = Company.query.get(company_id)
-                if not company:
-                     return jsonify({"error": f"Company with ID {company_id} not found"}), 404
-
-            # Creează noua interacțiune
-            new_interaction = Interaction(
-                interaction_type=interaction_type,
-                notes=notes,
-                contact_id=contact_id,
-                company_id=company_id
-            )
-            db.session.add(new_interaction)
-            # Dăm flush pentru a obține ID-ul interacțiunii înainte de commit
-            db.session.flush()
-
-            # Creează mesajul notificării
-            target_info = f"Contact: {contact.name}" if contact_id else f"Company: {company.name}"
-            if contact_id and company_id:
-                 target_info = f"Contact: {contact.name} (Company: {company.name})"
-            
-            notification_message = f"New interaction '{interaction_type}' added for {target_info}."
-            
-            # Creează noua notificare
-            new_notification = Notification(
-                message=notification_message,
-                link_contact_id=contact_id,
-                link_company_id=company_id,
-                link_interaction_id=new_interaction.id # Legăm de ID-ul interacțiunii create
-            )
-            db.session.add(new_notification)
-
-            # Acum facem commit pentru ambele
-            db.session.commit()
-
-            return jsonify(new_interaction.to_dict()), 201
+            unit = lambda: create_interaction_record(interaction_type, notes, contact_id, company_id)
+            # Cu CRM_GROUP_COMMIT activ, scrierea e comisă împreună cu alte cereri
+            interaction_data = run_write(current_app, unit)
+            return jsonify(interaction_data), 201
 
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        except WriteTimeout as e:
+            return write_timeout_response(e)
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error creating interaction and notification: {str(e)}")
             return jsonify({"error": "Failed to create interaction"}), 500
 
-    @app.route('/api/interactions/count', methods=['GET'])
+    @bp.route('/api/interactions/count', methods=['GET'])
+    @read_only
     def get_interactions_count():
         """Returnează numărul total de interacțiuni."""
         try:
-            count = Interaction.query.count()
-            return jsonify({"count": count}), 200
+            return jsonify({"count": count_interactions()}), 200
         except Exception as e:
             logger.error(f"Error counting interactions: {str(e)}")
             return jsonify({"error": "Failed to count interactions"}), 500
 
-    @app.route('/api/interactions', methods=['GET'])
+    @bp.route('/api/interactions', methods=['GET'])
+    @read_only
+    @cost_class(HEAVY)
     def get_interactions():
-        """Returnează o listă cu toate interacțiunile, sortate descrescător după dată."""
+        """Returnează interacțiunile, sortate descrescător după dată.
+
+        Filtre opționale: ?start=, ?end=, ?contact_id=, ?company_id=. Interacțiunile
+        mutate în cold storage sunt incluse doar dacă intervalul cerut le atinge.
+        """
         try:
-            # TODO: Adaugă filtrare opțională (ex: ?contact_id=X, ?company_id=Y) dacă e necesar în viitor
-            interactions = Interaction.query.order_by(Interaction.interaction_date.desc()).all()
-            return jsonify([interaction.to_dict() for interaction in interactions]), 200
+            filters = parse_interaction_filters(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            return jsonify(fetch_interactions(**filters)), 200
         except Exception as e:
             logger.error(f"Error fetching all interactions: {str(e)}")
             return jsonify({"error": "Failed to fetch interactions"}), 500
 
-    @app.route('/api/interactions/<int:interaction_id>', methods=['DELETE'])
+    @bp.route('/api/interactions/<int:interaction_id>', methods=['DELETE'])
     def delete_interaction(interaction_id):
         """Șterge o interacțiune specifică."""
         try:
             interaction = Interaction.query.get(interaction_id)
-            if not interaction:
+            if interaction:
+                db.session.delete(interaction)
+            elif not delete_cold_interaction(interaction_id):
                 return jsonify({"error": "Interaction not found"}), 404
-            
-            db.session.delete(interaction)
             db.session.commit()
             
             return jsonify({"message": f"Interaction with ID {interaction_id} deleted successfully"}), 200
@@ -325,58 +399,62 @@ def register_routes(app):
             logger.error(f"Error deleting interaction {interaction_id}: {str(e)}")
             return jsonify({"error": f"Failed to delete interaction with ID {interaction_id}"}), 500
 
-    @app.route('/api/reports/interactions-by-type', methods=['GET'])
+    @bp.route('/api/reports/interactions-by-type', methods=['GET'])
+    @read_only
     def get_report_interactions_by_type():
         """Returnează un raport cu numărul de interacțiuni grupate după tip."""
         try:
-            # Interogare care grupează după tip și numără intrările pentru fiecare tip
-            report_data = db.session.query(
-                Interaction.interaction_type,
-                func.count(Interaction.id).label('count')
-            ).group_by(Interaction.interaction_type).all()
-            
-            # Formatează rezultatul într-un dicționar {tip: count}
-            report_dict = {row.interaction_type: row.count for row in report_data}
-            
-            # Asigură-te că toate tipurile posibile sunt prezente, chiar dacă au count 0
-            all_types = ['Call', 'Email', 'Meeting', 'Note']
-            for interaction_type in all_types:
-                if interaction_type not in report_dict:
-                    report_dict[interaction_type] = 0
-            
+            # Citim din rollup-urile zilnice în loc de GROUP BY pe toată tabela Interaction.
+            # start/end (YYYY-MM-DD) sunt opționale; fără ele raportul acoperă tot istoricul.
+            start = date.fromisoformat(request.args['start']) if request.args.get('start') else None
+            end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+        except ValueError:
+            return jsonify({"error": "Invalid date format for start or end"}), 400
+        try:
+            report_dict = interaction_counts_by_type(start, end, request.args.get('company_id', type=int))
             return jsonify(report_dict), 200
         except Exception as e:
             logger.error(f"Error generating interactions by type report: {str(e)}")
             return jsonify({"error": "Failed to generate report"}), 500
 
     # === Secțiune Notificări ===
-    @app.route('/api/notifications', methods=['GET'])
+    @bp.route('/api/notifications', methods=['GET'])
+    @read_only
     def get_notifications():
-        """Returnează toate notificările, cele mai recente primele."""
+        """Returnează notificările necitite (cele mai recente primele), apoi cele citite.
+
+        Query: ?limit= (implicit 50, maxim 200), ?unread=true pentru doar necitite.
+        """
+        try:
+            limit, unread_only = parse_notification_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         try:
-            # Poate adăuga filtrare ?is_read=false în viitor
-            notifications = Notification.query.order_by(Notification.created_at.desc()).all()
+            notifications = fetch_notifications(limit, unread_only)
             return jsonify([notification.to_dict() for notification in notifications]), 200
         except Exception as e:
             logger.error(f"Error fetching notifications: {str(e)}")
             return jsonify({"error": "Failed to fetch notifications"}), 500
 
-    @app.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
+    @bp.route('/api/notifications/unread-count', methods=['GET'])
+    @read_only
+    def get_unread_notifications_count():
+        """Returnează numărul de notificări necitite."""
+        try:
+            return jsonify({"unread_count": count_unread_notifications()}), 200
+        except Exception as e:
+            logger.error(f"Error counting unread notifications: {str(e)}")
+            return jsonify({"error": "Failed to count unread notifications"}), 500
+
+    @bp.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
     def mark_notification_read(notification_id):
         """Marchează o notificare specifică ca citită."""
         try:
-            notification = Notification.query.get(notification_id)
-            if not notification:
-                return jsonify({"error": "Notification not found"}), 404
-            
-            if not notification.is_read:
-                notification.is_read = True
-                db.session.commit()
-            
-            # Returnează notificarea actualizată sau doar un mesaj de succes
-            return jsonify(notification.to_dict()), 200 
-            # Sau: return jsonify({"message": "Notification marked as read"}), 200
-            
+            # Un singur UPDATE ... RETURNING în loc de SELECT + UPDATE
+            row = conditional_update(Notification, notification_id, {'is_read': True})
+            return jsonify(serialize_row(row)), 200
+        except PatchError as e:
+            return jsonify({"error": "Notification not found"}), e.status_code
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error marking notification {notification_id} as read: {str(e)}")
@@ -384,37 +462,36 @@ def register_routes(app):
     
     # === Sfârșit Secțiune Notificări ===
 
-    @app.route('/api/meetings', methods=['GET'])
+    @bp.route('/api/meetings', methods=['GET'])
+    @read_only
+    @cost_class(HEAVY)
     def get_meetings():
         """Obține toate întâlnirile."""
         try:
             # Opțional, filtrare pentru a afișa doar întâlnirile viitoare
             show_all = request.args.get('all', 'false').lower() == 'true'
-            if show_all:
-                meetings = Meeting.query.order_by(Meeting.start).all()
-            else:
-                # Filtru pentru a afișa doar întâlnirile viitoare (data de început >= acum)
-                meetings = Meeting.query.filter(Meeting.start >= datetime.utcnow()).order_by(Meeting.start).all()
+            # Fără ?all=true, doar întâlnirile viitoare (data de început >= acum)
+            meetings = statements.list_meetings(None if show_all else datetime.utcnow())
             
             return jsonify([meeting.to_dict() for meeting in meetings]), 200
         except Exception as e:
             logger.error(f"Error fetching meetings: {str(e)}")
             return jsonify({"error": "Failed to fetch meetings"}), 500
 
-    @app.route('/api/meetings/<int:meeting_id>', methods=['GET'])
+    @bp.route('/api/meetings/<int:meeting_id>', methods=['GET'])
     def get_meeting(meeting_id):
         """Obține o întâlnire specifică după ID."""
         try:
-            meeting = Meeting.query.get(meeting_id)
+            meeting = statements.get_meeting(meeting_id)
             if not meeting:
                 return jsonify({"error": "Meeting not found"}), 404
             
-            return jsonify(meeting.to_dict()), 200
+            return versioned_response(meeting.to_dict(), meeting.version), 200
         except Exception as e:
             logger.error(f"Error fetching meeting {meeting_id}: {str(e)}")
             return jsonify({"error": f"Failed to fetch meeting with ID {meeting_id}"}), 500
 
-    @app.route('/api/meetings', methods=['POST'])
+    @bp.route('/api/meetings', methods=['POST'])
     def create_meeting():
         """Creează o nouă întâlnire."""
         try:
@@ -460,7 +537,7 @@ def register_routes(app):
             logger.error(f"Error creating meeting: {str(e)}")
             return jsonify({"error": f"Failed to create meeting: {str(e)}"}), 500
 
-    @app.route('/api/meetings/<int:meeting_id>', methods=['PUT'])
+    @bp.route('/api/meetings/<int:meeting_id>', methods=['PUT'])
     def update_meeting(meeting_id):
         """Actualizează o întâlnire existentă."""
         try:
@@ -517,7 +594,7 @@ def register_routes(app):
             logger.error(f"Error updating meeting {meeting_id}: {str(e)}")
             return jsonify({"error": f"Failed to update meeting with ID {meeting_id}"}), 500
     
-    @app.route('/api/meetings/<int:meeting_id>', methods=['DELETE'])
+    @bp.route('/api/meetings/<int:meeting_id>', methods=['DELETE'])
     def delete_meeting(meeting_id):
         """Șterge o întâlnire."""
         try:
@@ -534,60 +611,49 @@ def register_routes(app):
             logger.error(f"Error deleting meeting {meeting_id}: {str(e)}")
             return jsonify({"error": f"Failed to delete meeting with ID {meeting_id}"}), 500
     
-    @app.route('/api/meetings/upcoming-count', methods=['GET'])
+    @bp.route('/api/meetings/upcoming-count', methods=['GET'])
+    @read_only
     def get_upcoming_meetings_count():
         """Returnează numărul de întâlniri viitoare."""
         try:
-            count = Meeting.query.filter(Meeting.start >= datetime.utcnow()).count()
+            count = statements.count_upcoming_meetings(datetime.utcnow())
             return jsonify({"upcoming_meetings_count": count}), 200
         except Exception as e:
             logger.error(f"Error counting upcoming meetings: {str(e)}")
             return jsonify({"error": "Failed to count upcoming meetings"}), 500
 
     # ---------- Task Routes ----------
-    @app.route('/api/tasks', methods=['GET'])
+    @bp.route('/api/tasks', methods=['GET'])
+    @read_only
+    @cost_class(HEAVY)
     def get_tasks():
         """Get all tasks."""
         try:
-            tasks = []
-            query = db.session.query(Task)
-            
-            # Filter by contact_id if provided
-            contact_id = request.args.get('contact_id')
-            if contact_id:
-                query = query.filter(Task.contact_id == contact_id)
-                
-            # Filter by company_id if provided
-            company_id = request.args.get('company_id')
-            if company_id:
-                query = query.filter(Task.company_id == company_id)
-                
-            # Filter by status if provided
-            status = request.args.get('status')
-            if status:
-                query = query.filter(Task.status == status)
-                
-            # Execute query and convert to dict
-            tasks = [task.to_dict() for task in query.order_by(Task.due_date).all()]
+            # Optional filters: contact_id, company_id, status
+            tasks = [task.to_dict() for task in statements.list_tasks(
+                contact_id=request.args.get('contact_id'),
+                company_id=request.args.get('company_id'),
+                status=request.args.get('status'),
+            )]
             
             return jsonify(tasks), 200
         except Exception as e:
             logger.error(f"Error fetching tasks: {str(e)}")
             return jsonify({"error": "Failed to fetch tasks"}), 500
     
-    @app.route('/api/tasks/<int:task_id>', methods=['GET'])
+    @bp.route('/api/tasks/<int:task_id>', methods=['GET'])
     def get_task(task_id):
         """Get a specific task by ID."""
         try:
-            task = Task.query.get(task_id)
+            task = statements.get_task(task_id)
             if not task:
                 return jsonify({"error": "Task not found"}), 404
-            return jsonify(task.to_dict()), 200
+            return versioned_response(task.to_dict(), task.version), 200
         except Exception as e:
             logger.error(f"Error fetching task {task_id}: {str(e)}")
             return jsonify({"error": f"Failed to fetch task with ID {task_id}"}), 500
     
-    @app.route('/api/tasks', methods=['POST'])
+    @bp.route('/api/tasks', methods=['POST'])
     def create_task():
         """Create a new task."""
         try:
@@ -620,7 +686,7 @@ def register_routes(app):
             logger.error(f"Error creating task: {str(e)}")
             return jsonify({"error": f"Failed to create task: {str(e)}"}), 500
     
-    @app.route('/api/tasks/<int:task_id>', methods=['PUT'])
+    @bp.route('/api/tasks/<int:task_id>', methods=['PUT'])
     def update_task(task_id):
         """Update an existing task."""
         try:
@@ -653,7 +719,7 @@ def register_routes(app):
             logger.error(f"Error updating task {task_id}: {str(e)}")
             return jsonify({"error": f"Failed to update task with ID {task_id}"}), 500
     
-    @app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+    @bp.route('/api/tasks/<int:task_id>', methods=['DELETE'])
     def delete_task(task_id):
         """Delete a task."""
         try:
@@ -670,32 +736,21 @@ def register_routes(app):
             logger.error(f"Error deleting task {task_id}: {str(e)}")
             return jsonify({"error": f"Failed to delete task with ID {task_id}"}), 500
     
-    @app.route('/api/tasks/count', methods=['GET'])
+    @bp.route('/api/tasks/count', methods=['GET'])
+    @read_only
     def get_tasks_count():
         """Get count of tasks grouped by status."""
         try:
-            tasks_count = db.session.query(
-                Task.status, 
-                func.count(Task.id)
-            ).group_by(Task.status).all()
-            
-            # Fix: Use the actual enum values from TaskStatus
-            result = {}
-            for status, count in tasks_count:
-                result[status.name] = count  # Use enum member name (PENDING) instead of value (Pending)
-            
-            # Add any missing statuses with count 0 - use enum member names
-            for status in TaskStatus.__members__.keys():  # This gets ['PENDING', 'IN_PROGRESS', 'COMPLETED', 'OVERDUE']
-                if status not in result:
-                    result[status] = 0
-            
-            return jsonify(result), 200
+            # Keyed by enum member name (PENDING) instead of value (Pending), missing statuses = 0
+            return jsonify(statements.count_tasks_by_status()), 200
         except Exception as e:
             logger.error(f"Error fetching tasks count: {str(e)}")
             return jsonify({"error": "Failed to fetch tasks count"}), 500
             
     # ---------- Sales Pipeline Routes ----------
-    @app.route('/api/sales/pipeline', methods=['GET'])
+    @bp.route('/api/sales/pipeline', methods=['GET'])
+    @read_only
+    @cost_class(HEAVY)
     def get_sales_pipeline():
         """Get contacts grouped by sales stage for pipeline view."""
         try:
@@ -703,7 +758,7 @@ def register_routes(app):
             pipeline_data = {}
             
             # Get all contacts with a sales stage
-            contacts = Contact.query.filter(Contact.sales_stage.isnot(None)).all()
+            contacts = statements.pipeline_contacts()
             
             # Group contacts by sales stage
             for contact in contacts:
@@ -721,3 +776,33 @@ def register_routes(app):
         except Exception as e:
             logger.error(f"Error fetching sales pipeline: {str(e)}")
             return jsonify({"error": "Failed to fetch sales pipeline data"}), 500
+
+    register_report_routes(bp)
+    register_timeline_routes(bp)
+    register_patch_routes(bp)
+    register_batch_routes(bp)
+    register_backup_routes(bp)
+    register_dedupe_routes(bp)
+    register_funnel_routes(bp)
+    register_admission_routes(bp)
+    register_inbound_routes(bp)
+    register_outbox_routes(bp)
+    register_profiling_routes(bp)
+
+
+api_bp = Blueprint('api', __name__)
+register_routes(api_bp)
+
+
+def init_api(app):
+    """Configurație per aplicație necesară rutelor API."""
+    init_batch(app)
+    init_admin(app)
+    init_backup(app)
+    init_dedupe(app)
+    init_funnel(app)
+    init_admission(app)
+    init_company_counts(app)
+    init_inbound(app)
+    init_outbox(app)
+    init_profiling(app)
@@ -0,0 +1,168 @@
+import itertools
+import logging
+import threading
+import time
+
+import sqlalchemy as sa
+from flask import g, request, current_app, has_app_context
+from flask_sqlalchemy.session import Session
+
+from backend.tenancy import tenant_engine
+
+logger = logging.getLogger(__name__)
+
+ROUTE_PRIMARY = 'primary'
+ROUTE_REPLICA = 'replica'
+ROUTE_HEADER = 'X-DB-Route'
+LAST_WRITE_COOKIE = 'crm_last_write'
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+def read_only(view):
+    """Marchează un handler ca read-only: interogările lui pot merge pe replici."""
+    view._crm_read_only = True
+    return view
+
+
+class RoutingSession(Session):
+    """db.session care trimite citirile request-urilor read-only către replici.
+
+    Flush-urile (orice scriere ORM) și request-urile fără marcaj read-only
+    folosesc mereu engine-ul principal. În modul multi-tenant, toate
+    operațiile unui request de tenant merg pe engine-ul tenant-ului.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.bind is not None:
+            # Sesiune legată explicit de o conexiune (tranzacția unui test, backend/testing.py)
+            return self.bind
+        if bind is None and has_app_context() and g.get('db_tenant'):
+            return tenant_engine()
+        if bind is None and not self._flushing and has_app_context() \
+                and g.get('db_route') == ROUTE_REPLICA:
+            replica = current_app.extensions['crm_replicas'].pick()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaSet:
+    """Engine-urile replicilor, create leneș, alese round-robin și filtrate după lag."""
+
+    def __init__(self, uris, max_lag_seconds, lag_check_interval):
+        self.uris = list(uris)
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self._engines = None
+        self._lag = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def engines(self):
+        if self._engines is None:
+            with self._lock:
+                if self._engines is None:
+                    self._engines = [sa.create_engine(uri) for uri in self.uris]
+        return self._engines
+
+    def dispose(self, close=True):
+        if self._engines is not None:
+            for engine in self._engines:
+                engine.dispose(close=close)
+            self._engines = None
+            self._lag.clear()
+
+    def pick(self):
+        """Returnează o replică sănătoasă sau None (=> fallback pe primary)."""
+        if not self.uris:
+            return None
+        engines = self.engines
+        start = next(self._counter)
+        for offset in range(len(engines)):
+            engine = engines[(start + offset) % len(engines)]
+            if self.lag_seconds(engine) <= self.max_lag_seconds:
+                return engine
+        logger.warning("All read replicas are lagging; reading from primary")
+        return None
+
+    def lag_seconds(self, engine):
+        checked_at, lag = self._lag.get(engine, (0, 0.0))
+        now = time.monotonic()
+        if now - checked_at < self.lag_check_interval:
+            return lag
+        lag = measure_replica_lag(engine)
+        self._lag[engine] = (now, lag)
+        return lag
+
+
+def measure_replica_lag(engine):
+    """Lag-ul de replicare în secunde. SQLite (fișier read-only) nu are lag."""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    try:
+        with engine.connect() as connection:
+            lag = connection.execute(sa.text(
+                "SELECT CASE WHEN pg_is_in_recovery() "
+                "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                "ELSE 0 END"
+            )).scalar()
+        return float(lag or 0)
+    except Exception as e:
+        logger.error(f"Error measuring replica lag: {str(e)}")
+        return float('inf')
+
+
+def _choose_route(app):
+    override = request.headers.get(ROUTE_HEADER, '').lower()
+    if override == ROUTE_PRIMARY:
+        return ROUTE_PRIMARY
+    if request.method != 'GET':
+        return ROUTE_PRIMARY
+
+    # Read-your-writes: după o scriere recentă a acestui client citim din primary
+    last_write = request.cookies.get(LAST_WRITE_COOKIE, type=float)
+    if last_write and time.time() - last_write < app.config['CRM_REPLICA_MAX_LAG_SECONDS']:
+        return ROUTE_PRIMARY
+
+    if override == ROUTE_REPLICA:
+        return ROUTE_REPLICA
+    view = app.view_functions.get(request.endpoint)
+    if getattr(view, '_crm_read_only', False) or app.config['CRM_READ_REPLICA_ALL_GETS']:
+        return ROUTE_REPLICA
+    return ROUTE_PRIMARY
+
+
+def init_routing(app):
+    """Configure read replicas and per-request session routing."""
+    app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [])
+    app.config.setdefault('CRM_REPLICA_MAX_LAG_SECONDS', 5)
+    app.config.setdefault('CRM_REPLICA_LAG_CHECK_INTERVAL', 2)
+    app.config.setdefault('CRM_READ_REPLICA_ALL_GETS', False)
+
+    uris = app.config['SQLALCHEMY_REPLICA_URIS']
+    if isinstance(uris, str):
+        uris = [uri.strip() for uri in uris.split(',') if uri.strip()]
+    app.extensions['crm_replicas'] = ReplicaSet(
+        uris,
+        max_lag_seconds=app.config['CRM_REPLICA_MAX_LAG_SECONDS'],
+        lag_check_interval=app.config['CRM_REPLICA_LAG_CHECK_INTERVAL']
+    )
+    if not uris:
+        return
+
+    @app.before_request
+    def select_db_route():
+        g.db_route = _choose_route(app)
+
+    @app.after_request
+    def remember_write(response):
+        if request.method in WRITE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                LAST_WRITE_COOKIE, str(time.time()),
+                max_age=int(app.config['CRM_REPLICA_MAX_LAG_SECONDS']) + 1,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+    logger.debug(f"Read replica routing enabled ({len(uris)} replica(s))")
@@ -0,0 +1,112 @@
+"""Interogările folosite la fiecare cerere, construite o singură dată.
+
+Un select() scris în handler este refăcut la fiecare cerere: obiectele Select,
+opțiunile de încărcare și cheia de cache pentru SQL-ul compilat. Aici fiecare
+interogare este un select() la nivel de modul, cu valorile variabile ca
+bindparam(); la execuție se transmit doar parametrii, iar SQLAlchemy găsește
+SQL-ul compilat în cache-ul engine-ului.
+
+Am preferat select-uri precompilate în locul lambda_stmt: pentru interogările
+mici de aici analiza closure-ului la fiecare apel costă mai mult decât câștigă
+(vezi `python benchmarks/statement_cache.py`). Filtrele opționale ale listei de
+task-uri au câte un select per combinație, creat la prima utilizare.
+
+Funcțiile primesc sesiunea ca argument, ca să poată fi folosite și de
+handler-ele ASGI (backend/asgi.py).
+"""
+from sqlalchemy import select, func, bindparam
+from sqlalchemy.orm import joinedload, selectinload
+
+from backend.app import db
+from backend.models import Contact, Meeting, Task, TaskStatus
+
+_GET_TASK = (
+    select(Task)
+    .options(joinedload(Task.contact), joinedload(Task.company))
+    .where(Task.id == bindparam('task_id'))
+)
+
+_TASK_FILTERS = (
+    ('contact_id', Task.contact_id),
+    ('company_id', Task.company_id),
+    ('status', Task.status),
+)
+# (contact_id?, company_id?, status?) -> select
+_TASK_LISTS = {}
+
+_COUNT_TASKS_BY_STATUS = select(Task.status, func.count(Task.id)).group_by(Task.status)
+
+_GET_MEETING = (
+    select(Meeting)
+    .options(joinedload(Meeting.company), selectinload(Meeting.attendees))
+    .where(Meeting.id == bindparam('meeting_id'))
+)
+
+_ALL_MEETINGS = (
+    select(Meeting)
+    .options(selectinload(Meeting.company), selectinload(Meeting.attendees))
+    .order_by(Meeting.start)
+)
+_UPCOMING_MEETINGS = _ALL_MEETINGS.where(Meeting.start >= bindparam('now'))
+
+_COUNT_UPCOMING_MEETINGS = select(func.count(Meeting.id)).where(Meeting.start >= bindparam('now'))
+
+_PIPELINE_CONTACTS = (
+    select(Contact)
+    .where(Contact.sales_stage.isnot(None))
+    .options(selectinload(Contact.company))
+)
+
+
+def get_task(task_id, session=None):
+    """Task-ul cu contactul și compania, într-o singură interogare (sau None)."""
+    return (session or db.session).scalars(_GET_TASK, {'task_id': task_id}).first()
+
+
+def _task_list_statement(present):
+    stmt = _TASK_LISTS.get(present)
+    if stmt is None:
+        stmt = select(Task).options(selectinload(Task.contact), selectinload(Task.company))
+        for (name, column), used in zip(_TASK_FILTERS, present):
+            if used:
+                stmt = stmt.where(column == bindparam(name))
+        stmt = _TASK_LISTS[present] = stmt.order_by(Task.due_date)
+    return stmt
+
+
+def list_tasks(contact_id=None, company_id=None, status=None, session=None):
+    """Task-urile ordonate după termen; filtrele goale (None, '') sunt ignorate."""
+    values = {'contact_id': contact_id, 'company_id': company_id, 'status': status}
+    params = {name: value for name, value in values.items() if value}
+    present = tuple(name in params for name, _ in _TASK_FILTERS)
+    return (session or db.session).scalars(_task_list_statement(present), params).all()
+
+
+def count_tasks_by_status(session=None):
+    """{'PENDING': n, ...} cu toate statusurile, inclusiv cele fără task-uri."""
+    result = {status.name: count for status, count in (session or db.session).execute(_COUNT_TASKS_BY_STATUS)}
+    for status in TaskStatus.__members__.keys():
+        result.setdefault(status, 0)
+    return result
+
+
+def get_meeting(meeting_id, session=None):
+    """Întâlnirea cu compania și participanții (sau None)."""
+    return (session or db.session).scalars(_GET_MEETING, {'meeting_id': meeting_id}).first()
+
+
+def list_meetings(upcoming_after=None, session=None):
+    """Toate întâlnirile sau doar cele care încep după `upcoming_after`, ordonate după început."""
+    session = session or db.session
+    if upcoming_after is None:
+        return session.scalars(_ALL_MEETINGS).all()
+    return session.scalars(_UPCOMING_MEETINGS, {'now': upcoming_after}).all()
+
+
+def count_upcoming_meetings(now, session=None):
+    return (session or db.session).scalar(_COUNT_UPCOMING_MEETINGS, {'now': now})
+
+
+def pipeline_contacts(session=None):
+    """Contactele care au o etapă de vânzare, cu compania încărcată."""
+    return (session or db.session).scalars(_PIPELINE_CONTACTS).all()
@@ -0,0 +1,185 @@
+"""Mod multi-tenant: fiecare request este rutat către baza de date a tenant-ului său.
+
+Tenant-ul se citește din antetul CRM_TENANT_HEADER sau din subdomeniul lui
+CRM_TENANT_BASE_DOMAIN (ex: acme.crm.example.com -> "acme"). URL-ul bazei este
+CRM_TENANT_URI_TEMPLATE cu {tenant} înlocuit: implicit un fișier SQLite per
+tenant; pentru PostgreSQL un template cu search_path per schemă, ex:
+postgresql://host/crm?options=-csearch_path%3D{tenant}
+
+Engine-urile (și pool-urile lor) sunt păstrate într-un cache LRU limitat la
+CRM_TENANT_MAX_ENGINES; engine-ul scos din cache este închis.
+"""
+import glob
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from flask import g, request, jsonify, current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+TENANT_NAME = re.compile(r'^[a-z0-9][a-z0-9_-]{0,62}$')
+
+
+class TenantError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def current_tenant():
+    """Tenant-ul request-ului curent sau None (baza implicită)."""
+    return g.get('db_tenant') if has_app_context() else None
+
+
+class TenantEngines:
+    """Cache LRU de engine-uri, câte unul per tenant."""
+
+    def __init__(self, uri_template, max_engines, engine_options=None):
+        self.uri_template = uri_template
+        self.max_engines = max_engines
+        self.engine_options = engine_options or {}
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def uri_for(self, tenant):
+        return self.uri_template.format(tenant=tenant)
+
+    def sqlite_path(self, tenant):
+        url = sa.engine.make_url(self.uri_for(tenant))
+        if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+            return None
+        return url.database
+
+    def exists(self, tenant):
+        """Pentru SQLite: există fișierul? Alte baze sunt provizionate în afara aplicației."""
+        path = self.sqlite_path(tenant)
+        return path is None or os.path.exists(path)
+
+    def list_tenants(self, configured=()):
+        tenants = set(configured)
+        pattern = self.sqlite_path('*') if '{tenant}' in self.uri_template else None
+        if pattern:
+            regex = re.compile('^' + re.escape(pattern).replace(r'\*', '(.+)') + '$')
+            for path in glob.glob(pattern):
+                match = regex.match(path)
+                if match and TENANT_NAME.match(match.group(1)):
+                    tenants.add(match.group(1))
+        return sorted(tenants)
+
+    def engine_for(self, tenant):
+        with self._lock:
+            engine = self._engines.get(tenant)
+            if engine is not None:
+                self._engines.move_to_end(tenant)
+                return engine
+            engine = sa.create_engine(self.uri_for(tenant), **self.engine_options)
+            self._engines[tenant] = engine
+            while len(self._engines) > self.max_engines:
+                evicted_tenant, evicted = self._engines.popitem(last=False)
+                # Conexiunile încă folosite de alte request-uri se închid la returnare
+                evicted.dispose()
+                logger.debug(f"Evicted engine for tenant '{evicted_tenant}'")
+            return engine
+
+    def dispose(self, close=True):
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose(close=close)
+            self._engines.clear()
+
+
+def resolve_tenant(app):
+    """Numele tenant-ului din antet sau subdomeniu. Ridică TenantError dacă e invalid."""
+    tenant = request.headers.get(app.config['CRM_TENANT_HEADER'])
+    base_domain = app.config['CRM_TENANT_BASE_DOMAIN']
+    if not tenant and base_domain:
+        host = request.host.split(':')[0].lower()
+        suffix = '.' + base_domain.lower()
+        if host.endswith(suffix):
+            tenant = host[:-len(suffix)]
+    if not tenant:
+        if app.config['CRM_TENANT_REQUIRED']:
+            raise TenantError("Tenant is required")
+        return None
+
+    tenant = tenant.strip().lower()
+    if not TENANT_NAME.match(tenant):
+        raise TenantError("Invalid tenant name")
+    allowed = app.config['CRM_TENANTS']
+    tenants = app.extensions['crm_tenants']
+    if (allowed and tenant not in allowed) or not tenants.exists(tenant):
+        raise TenantError("Unknown tenant", 404)
+    return tenant
+
+
+def init_tenancy(app):
+    from backend.app import db_path
+
+    app.config.setdefault('CRM_TENANCY', False)
+    app.config.setdefault('CRM_TENANT_HEADER', 'X-Tenant')
+    app.config.setdefault('CRM_TENANT_BASE_DOMAIN', None)
+    app.config.setdefault('CRM_TENANT_REQUIRED', False)
+    app.config.setdefault('CRM_TENANTS', [])
+    app.config.setdefault('CRM_TENANT_MAX_ENGINES', 16)
+    app.config.setdefault(
+        'CRM_TENANT_URI_TEMPLATE',
+        f"sqlite:///{os.path.join(os.path.dirname(db_path), 'tenants', '{tenant}.db')}"
+    )
+    if isinstance(app.config['CRM_TENANTS'], str):
+        app.config['CRM_TENANTS'] = [t.strip() for t in app.config['CRM_TENANTS'].split(',') if t.strip()]
+    if not app.config['CRM_TENANCY']:
+        return
+
+    app.extensions['crm_tenants'] = TenantEngines(
+        app.config['CRM_TENANT_URI_TEMPLATE'],
+        max_engines=int(app.config['CRM_TENANT_MAX_ENGINES']),
+        engine_options=app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    )
+
+    @app.before_request
+    def select_tenant():
+        try:
+            g.db_tenant = resolve_tenant(app)
+        except TenantError as e:
+            return jsonify({"error": str(e)}), e.status_code
+
+    logger.debug("Multi-tenant routing enabled")
+
+
+def tenant_engine():
+    """Engine-ul tenant-ului curent sau None (RoutingSession folosește atunci baza implicită)."""
+    tenant = current_tenant()
+    if tenant is None:
+        return None
+    # Același engine pe toată durata request-ului, chiar dacă între timp e scos din cache
+    engine = g.get('db_tenant_engine')
+    if engine is None:
+        engine = g.db_tenant_engine = current_app.extensions['crm_tenants'].engine_for(tenant)
+    return engine
+
+
+def known_databases(app):
+    """Bazele de întreținut de job-urile periodice: None (baza implicită), apoi fiecare tenant."""
+    tenants = app.extensions.get('crm_tenants')
+    if tenants is None:
+        return [None]
+    return [None, *tenants.list_tenants(app.config['CRM_TENANTS'])]
+
+
+@contextmanager
+def database_context(app, tenant=None):
+    """Un context de aplicație nou, cu db.session rutat către baza `tenant` (None = implicită)."""
+    from backend.app import db
+
+    with app.app_context():
+        if tenant is not None:
+            g.db_tenant = tenant
+        try:
+            yield
+        finally:
+            db.session.remove()
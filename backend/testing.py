@@ -0,0 +1,213 @@
+"""Baze de test și de benchmark pornite dintr-un șablon construit o singură dată.
+
+Schema și datele de seed sunt create o dată într-un fișier SQLite șablon, al
+cărui nume conține un hash al schemei (DDL-ul din db.metadata), al funcției
+de seed și al parametrilor ei; o schimbare de model sau de seed produce alt
+șablon, iar șabloanele vechi sunt pur și simplu ignorate. Fiecare test sau
+benchmark pornește dintr-o copie, făcută cu API-ul de backup SQLite (într-un
+fișier sau în baza în memorie a unei aplicații `sqlite://`).
+
+`transactional_session` leagă db.session de o tranzacție anulată la final:
+commit-urile aplicației devin SAVEPOINT-uri, deci testele pot partaja o
+singură copie fără să vadă scrierile altor teste.
+
+Fixture-urile pytest sunt în backend/pytest_plugin.py.
+"""
+import hashlib
+import inspect
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from backend.app import db
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+TEMPLATE_DIR_ENV = 'CRM_TEMPLATE_DIR'
+# Șablonul este construit fără outbox: datele de seed nu sunt schimbări de
+# livrat, iar evenimentele lor ar fi dispecerizate în fiecare copie
+TEMPLATE_CONFIG = {'CRM_OUTBOX': False}
+
+
+def seed_sample_data(contacts=200, interactions=2000, tasks=0, meetings=0, seed=42):
+    """Inserează date deterministe (seed fix) prin db.session, în contextul aplicației curente.
+
+    Scrierile trec prin ORM, deci coloanele derivate (contacts_count, rollup-urile)
+    sunt ținute la zi de aceleași listener-e ca în aplicație.
+    """
+    from backend.models import Company, Contact, Interaction, Meeting, SalesStage, Task, TaskStatus
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    companies = [Company(name=f"Company {i}") for i in range(max(1, contacts // 10))]
+    db.session.add_all(companies)
+    db.session.flush()
+    people = [
+        Contact(
+            name=f"Contact {i}", email=f"contact{i}@example.com",
+            company_id=rng.choice(companies).id, sales_stage=rng.choice(list(SalesStage))
+        )
+        for i in range(contacts)
+    ]
+    db.session.add_all(people)
+    db.session.flush()
+
+    for i in range(interactions):
+        contact = rng.choice(people)
+        db.session.add(Interaction(
+            interaction_type=rng.choice(['Call', 'Email', 'Meeting', 'Note']),
+            notes='seed', contact_id=contact.id, company_id=contact.company_id,
+            interaction_date=now - timedelta(minutes=i)
+        ))
+        if i % CHUNK_SIZE == CHUNK_SIZE - 1:
+            db.session.flush()
+
+    for i in range(tasks):
+        contact = rng.choice(people)
+        db.session.add(Task(
+            title=f"Task {i}", contact_id=contact.id, company_id=contact.company_id,
+            status=rng.choice(list(TaskStatus)), due_date=now + timedelta(days=rng.randint(-30, 30))
+        ))
+
+    for i in range(meetings):
+        start = now + timedelta(hours=rng.randint(-500, 500))
+        meeting = Meeting(
+            title=f"Meeting {i}", start=start, end=start + timedelta(hours=1),
+            company_id=rng.choice(companies).id
+        )
+        meeting.attendees = rng.sample(people, min(3, len(people)))
+        db.session.add(meeting)
+    db.session.commit()
+
+    return {
+        'companies': len(companies), 'contacts': contacts, 'interactions': interactions,
+        'tasks': tasks, 'meetings': meetings,
+    }
+
+
+def schema_hash():
+    """Hash-ul DDL-ului SQLite generat din modele (tabele și indecși)."""
+    dialect = sqlite.dialect()
+    digest = hashlib.sha256()
+    for table in db.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def template_key(seeder, params):
+    """Cheia șablonului: schema + codul funcției de seed + parametrii ei."""
+    try:
+        source = inspect.getsource(seeder)
+    except (OSError, TypeError):
+        source = f"{seeder.__module__}.{seeder.__qualname__}"
+    digest = hashlib.sha256(schema_hash().encode())
+    digest.update(source.encode())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()[:16]
+
+
+def default_template_dir():
+    return os.environ.get(TEMPLATE_DIR_ENV) or os.path.join(tempfile.gettempdir(), 'crm-templates')
+
+
+def template_database(seeder=seed_sample_data, directory=None, **params):
+    """Calea șablonului pentru `seeder(**params)`, construit doar dacă nu există deja.
+
+    Schema este creată cu db.create_all(), adică exact schema pe care
+    `flask db migrate` o generează din modele. Șablonul este scris într-un
+    fișier temporar și redenumit la final, deci procese paralele (ex:
+    pytest-xdist) nu văd niciodată un șablon incomplet.
+    """
+    from backend.app import create_app
+
+    directory = directory or default_template_dir()
+    path = os.path.join(directory, f"crm-template-{template_key(seeder, params)}.db")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    fd, building_path = tempfile.mkstemp(prefix='.crm-template-', suffix='.db', dir=directory)
+    os.close(fd)
+    started = time.perf_counter()
+    try:
+        app = create_app({**TEMPLATE_CONFIG, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{building_path}"})
+        with app.app_context():
+            db.create_all()
+            seeder(**params)
+            db.session.remove()
+            db.engine.dispose()
+        with closing(sqlite3.connect(building_path)) as connection:
+            connection.execute("VACUUM")
+        os.replace(building_path, path)
+    finally:
+        if os.path.exists(building_path):
+            os.remove(building_path)
+    logger.info(f"Template database {os.path.basename(path)} built in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def clone_database(template, target):
+    """Copiază șablonul în `target` (cale de fișier sau conexiune sqlite3) cu API-ul de backup."""
+    with closing(sqlite3.connect(template)) as source:
+        if isinstance(target, sqlite3.Connection):
+            source.backup(target)
+        else:
+            with closing(sqlite3.connect(target)) as destination:
+                source.backup(destination)
+    return target
+
+
+def clone_into_app(app, template):
+    """Încarcă șablonul în baza în memorie a unei aplicații create cu `sqlite://`.
+
+    Flask-SQLAlchemy folosește o singură conexiune (StaticPool) pentru baza în
+    memorie, deci copia este vizibilă tuturor sesiunilor aplicației.
+    """
+    with app.app_context():
+        if db.engine.url.database not in (None, '', ':memory:'):
+            raise ValueError("clone_into_app needs an in-memory SQLite app (sqlite://); use clone_database for files")
+        connection = db.engine.raw_connection()
+        try:
+            clone_database(template, connection.driver_connection)
+        finally:
+            connection.close()
+    return app
+
+
+@contextmanager
+def transactional_session(app):
+    """db.session legat de o tranzacție care este anulată la ieșire.
+
+    Commit-urile și rollback-urile aplicației lucrează pe SAVEPOINT-uri în
+    interiorul tranzacției. Sesiunile sunt configurate la nivel de proces și
+    folosesc toate aceeași conexiune, deci codul care scrie din alte thread-uri
+    (/api/batch, thread-ul outbox) are nevoie de o copie proprie a bazei
+    (clone_into_app) în loc de această tranzacție.
+    """
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        # pysqlite nu deschide tranzacția înainte de SAVEPOINT; o pornim explicit
+        connection.exec_driver_sql('BEGIN')
+        factory = db.session.session_factory
+        options = dict(factory.kw)
+        factory.configure(bind=connection, join_transaction_mode='create_savepoint')
+        db.session.remove()
+        try:
+            yield db.session
+        finally:
+            db.session.remove()
+            factory.kw = options
+            transaction.rollback()
+            connection.close()
@@ -0,0 +1,227 @@
+import base64
+import json
+import logging
+from datetime import datetime
+
+from flask import request, jsonify
+from sqlalchemy import select, literal, func, or_, and_, union_all, type_coerce
+
+from backend.app import db
+from backend.routing import read_only
+from backend.coldstorage import cold_interaction, cold_boundary
+from backend.models import Contact, Company, Interaction, Meeting, Task, TaskStatus, meeting_attendees
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+TIMELINE_KINDS = ('interaction', 'meeting', 'task')
+
+
+def encode_cursor(ts, kind, item_id):
+    raw = json.dumps([ts.isoformat(), kind, item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodifică un cursor opac în (ts, kind, id). Ridică ValueError dacă e invalid."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        ts, kind, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if kind not in TIMELINE_KINDS:
+            raise ValueError
+        return datetime.fromisoformat(ts), kind, int(item_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _after_cursor(kind, ts_col, id_col, cursor):
+    """Predicatul "strict după cursor" pentru ordinea (ts DESC, kind DESC, id DESC).
+
+    `kind` este o constantă pe fiecare ramură, deci predicatul se reduce la
+    o comparație simplă pe (ts, id), care poate folosi indexul pe dată.
+    """
+    c_ts, c_kind, c_id = cursor
+    if kind < c_kind:
+        return ts_col <= c_ts
+    if kind > c_kind:
+        return ts_col < c_ts
+    return or_(ts_col < c_ts, and_(ts_col == c_ts, id_col < c_id))
+
+
+def _branch(kind, stmt, ts_col, id_col, cursor, limit):
+    stmt = stmt.where(ts_col.isnot(None))
+    if cursor:
+        stmt = stmt.where(_after_cursor(kind, ts_col, id_col, cursor))
+    # Fiecare ramură citește cel mult `limit` rânduri, deci costul unei pagini
+    # nu depinde de câte interacțiuni/întâlniri/task-uri are entitatea
+    sub = stmt.order_by(ts_col.desc(), id_col.desc()).limit(limit).subquery()
+    return select(*sub.c)
+
+
+def _columns(kind, item_id, ts, title, detail, status, contact_id, contact_name, company_id, company_name):
+    return (
+        literal(kind).label('kind'),
+        item_id.label('item_id'),
+        ts.label('ts'),
+        title.label('title'),
+        detail.label('detail'),
+        status.label('status'),
+        contact_id.label('contact_id'),
+        contact_name.label('contact_name'),
+        company_id.label('company_id'),
+        company_name.label('company_name'),
+    )
+
+
+def build_timeline_query(contact_id=None, company_id=None, kinds=TIMELINE_KINDS, cursor=None, limit=DEFAULT_PAGE_SIZE,
+                         include_cold=False):
+    """Construiește un singur SELECT ... UNION ALL peste interacțiuni, întâlniri și task-uri.
+
+    Cu `include_cold`, interacțiunile din cold storage sunt o ramură în plus.
+    """
+    no_status = literal(None, db.String)
+    branches = []
+
+    if 'interaction' in kinds:
+        sources = [Interaction.__table__, cold_interaction] if include_cold else [Interaction.__table__]
+        for source in sources:
+            stmt = select(*_columns(
+                'interaction', source.c.id, source.c.interaction_date, source.c.interaction_type,
+                source.c.notes, no_status, source.c.contact_id, Contact.name, source.c.company_id, Company.name
+            )).select_from(source) \
+                .outerjoin(Contact, Contact.id == source.c.contact_id) \
+                .outerjoin(Company, Company.id == source.c.company_id)
+            stmt = stmt.where(source.c.contact_id == contact_id) if contact_id else stmt.where(source.c.company_id == company_id)
+            branches.append(_branch('interaction', stmt, source.c.interaction_date, source.c.id, cursor, limit))
+
+    if 'meeting' in kinds:
+        if contact_id:
+            # Întâlnirile unui contact vin prin tabela de asociere meeting_attendees
+            stmt = select(*_columns(
+                'meeting', Meeting.id, Meeting.start, Meeting.title, Meeting.description, Meeting.status,
+                meeting_attendees.c.contact_id, Contact.name, Meeting.company_id, Company.name
+            )).select_from(meeting_attendees) \
+                .join(Meeting, Meeting.id == meeting_attendees.c.meeting_id) \
+                .join(Contact, Contact.id == meeting_attendees.c.contact_id) \
+                .outerjoin(Company, Company.id == Meeting.company_id) \
+                .where(meeting_attendees.c.contact_id == contact_id)
+        else:
+            stmt = select(*_columns(
+                'meeting', Meeting.id, Meeting.start, Meeting.title, Meeting.description, Meeting.status,
+                literal(None, db.Integer), literal(None, db.String), Meeting.company_id, Company.name
+            )).select_from(Meeting) \
+                .outerjoin(Company, Company.id == Meeting.company_id) \
+                .where(Meeting.company_id == company_id)
+        branches.append(_branch('meeting', stmt, Meeting.start, Meeting.id, cursor, limit))
+
+    if 'task' in kinds:
+        task_ts = func.coalesce(Task.due_date, Task.created_at)
+        stmt = select(*_columns(
+            'task', Task.id, task_ts, Task.title, Task.description, type_coerce(Task.status, db.String),
+            Task.contact_id, Contact.name, Task.company_id, Company.name
+        )).select_from(Task) \
+            .outerjoin(Contact, Contact.id == Task.contact_id) \
+            .outerjoin(Company, Company.id == Task.company_id)
+        stmt = stmt.where(Task.contact_id == contact_id) if contact_id else stmt.where(Task.company_id == company_id)
+        branches.append(_branch('task', stmt, task_ts, Task.id, cursor, limit))
+
+    merged = union_all(*branches).subquery('timeline')
+    return select(merged).order_by(merged.c.ts.desc(), merged.c.kind.desc(), merged.c.item_id.desc()).limit(limit)
+
+
+def _parse_ts(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _row_to_dict(row):
+    status = row.status
+    if row.kind == 'task' and status in TaskStatus.__members__:
+        status = TaskStatus[status].value
+    ts = _parse_ts(row.ts)
+    return {
+        'kind': row.kind,
+        'id': row.item_id,
+        'timestamp': ts.isoformat() if ts else None,
+        'title': row.title,
+        'detail': row.detail,
+        'status': status,
+        'contact': {'id': row.contact_id, 'name': row.contact_name} if row.contact_id else None,
+        'company': {'id': row.company_id, 'name': row.company_name} if row.company_id else None
+    }
+
+
+def fetch_timeline_page(contact_id=None, company_id=None, kinds=TIMELINE_KINDS, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Returnează (items, next_cursor) pentru o pagină din timeline."""
+    rows = db.session.execute(
+        build_timeline_query(contact_id, company_id, kinds, cursor, limit + 1)
+    ).all()
+    if 'interaction' in kinds:
+        # Cold storage e citit doar când pagina ajunge în trecut dincolo de cea mai
+        # nouă interacțiune mutată acolo (sau nu se umple din segmentul hot)
+        boundary = cold_boundary()
+        if boundary is not None and (len(rows) <= limit or _parse_ts(rows[-1].ts) <= boundary):
+            rows = db.session.execute(
+                build_timeline_query(contact_id, company_id, kinds, cursor, limit + 1, include_cold=True),
+                bind_arguments={'bind': db.engine}
+            ).all()
+    items = [_row_to_dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(_parse_ts(last.ts), last.kind, last.item_id)
+    return items, next_cursor
+
+
+def _parse_timeline_args(args):
+    limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    kinds = TIMELINE_KINDS
+    if args.get('types'):
+        kinds = tuple(k.strip() for k in args['types'].split(',') if k.strip())
+        unknown = set(kinds) - set(TIMELINE_KINDS)
+        if unknown or not kinds:
+            raise ValueError(f"types must be a comma-separated subset of {', '.join(TIMELINE_KINDS)}")
+    cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    return kinds, cursor, limit
+
+
+def register_timeline_routes(bp):
+    """Register the merged activity timeline endpoints."""
+
+    @bp.route('/api/contacts/<int:contact_id>/timeline', methods=['GET'])
+    @read_only
+    def get_contact_timeline(contact_id):
+        """Interacțiuni, întâlniri și task-uri ale unui contact, în ordine cronologică inversă."""
+        try:
+            kinds, cursor, limit = _parse_timeline_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            if db.session.query(Contact.id).filter(Contact.id == contact_id).first() is None:
+                return jsonify({"error": "Contact not found"}), 404
+            items, next_cursor = fetch_timeline_page(contact_id=contact_id, kinds=kinds, cursor=cursor, limit=limit)
+            return jsonify({"items": items, "next_cursor": next_cursor}), 200
+        except Exception as e:
+            logger.error(f"Error fetching timeline for contact {contact_id}: {str(e)}")
+            return jsonify({"error": f"Failed to fetch timeline for contact with ID {contact_id}"}), 500
+
+    @bp.route('/api/companies/<int:company_id>/timeline', methods=['GET'])
+    @read_only
+    def get_company_timeline(company_id):
+        """Interacțiuni, întâlniri și task-uri ale unei companii, în ordine cronologică inversă."""
+        try:
+            kinds, cursor, limit = _parse_timeline_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            if db.session.query(Company.id).filter(Company.id == company_id).first() is None:
+                return jsonify({"error": "Company not found"}), 404
+            items, next_cursor = fetch_timeline_page(company_id=company_id, kinds=kinds, cursor=cursor, limit=limit)
+            return jsonify({"items": items, "next_cursor": next_cursor}), 200
+        except Exception as e:
+            logger.error(f"Error fetching timeline for company {company_id}: {str(e)}")
+            return jsonify({"error": f"Failed to fetch timeline for company with ID {company_id}"}), 500
@@ -0,0 +1,316 @@
+import logging
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from flask import request, jsonify
+from sqlalchemy import update, select, exists
+from sqlalchemy.exc import IntegrityError
+
+from backend.app import db
+from backend.companycounts import record_patch_company_change
+from backend.dedupe import normalize_email
+from backend.funnel import record_patch_stage_change
+from backend.outbox import patch_event_hook
+from backend.httpcache import versioned_response
+from backend.models import (
+    Contact, Company, Task, Meeting, Notification, ContactType, SalesStage, TaskStatus
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PatchError(Exception):
+    """Eroare de validare/actualizare cu codul HTTP asociat."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+# ---------- Payload validation ----------
+
+def _required_text(field, value):
+    if not isinstance(value, str) or not value.strip():
+        raise PatchError(f"Field '{field}' must be a non-empty string")
+    return value
+
+
+def _optional_text(field, value):
+    if value is not None and not isinstance(value, str):
+        raise PatchError(f"Field '{field}' must be a string or null")
+    return value
+
+
+def _optional_id(field, value):
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise PatchError(f"Field '{field}' must be an integer or null")
+
+
+def _enum(enum_cls, nullable=False):
+    def convert(field, value):
+        if value is None and nullable:
+            return None
+        if value in enum_cls.__members__:
+            return enum_cls[value]
+        raise PatchError(f"Field '{field}' must be one of {', '.join(enum_cls.__members__)}")
+    return convert
+
+
+def _datetime(nullable):
+    def convert(field, value):
+        if value is None and nullable:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (ValueError, TypeError, AttributeError):
+            raise PatchError(f"Invalid date format for '{field}'")
+    return convert
+
+
+def _boolean(field, value):
+    if not isinstance(value, bool):
+        raise PatchError(f"Field '{field}' must be a boolean")
+    return value
+
+
+# Pentru fiecare model: câmpurile permise în PATCH, funcția de validare și,
+# pentru cheile străine, modelul referit (verificat în același UPDATE)
+PATCH_SPECS = {
+    Contact: {
+        'fields': {
+            'name': _required_text,
+            'email': _required_text,
+            'phone': _optional_text,
+            'contact_type': _enum(ContactType),
+            'sales_stage': _enum(SalesStage, nullable=True),
+            'company_id': _optional_id,
+        },
+        'foreign_keys': {'company_id': Company},
+        'versioned': True,
+        # Câmpuri al căror istoric este scris în aceeași tranzacție: hook(connection, row, old_value)
+        'history': {'sales_stage': record_patch_stage_change, 'company_id': record_patch_company_change},
+        # Coloane calculate din câmpul trimis, scrise în același UPDATE: coloana -> (câmp, funcție)
+        'derived': {'email_normalized': ('email', normalize_email)},
+        # Apelate după UPDATE, în aceeași tranzacție: hook(connection, row, câmpurile trimise)
+        'after_update': (patch_event_hook('contact'),),
+    },
+    Company: {
+        'fields': {
+            'name': _required_text,
+            'website': _optional_text,
+            'address': _optional_text,
+        },
+        'foreign_keys': {},
+        'versioned': True,
+    },
+    Task: {
+        'fields': {
+            'title': _required_text,
+            'description': _optional_text,
+            'due_date': _datetime(nullable=True),
+            'status': _enum(TaskStatus),
+            'contact_id': _optional_id,
+            'company_id': _optional_id,
+        },
+        'foreign_keys': {'contact_id': Contact, 'company_id': Company},
+        'versioned': True,
+        'after_update': (patch_event_hook('task'),),
+    },
+    Meeting: {
+        'fields': {
+            'title': _required_text,
+            'description': _optional_text,
+            'location': _optional_text,
+            'start': _datetime(nullable=False),
+            'end': _datetime(nullable=False),
+            'status': _optional_text,
+            'company_id': _optional_id,
+        },
+        'foreign_keys': {'company_id': Company},
+        'versioned': True,
+        'after_update': (patch_event_hook('meeting'),),
+    },
+    Notification: {
+        'fields': {
+            'is_read': _boolean,
+        },
+        'foreign_keys': {},
+        'versioned': False,
+    },
+}
+
+
+def validate_patch(model, data):
+    """Validează payload-ul și returnează valorile convertite pentru UPDATE."""
+    if not isinstance(data, dict) or not data:
+        raise PatchError("Request body must be a non-empty JSON object")
+    fields = PATCH_SPECS[model]['fields']
+    unknown = sorted(set(data) - set(fields))
+    if unknown:
+        raise PatchError(f"Unknown or read-only fields: {', '.join(unknown)}")
+    return {field: fields[field](field, value) for field, value in data.items()}
+
+
+def parse_if_match(header_value):
+    """Extrage versiunea din antetul If-Match. None dacă lipsește.
+
+    Acceptă "3", W/"3" și ETag-ul unui GET ("3.<hash>", backend/httpcache.py).
+    """
+    if not header_value or header_value.strip() == '*':
+        return None
+    value = header_value.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"').split('.', 1)[0])
+    except ValueError:
+        raise PatchError("If-Match must contain a version ETag, e.g. \"3\"")
+
+
+# ---------- Single-statement update ----------
+
+def conditional_update(model, row_id, values, expected_version=None):
+    """Aplică `values` cu un singur UPDATE ... WHERE id=? RETURNING ...
+
+    Cheile străine sunt validate în același statement (EXISTS în WHERE), iar
+    versiunea așteptată, dacă e dată, devine parte din condiție. Doar când
+    UPDATE-ul nu atinge niciun rând se face o interogare suplimentară pentru
+    a distinge 404 / 412 / 422.
+    """
+    spec = PATCH_SPECS[model]
+    table = model.__table__
+    conditions = [table.c.id == row_id]
+
+    fk_checks = {
+        field: ref for field, ref in spec['foreign_keys'].items()
+        if values.get(field) is not None
+    }
+    for field, ref in fk_checks.items():
+        conditions.append(exists().where(ref.__table__.c.id == values[field]))
+    if expected_version is not None:
+        if not spec['versioned']:
+            raise PatchError("This resource does not support If-Match", 400)
+        conditions.append(table.c.version == expected_version)
+
+    # Pentru câmpurile cu istoric, valoarea veche citită aici este și condiție
+    # a UPDATE-ului (compare-and-set): istoricul corespunde exact schimbării făcute
+    history = {field: hook for field, hook in spec.get('history', {}).items() if field in values}
+    previous = None
+    if history:
+        previous = db.session.execute(select(*[table.c[field] for field in history]).where(table.c.id == row_id)).first()
+        if previous is not None:
+            conditions.extend(table.c[field].is_not_distinct_from(previous._mapping[field]) for field in history)
+
+    for column, (field, derive) in spec.get('derived', {}).items():
+        if field in values:
+            values = {**values, column: derive(values[field])}
+
+    stmt = update(table).where(*conditions).values(**values)
+    if db.session.get_bind().dialect.update_returning:
+        row = db.session.execute(stmt.returning(*table.c)).first()
+    else:
+        # SQLite < 3.35 nu suportă RETURNING
+        result = db.session.execute(stmt)
+        row = db.session.execute(select(table).where(table.c.id == row_id)).first() if result.rowcount else None
+
+    if row is None:
+        db.session.rollback()
+        _raise_update_failure(model, row_id, fk_checks, values, expected_version)
+
+    for field, hook in history.items():
+        if previous._mapping[field] != row._mapping[field]:
+            hook(db.session.connection(), row, previous._mapping[field])
+    for hook in spec.get('after_update', ()):
+        hook(db.session.connection(), row, values)
+    db.session.commit()
+    return row
+
+
+def _raise_update_failure(model, row_id, fk_checks, values, expected_version):
+    table = model.__table__
+    current = db.session.execute(select(table.c.id).where(table.c.id == row_id)).first()
+    if current is None:
+        raise PatchError(f"{model.__name__} not found", 404)
+    if expected_version is not None:
+        current_version = db.session.execute(select(table.c.version).where(table.c.id == row_id)).scalar()
+        if current_version != expected_version:
+            raise PatchError(f"{model.__name__} was modified (current version {current_version})", 412)
+    for field, ref in fk_checks.items():
+        if db.session.execute(select(ref.__table__.c.id).where(ref.__table__.c.id == values[field])).first() is None:
+            raise PatchError(f"{ref.__name__} with ID {values[field]} not found", 422)
+    raise PatchError(f"Failed to update {model.__name__}", 409)
+
+
+def serialize_row(row, exclude=()):
+    """Serializează un rând RETURNING în același format ca to_dict (fără relații imbricate).
+
+    `exclude`: coloane interne care nu apar în to_dict (ex: coloanele `derived`).
+    """
+    data = {}
+    for key, value in row._mapping.items():
+        if key in exclude:
+            continue
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, PyEnum):
+            value = value.value
+        data[key] = value
+    return data
+
+
+def patch_response(model, row_id):
+    """Handler comun pentru rutele PATCH."""
+    try:
+        values = validate_patch(model, request.get_json(silent=True))
+        expected_version = parse_if_match(request.headers.get('If-Match'))
+        row = conditional_update(model, row_id, values, expected_version)
+    except PatchError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except IntegrityError as e:
+        db.session.rollback()
+        logger.error(f"Integrity error patching {model.__name__} {row_id}: {str(e)}")
+        return jsonify({"error": f"Update conflicts with an existing {model.__name__}"}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error patching {model.__name__} {row_id}: {str(e)}")
+        return jsonify({"error": f"Failed to update {model.__name__} with ID {row_id}"}), 500
+
+    spec = PATCH_SPECS[model]
+    data = serialize_row(row, exclude=spec.get('derived', {}))
+    if spec['versioned']:
+        return versioned_response(data, row.version), 200
+    return jsonify(data), 200
+
+
+def register_patch_routes(bp):
+    """Register PATCH routes backed by single-statement conditional updates."""
+
+    @bp.route('/api/contacts/<int:contact_id>', methods=['PATCH'])
+    def patch_contact(contact_id):
+        """Partially update a contact (optional If-Match for optimistic locking)."""
+        return patch_response(Contact, contact_id)
+
+    @bp.route('/api/companies/<int:company_id>', methods=['PATCH'])
+    def patch_company(company_id):
+        """Partially update a company (optional If-Match for optimistic locking)."""
+        return patch_response(Company, company_id)
+
+    @bp.route('/api/tasks/<int:task_id>', methods=['PATCH'])
+    def patch_task(task_id):
+        """Partially update a task (optional If-Match for optimistic locking)."""
+        return patch_response(Task, task_id)
+
+    @bp.route('/api/meetings/<int:meeting_id>', methods=['PATCH'])
+    def patch_meeting(meeting_id):
+        """Actualizare parțială a unei întâlniri (participanții se modifică prin PUT)."""
+        return patch_response(Meeting, meeting_id)
+
+    @bp.route('/api/notifications/<int:notification_id>', methods=['PATCH'])
+    def patch_notification(notification_id):
+        """Actualizare parțială a unei notificări (ex: {"is_read": true})."""
+        return patch_response(Notification, notification_id)
@@ -0,0 +1,184 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import jsonify
+
+from backend.app import db
+from backend.tenancy import current_tenant
+
+logger = logging.getLogger(__name__)
+
+
+class WriteTimeout(Exception):
+    """Unitatea nu a fost comisă în CRM_GROUP_COMMIT_TIMEOUT secunde.
+
+    `cancelled`: unitatea a fost scoasă din coadă și nu va mai fi scrisă, deci
+    clientul poate repeta cererea; altfel rezultatul scrierii este necunoscut.
+    """
+
+    def __init__(self, cancelled):
+        super().__init__("Write was cancelled" if cancelled else "Write outcome unknown")
+        self.cancelled = cancelled
+
+
+class GroupCommitWriter:
+    """Single-writer queue that commits write units in grouped transactions.
+
+    Handler-ele trimit "unități de scriere" (funcții fără argumente care
+    folosesc db.session). Thread-ul writer-ului le adună timp de câteva
+    milisecunde, rulează fiecare unitate într-un SAVEPOINT propriu și face un
+    singur COMMIT pentru tot grupul. Future-ul fiecărei cereri este completat
+    abia după COMMIT, deci răspunsul HTTP pleacă doar după ce scrierea e durabilă.
+    """
+
+    def __init__(self, app, interval_ms=5, max_batch=200):
+        self.app = app
+        self.interval = interval_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, unit):
+        """Pune o unitate în coadă și returnează un Future cu rezultatul ei."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((unit, future))
+        return future
+
+    def _ensure_started(self):
+        # Pornire leneșă, în procesul care scrie efectiv (după fork-ul gunicorn)
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='crm-group-commit', daemon=True)
+            self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                with self.app.app_context():
+                    self._commit_batch(batch)
+            except BaseException as e:
+                # Nicio cerere nu rămâne să aștepte după un grup abandonat
+                _fail_pending(batch, e)
+                if not isinstance(e, Exception):
+                    raise
+                logger.error(f"Group commit writer error: {str(e)}")
+
+    def _commit_batch(self, batch):
+        session = db.session
+        completed = []
+        try:
+            if session.get_bind().dialect.name == 'sqlite':
+                # pysqlite nu deschide tranzacția înainte de SAVEPOINT; o pornim
+                # explicit (și luăm lock-ul de scriere o singură dată pe grup)
+                session.connection().exec_driver_sql('BEGIN IMMEDIATE')
+
+            for unit, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                savepoint = session.begin_nested()
+                try:
+                    result = unit()
+                    savepoint.commit()
+                    completed.append((future, result))
+                except Exception as e:
+                    savepoint.rollback()
+                    future.set_exception(e)
+
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Group commit of {len(batch)} write units failed: {str(e)}")
+            _fail_pending(batch, e)
+            return
+
+        for future, result in completed:
+            future.set_result(result)
+        logger.debug(f"Group commit: {len(completed)}/{len(batch)} write units committed")
+
+
+def _fail_pending(batch, error):
+    """Completează cu `error` future-urile din grup care nu au încă un rezultat."""
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
+
+
+def init_group_commit(app):
+    app.config.setdefault('CRM_GROUP_COMMIT', False)
+    app.config.setdefault('CRM_GROUP_COMMIT_INTERVAL_MS', 5)
+    app.config.setdefault('CRM_GROUP_COMMIT_MAX_BATCH', 200)
+    app.config.setdefault('CRM_GROUP_COMMIT_TIMEOUT', 10)
+    if app.config['CRM_GROUP_COMMIT']:
+        app.extensions['crm_group_commit'] = GroupCommitWriter(
+            app,
+            interval_ms=app.config['CRM_GROUP_COMMIT_INTERVAL_MS'],
+            max_batch=app.config['CRM_GROUP_COMMIT_MAX_BATCH']
+        )
+
+
+def run_write(app, unit):
+    """Rulează o unitate de scriere: prin writer-ul de grup dacă e activ, altfel direct.
+
+    Returnează rezultatul unității după ce tranzacția a fost comisă.
+    Excepțiile ridicate de unitate sunt propagate apelantului. Dacă grupul nu
+    este comis în CRM_GROUP_COMMIT_TIMEOUT, ridică WriteTimeout: unitatea încă
+    în coadă este anulată; una deja pornită este așteptată încă un timeout.
+    """
+    writer = app.extensions.get('crm_group_commit')
+    # Writer-ul scrie doar în baza implicită; request-urile de tenant comit direct
+    if writer is None or current_tenant() is not None:
+        try:
+            result = unit()
+            db.session.commit()
+            return result
+        except Exception:
+            db.session.rollback()
+            raise
+    timeout = app.config['CRM_GROUP_COMMIT_TIMEOUT']
+    future = writer.submit(unit)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        if future.cancel():
+            raise WriteTimeout(cancelled=True)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        raise WriteTimeout(cancelled=False)
+
+
+def write_timeout_response(error):
+    """503 + Retry-After dacă scrierea a fost anulată (repetarea e sigură), altfel 504."""
+    if error.cancelled:
+        response = jsonify({"error": "Write queue is busy; the change was not saved, please retry"})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    response = jsonify({"error": "Timed out waiting for the write to commit; it may still be saved"})
+    response.status_code = 504
+    return response
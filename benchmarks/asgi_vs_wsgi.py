@@ -0,0 +1,92 @@
+"""Compară serverul sincron (gunicorn + main:app) cu modul ASGI (uvicorn + backend.asgi:app).
+
+Scenariul: multe conexiuni concurente care citesc endpoint-urile de listare,
+plus (opțional) conexiuni inactive care țin socket-uri deschise, ca niște
+clienți lenți sau long-polling. Ambele servere folosesc aceeași bază SQLite
+temporară, populată la pornire.
+
+Rulare (necesită dependențele opționale: pip install ".[asgi]"):
+
+    python benchmarks/asgi_vs_wsgi.py --connections 64 --idle 200 --duration 10
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from httpload import hold_idle_connections, run_closed_loop, wait_for_server  # noqa: E402
+from seeding import seed_database  # noqa: E402
+
+READ_PATHS = [
+    '/api/contacts', '/api/companies', '/api/interactions/count',
+    '/api/meetings', '/api/tasks', '/api/reports/interactions-by-type',
+]
+
+
+def server_command(mode, port, workers):
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), 'main:app'], {
+            'GUNICORN_BIND': f"127.0.0.1:{port}", 'GUNICORN_WORKERS': str(workers)
+        }
+    return [sys.executable, '-m', 'uvicorn', 'backend.asgi:app', '--host', '127.0.0.1',
+            '--port', str(port), '--workers', str(workers), '--log-level', 'warning'], {}
+
+
+async def measure(port, connections, idle, duration, timeout):
+    await wait_for_server('127.0.0.1', port)
+    stop = asyncio.Event()
+    idle_task = asyncio.create_task(hold_idle_connections('127.0.0.1', port, idle, stop))
+    await asyncio.sleep(0.5)
+
+    paths = itertools.cycle(READ_PATHS)
+    result = await run_closed_loop(
+        '127.0.0.1', port, lambda: ('GET', next(paths), None), connections, duration, timeout
+    )
+    stop.set()
+    result['idle_connections'] = await idle_task
+    return result
+
+
+def run_mode(mode, args, database_path):
+    command, extra_env = server_command(mode, args.port, args.workers)
+    env = {**os.environ, **extra_env, 'DATABASE_URL': f"sqlite:///{database_path}", 'PYTHONPATH': ROOT}
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        return asyncio.run(measure(args.port, args.connections, args.idle, args.duration, args.timeout))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=64, help='active keep-alive clients')
+    parser.add_argument('--idle', type=int, default=0, help='idle connections held open during the run')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    parser.add_argument('--workers', type=int, default=2, help='server worker processes')
+    parser.add_argument('--timeout', type=float, default=10, help='per-request timeout (seconds)')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--contacts', type=int, default=200)
+    parser.add_argument('--interactions', type=int, default=2000)
+    parser.add_argument('--modes', default='sync,asgi')
+    args = parser.parse_args()
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix='crm-bench-'), 'bench.db')
+    seed_database(database_path, contacts=args.contacts, interactions=args.interactions)
+
+    for mode in args.modes.split(','):
+        result = run_mode(mode, args, database_path)
+        print(f"{mode:5s} {result['throughput']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+              f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+              f"ok {result['requests']}  errors {result['errors'] or 0}  idle {result['idle_connections']}")
+
+
+if __name__ == '__main__':
+    main()
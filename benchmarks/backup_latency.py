@@ -0,0 +1,159 @@
+"""Impactul unui backup online asupra latenței request-urilor.
+
+Pornește gunicorn pe o bază populată și rulează același workload (vezi
+load_test.py) întâi fără backup, apoi cu `flask crm backup` rulat în buclă în
+paralel, pentru fiecare configurație de backup (pagini per pas / VACUUM INTO).
+Raportează p50/p99, erorile, lock timeout-urile și durata medie a unui backup.
+
+Rulare:
+
+    python benchmarks/backup_latency.py
+    python benchmarks/backup_latency.py --configs backup:64,backup:1024,backup:-1,vacuum --stage-seconds 20
+    python benchmarks/backup_latency.py --interactions 200000 --mix write-heavy
+
+Configurații: "backup:<pagini>[:<sleep ms>]" (-1 = toată baza într-un singur pas)
+sau "vacuum".
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import LogWatcher, parse_mix, run_stage, start_gunicorn  # noqa: E402
+from httpload import wait_for_server  # noqa: E402
+from seeding import seed_database  # noqa: E402
+
+
+def parse_config(value):
+    method, _, rest = value.partition(':')
+    if method == 'vacuum':
+        return {'label': 'vacuum', 'args': ['--method', 'vacuum']}
+    if method != 'backup':
+        raise argparse.ArgumentTypeError(f"Unknown backup config '{value}'")
+    pages, _, sleep_ms = rest.partition(':')
+    args = ['--method', 'backup', '--pages', pages or '256', '--sleep-ms', sleep_ms or '5']
+    return {'label': f"pages={pages or 256} sleep={sleep_ms or 5}ms", 'args': args}
+
+
+class BackupLoop:
+    """Rulează `flask crm backup` în buclă până la stop(); măsoară durata fiecărui backup."""
+
+    def __init__(self, database_path, workdir, extra_args):
+        self.env = {**os.environ, 'DATABASE_URL': f"sqlite:///{database_path}", 'FLASK_APP': 'main'}
+        self.destination = os.path.join(workdir, 'snapshot.db.gz')
+        self.extra_args = extra_args
+        self.durations = []
+        self.failures = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        command = [sys.executable, '-m', 'flask', 'crm', 'backup', self.destination, *self.extra_args]
+        while not self._stopped.is_set():
+            started = time.perf_counter()
+            completed = subprocess.run(command, cwd=ROOT, env=self.env,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            if completed.returncode == 0:
+                self.durations.append(time.perf_counter() - started)
+            else:
+                self.failures += 1
+                sys.stderr.write(completed.stdout.decode(errors='replace')[-500:])
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+def print_row(label, result, locks, backups=None):
+    total = result['requests'] + sum(result['errors'].values())
+    error_rate = 100.0 * sum(result['errors'].values()) / total if total else 0.0
+    backup_info = ''
+    if backups is not None:
+        mean = sum(backups.durations) / len(backups.durations) if backups.durations else 0.0
+        backup_info = f"{len(backups.durations):>4} x {mean:6.2f}s  failed {backups.failures}"
+    print(f"{label:<26} {result['throughput']:8.1f} {result['p50_ms']:8.1f} {result['p99_ms']:8.1f} "
+          f"{error_rate:7.2f}% {locks:6d}  {backup_info}")
+
+
+async def run_all(args, size, database_path, workdir, watcher):
+    await wait_for_server('127.0.0.1', args.port)
+    results = []
+    runs = [None] + args.configs
+    for config in runs:
+        backups = None
+        if config is not None:
+            backups = BackupLoop(database_path, workdir, config['args'])
+            backups.start()
+        watcher.count_new()
+        try:
+            result = await run_stage('127.0.0.1', args.port, args.mix, size, args.concurrency,
+                                     args.stage_seconds, args.timeout, args.seed)
+        finally:
+            if backups is not None:
+                backups.stop()
+        await asyncio.sleep(0.2)
+        locks = watcher.count_new()
+        label = 'no backup' if config is None else config['label']
+        print_row(label, result, locks, backups)
+        result.update({
+            'config': label, 'lock_timeouts': locks,
+            'backup_seconds': backups.durations if backups else [],
+            'backup_failures': backups.failures if backups else 0,
+        })
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', default='backup:64,backup:256,backup:-1:0,vacuum',
+                        help='comma separated backup configs')
+    parser.add_argument('--mix', type=parse_mix, default='mixed')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--stage-seconds', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=15)
+    parser.add_argument('--contacts', type=int, default=500)
+    parser.add_argument('--interactions', type=int, default=100000)
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--meetings', type=int, default=200)
+    parser.add_argument('--port', type=int, default=5057)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='write all results to this file')
+    args = parser.parse_args()
+    args.configs = [parse_config(value.strip()) for value in args.configs.split(',') if value.strip()]
+
+    workdir = tempfile.mkdtemp(prefix='crm-backup-bench-')
+    database_path = os.path.join(workdir, 'crm.db')
+    size = seed_database(database_path, contacts=args.contacts, interactions=args.interactions,
+                         tasks=args.tasks, meetings=args.meetings)
+    print(f"database: {os.path.getsize(database_path) / 1e6:.1f} MB, {args.workers} workers, "
+          f"{args.concurrency} clients, {args.stage_seconds:.0f}s per run")
+    print(f"{'config':<26} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>8} {'locks':>6}  backups")
+
+    log_path = os.path.join(workdir, 'gunicorn.log')
+    server = start_gunicorn(database_path, args.port, args.workers, log_path)
+    try:
+        results = asyncio.run(run_all(args, size, database_path, workdir, LogWatcher(log_path)))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'mix': args.mix, 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
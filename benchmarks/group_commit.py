@@ -0,0 +1,90 @@
+"""Compară throughput-ul scrierilor de interacțiuni cu și fără group commit.
+
+Rulare (folosește o bază SQLite temporară, nu crm_lite.db):
+
+    python benchmarks/group_commit.py --threads 16 --requests 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app import create_app, db  # noqa: E402
+from backend.models import Company, Contact  # noqa: E402
+from backend.writequeue import GroupCommitWriter  # noqa: E402
+
+_tmpdir = tempfile.mkdtemp(prefix='crm-bench-')
+app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}"})
+
+
+def run(threads, requests_per_thread):
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        for _ in range(requests_per_thread):
+            started = time.perf_counter()
+            response = client.post('/api/interactions', json={
+                'interaction_type': 'Email', 'notes': 'benchmark', 'contact_id': 1, 'company_id': 1
+            })
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 201:
+                    errors.append(response.status_code)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': len(errors),
+        'seconds': total,
+        'throughput': count / total,
+        'p50_ms': latencies[count // 2] * 1000,
+        'p99_ms': latencies[min(count - 1, int(count * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50, help='requests per thread')
+    parser.add_argument('--interval-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        company = Company(name='Benchmark Inc')
+        db.session.add(company)
+        db.session.flush()
+        db.session.add(Contact(name='Bench', email='bench@example.com', company_id=company.id))
+        db.session.commit()
+
+    app.extensions.pop('crm_group_commit', None)
+    direct = run(args.threads, args.requests)
+
+    app.extensions['crm_group_commit'] = GroupCommitWriter(app, interval_ms=args.interval_ms)
+    grouped = run(args.threads, args.requests)
+
+    for name, result in (('per-request commit', direct), ('group commit', grouped)):
+        print(f"{name:>20}: {result['throughput']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:6.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+              f"errors {result['errors']}/{result['requests']}")
+
+
+if __name__ == '__main__':
+    main()
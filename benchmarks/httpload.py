@@ -0,0 +1,171 @@
+"""Client HTTP/1.1 minimal (asyncio, keep-alive) folosit de benchmark-urile HTTP.
+
+Nu depinde de biblioteci externe, deci poate măsura orice server pornit local
+(gunicorn, uvicorn, `flask run`).
+"""
+import asyncio
+import json
+import time
+
+
+class HttpConnection:
+    """O conexiune keep-alive; reconectează automat dacă serverul o închide."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        """Returnează (status, body_bytes, headers). Ridică asyncio.TimeoutError / OSError."""
+        return await asyncio.wait_for(self._request(method, path, body, headers or {}), self.timeout)
+
+    async def _request(self, method, path, body, headers):
+        if self.writer is None:
+            await self._connect()
+        payload = b''
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers = {**headers, 'Content-Type': 'application/json'}
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(payload)}"]
+        lines += [f"{key}: {value}" for key, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # Serverul a închis conexiunea keep-alive: reîncercăm o dată pe una nouă
+            await self.close()
+            await self._connect()
+            return await self._request(method, path, body, headers)
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            response_headers[key.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).strip() or b'0', 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            data = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await self.reader.read()
+
+        if response_headers.get('connection', '').lower() == 'close' or 'content-length' not in response_headers \
+                and response_headers.get('transfer-encoding', '').lower() != 'chunked':
+            await self.close()
+        return status, data, response_headers
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(latencies, errors, seconds):
+    """Statistici comune: throughput și latențe în ms."""
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'seconds': seconds,
+        'throughput': count / seconds if seconds else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def hold_idle_connections(host, port, count, stop):
+    """Deschide `count` conexiuni care trimit doar o parte din antete și apoi
+    așteaptă (clienți lenți / long-polling) până la setarea evenimentului `stop`."""
+    writers = []
+    for _ in range(count):
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.write(f"GET /api HTTP/1.1\r\nHost: {host}:{port}\r\n".encode())
+            writers.append(writer)
+        except OSError:
+            break
+    await stop.wait()
+    for writer in writers:
+        writer.close()
+    return len(writers)
+
+
+async def run_closed_loop(host, port, next_request, connections, duration, timeout=10):
+    """Rulează `connections` clienți care trimit cereri una după alta timp de `duration` secunde.
+
+    `next_request()` returnează (method, path, body) pentru fiecare cerere.
+    """
+    latencies = []
+    errors = {}
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        connection = HttpConnection(host, port, timeout)
+        try:
+            while time.perf_counter() < deadline:
+                method, path, body = next_request()
+                started = time.perf_counter()
+                try:
+                    status, _, _ = await connection.request(method, path, body)
+                except (asyncio.TimeoutError, OSError, ValueError, IndexError) as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                    await connection.close()
+                    continue
+                if status >= 400:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        connection = HttpConnection(host, port, timeout=2)
+        try:
+            status, _, _ = await connection.request('GET', '/api')
+            if status == 200:
+                return
+        except (asyncio.TimeoutError, OSError, ValueError, IndexError):
+            pass
+        finally:
+            await connection.close()
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not become ready within {timeout}s")
@@ -0,0 +1,236 @@
+"""Test de încărcare cu workload-uri CRM mixte peste rutele reale /api.
+
+Pornește gunicorn (main:app) pe o copie a unei baze SQLite populate, crește
+concurența în trepte și raportează, pentru fiecare număr de workeri și fiecare
+treaptă: throughput, latențe p50/p95/p99, rata de erori și numărul de
+"database is locked" (lock timeout-uri SQLite) găsite în log-ul serverului.
+
+Rulare:
+
+    python benchmarks/load_test.py --workers 1,2,4 --stages 4,16,64 --stage-seconds 10
+    python benchmarks/load_test.py --mix write-heavy
+    python benchmarks/load_test.py --mix "dashboard=5,create_interaction=3,pipeline_move=2"
+    python benchmarks/load_test.py --url http://127.0.0.1:5001 --stages 8,32   # server deja pornit
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from httpload import HttpConnection, summarize, wait_for_server  # noqa: E402
+from seeding import seed_database  # noqa: E402
+
+LOCK_MARKER = b'database is locked'
+SALES_STAGES = ['PROSPECTING', 'QUALIFICATION', 'PROPOSAL', 'NEGOTIATION', 'CLOSED_WON', 'CLOSED_LOST']
+DASHBOARD_PATHS = ['/api/contacts', '/api/companies', '/api/interactions/count', '/api/meetings']
+
+
+# Fiecare operație primește (rng, dimensiunile bazei) și returnează (method, path, body),
+# exact ca apelurile făcute de frontend
+OPERATIONS = {
+    'dashboard': lambda rng, size: ('POST', '/api/batch', {
+        'requests': [{'method': 'GET', 'path': path} for path in DASHBOARD_PATHS], 'parallel': True
+    }),
+    'contacts_list': lambda rng, size: ('GET', '/api/contacts', None),
+    'pipeline_read': lambda rng, size: ('GET', '/api/sales/pipeline', None),
+    'tasks_list': lambda rng, size: ('GET', '/api/tasks', None),
+    'timeline': lambda rng, size: ('GET', f"/api/contacts/{rng.randint(1, size['contacts'])}/timeline", None),
+    'report': lambda rng, size: ('GET', '/api/reports/interactions-by-type', None),
+    'create_interaction': lambda rng, size: ('POST', '/api/interactions', {
+        'interaction_type': rng.choice(['Call', 'Email', 'Meeting', 'Note']),
+        'notes': 'load test', 'contact_id': rng.randint(1, size['contacts'])
+    }),
+    # Drag-and-drop în pipeline (SalesPipeline.js -> salesService.updateContactStage)
+    'pipeline_move': lambda rng, size: ('PUT', f"/api/contacts/{rng.randint(1, size['contacts'])}", {
+        'sales_stage': rng.choice(SALES_STAGES)
+    }),
+    'pipeline_patch': lambda rng, size: ('PATCH', f"/api/contacts/{rng.randint(1, size['contacts'])}", {
+        'sales_stage': rng.choice(SALES_STAGES)
+    }),
+}
+
+MIXES = {
+    'read-heavy': {'dashboard': 4, 'contacts_list': 2, 'pipeline_read': 2, 'timeline': 2, 'create_interaction': 1},
+    'mixed': {'dashboard': 3, 'pipeline_read': 2, 'timeline': 1, 'tasks_list': 1,
+              'create_interaction': 3, 'pipeline_move': 2},
+    'write-heavy': {'dashboard': 1, 'create_interaction': 6, 'pipeline_move': 3},
+}
+
+
+def parse_mix(value):
+    """Un nume din MIXES sau "op=greutate,op=greutate"."""
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' (known: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+class LogWatcher:
+    """Numără apariițiile unui marcaj în log-ul serverului, de la ultima citire."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+
+    def count_new(self, marker=LOCK_MARKER):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as log:
+            log.seek(self.offset)
+            data = log.read()
+        self.offset += len(data)
+        return data.count(marker)
+
+
+async def run_stage(host, port, mix, size, concurrency, seconds, timeout, seed):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {}
+    deadline = time.perf_counter() + seconds
+
+    async def client(index):
+        rng = random.Random(seed * 1000 + index)
+        connection = HttpConnection(host, port, timeout)
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                method, path, body = OPERATIONS[name](rng, size)
+                started = time.perf_counter()
+                try:
+                    status, _, _ = await connection.request(method, path, body)
+                except (asyncio.TimeoutError, OSError, ValueError, IndexError) as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                    await connection.close()
+                    continue
+                if status >= 400:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+                else:
+                    latencies[name].append(time.perf_counter() - started)
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = summarize([value for values in latencies.values() for value in values], errors, elapsed)
+    result['per_operation'] = {
+        name: summarize(values, {}, elapsed) for name, values in latencies.items() if values
+    }
+    return result
+
+
+def start_gunicorn(database_path, port, workers, log_path):
+    env = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{database_path}",
+        'GUNICORN_BIND': f"127.0.0.1:{port}",
+        'GUNICORN_WORKERS': str(workers),
+        'PYTHONPATH': ROOT,
+    }
+    log = open(log_path, 'wb')
+    command = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), 'main:app']
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def print_stage(workers, concurrency, result, locks, per_operation):
+    total = result['requests'] + sum(result['errors'].values())
+    error_rate = 100.0 * sum(result['errors'].values()) / total if total else 0.0
+    print(f"{str(workers):>7} {concurrency:>5} {result['throughput']:9.1f} {result['p50_ms']:9.1f} "
+          f"{result['p95_ms']:9.1f} {result['p99_ms']:9.1f} {error_rate:7.2f}% {locks:6d}  {result['errors'] or ''}")
+    if per_operation:
+        for name, stats in sorted(result['per_operation'].items()):
+            print(f"{'':>14} {name:<20} {stats['requests']:>7} ok  p50 {stats['p50_ms']:8.1f}  p99 {stats['p99_ms']:8.1f}")
+
+
+async def run_ramp(host, port, args, size, watcher, workers):
+    await wait_for_server(host, port)
+    watcher.count_new()
+    results = []
+    for concurrency in args.stages:
+        result = await run_stage(host, port, args.mix, size, concurrency, args.stage_seconds, args.timeout, args.seed)
+        # Lăsăm serverul să termine de scris în log înainte de numărare
+        await asyncio.sleep(0.2)
+        result['lock_timeouts'] = watcher.count_new()
+        result['workers'] = workers
+        result['concurrency'] = concurrency
+        print_stage(workers, concurrency, result, result['lock_timeouts'], args.per_operation)
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', type=parse_mix, default='mixed',
+                        help=f"preset ({', '.join(MIXES)}) or op=weight list; ops: {', '.join(OPERATIONS)}")
+    parser.add_argument('--workers', type=parse_int_list, default=[1, 2, 4], help='gunicorn worker counts')
+    parser.add_argument('--stages', type=parse_int_list, default=[4, 16, 64], help='concurrent clients per stage')
+    parser.add_argument('--stage-seconds', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=15, help='per-request timeout (seconds)')
+    parser.add_argument('--contacts', type=int, default=500)
+    parser.add_argument('--interactions', type=int, default=20000)
+    parser.add_argument('--tasks', type=int, default=1000)
+    parser.add_argument('--meetings', type=int, default=200)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--url', help='load an already running server instead of starting gunicorn')
+    parser.add_argument('--server-log', help='with --url: server log file to scan for lock timeouts')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--per-operation', action='store_true', help='print latency per operation')
+    parser.add_argument('--json', help='write all results to this file')
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+
+    print(f"{'workers':>7} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8} {'locks':>6}")
+    results = []
+    if args.url:
+        target = urlsplit(args.url)
+        size = {'contacts': args.contacts}
+        results += asyncio.run(run_ramp(
+            target.hostname, target.port or 80, args, size, LogWatcher(args.server_log), 'ext'
+        ))
+    else:
+        workdir = tempfile.mkdtemp(prefix='crm-load-')
+        template = os.path.join(workdir, 'seed.db')
+        size = seed_database(template, contacts=args.contacts, interactions=args.interactions,
+                             tasks=args.tasks, meetings=args.meetings)
+        for workers in args.workers:
+            # Fiecare configurație pornește de la aceeași bază, nu de la scrierile rundei anterioare
+            database_path = os.path.join(workdir, f"run-{workers}.db")
+            shutil.copyfile(template, database_path)
+            log_path = os.path.join(workdir, f"gunicorn-{workers}.log")
+            server = start_gunicorn(database_path, args.port, workers, log_path)
+            try:
+                results += asyncio.run(run_ramp('127.0.0.1', args.port, args, size, LogWatcher(log_path), workers))
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'mix': args.mix, 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""Populează o bază SQLite de benchmark cu date deterministe (seed fix).
+
+Datele sunt generate o singură dată per schemă și set de parametri, într-o
+bază șablon (backend/testing.py, în CRM_TEMPLATE_DIR sau în directorul
+temporar al sistemului); fiecare apel copiază șablonul în `path`.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed_database(path, contacts=200, interactions=2000, tasks=0, meetings=0, seed=42):
+    """Creează în `path` baza cu aceste date. Returnează numărul de rânduri pe tip."""
+    from backend.testing import template_database, clone_database, seed_sample_data
+
+    template = template_database(
+        seed_sample_data, contacts=contacts, interactions=interactions, tasks=tasks, meetings=meetings, seed=seed
+    )
+    clone_database(template, path)
+    return {
+        'companies': max(1, contacts // 10), 'contacts': contacts, 'interactions': interactions,
+        'tasks': tasks, 'meetings': meetings,
+    }
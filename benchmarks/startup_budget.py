@@ -0,0 +1,80 @@
+"""Măsoară timpul de import și de pornire a unui worker și îl compară cu bugetul.
+
+Fiecare măsurătoare rulează într-un proces Python nou (cold start). Scriptul
+iese cu cod 1 dacă bugetul este depășit sau dacă modulele folosite doar de
+CLI (Flask-Migrate/Alembic) sunt importate la pornirea unui worker, deci
+poate fi rulat în CI:
+
+    python benchmarks/startup_budget.py --import-budget-ms 1500 --startup-budget-ms 2500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import backend.app
+t1 = time.perf_counter()
+app = backend.app.create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+with app.app_context():
+    from backend.app import db
+    db.create_all()
+client = app.test_client()
+response = client.get("/api")
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "startup_ms": (t2 - t0) * 1000,
+    "status": response.status_code,
+    "cli_modules": sorted(m for m in ("flask_migrate", "alembic") if m in sys.modules),
+}))
+"""
+
+
+def measure():
+    env = dict(os.environ)
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--import-budget-ms', type=float, default=1500)
+    parser.add_argument('--startup-budget-ms', type=float, default=2500)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    import_ms = min(r['import_ms'] for r in results)
+    startup_ms = min(r['startup_ms'] for r in results)
+    print(f"import backend.app: {import_ms:7.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"create_app + first request: {startup_ms:7.1f} ms (budget {args.startup_budget_ms:.0f} ms)")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append('import time over budget')
+    if startup_ms > args.startup_budget_ms:
+        failures.append('startup time over budget')
+    if any(r['status'] != 200 for r in results):
+        failures.append('health check failed')
+    cli_modules = sorted({m for r in results for m in r['cli_modules']})
+    if cli_modules:
+        failures.append(f"CLI-only modules imported at worker start: {', '.join(cli_modules)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""CPU per cerere pentru interogările din backend/statements.py.
+
+Pentru fiecare endpoint mic (un task, o întâlnire, numărătorile) compară
+interogarea construită la fiecare cerere, ca înainte (Query legacy), cu
+lambda_stmt și cu select-ul precompilat din backend/statements.py, apoi
+măsoară CPU-ul per cerere al endpoint-urilor Flask complete (rutare și
+serializare JSON incluse).
+
+Rulare (folosește o bază SQLite temporară, nu crm_lite.db):
+
+    python benchmarks/statement_cache.py
+    python benchmarks/statement_cache.py --iterations 5000 --contacts 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seeding import seed_database  # noqa: E402
+from backend.app import create_app, db  # noqa: E402
+from backend import statements  # noqa: E402
+from backend.models import Meeting, Task, TaskStatus  # noqa: E402
+from sqlalchemy import select, func, lambda_stmt  # noqa: E402
+from sqlalchemy.orm import joinedload, selectinload  # noqa: E402
+
+ENDPOINTS = [
+    '/api/tasks/1',
+    '/api/meetings/1',
+    '/api/tasks/count',
+    '/api/meetings/upcoming-count',
+    '/api/notifications/unread-count',
+    '/api/interactions/count',
+]
+
+
+# Interogările așa cum erau scrise în handler-ele din backend/routes.py
+def legacy_get_task():
+    task = Task.query.get(1)
+    return task.to_dict()
+
+
+def legacy_get_meeting():
+    meeting = Meeting.query.get(1)
+    return meeting.to_dict()
+
+
+def legacy_count_tasks():
+    result = {status.name: count for status, count in
+              db.session.query(Task.status, func.count(Task.id)).group_by(Task.status).all()}
+    for status in TaskStatus.__members__.keys():
+        result.setdefault(status, 0)
+    return result
+
+
+def legacy_upcoming_count():
+    return Meeting.query.filter(Meeting.start >= datetime.utcnow()).count()
+
+
+# Aceleași interogări ca lambda_stmt, alternativa la select-urile precompilate
+def lambda_get_task():
+    task_id = 1
+    return db.session.scalars(lambda_stmt(
+        lambda: select(Task).options(joinedload(Task.contact), joinedload(Task.company)).where(Task.id == task_id)
+    )).first().to_dict()
+
+
+def lambda_get_meeting():
+    meeting_id = 1
+    return db.session.scalars(lambda_stmt(
+        lambda: select(Meeting).options(joinedload(Meeting.company), selectinload(Meeting.attendees))
+        .where(Meeting.id == meeting_id)
+    )).first().to_dict()
+
+
+def lambda_count_tasks():
+    result = {status.name: count for status, count in db.session.execute(
+        lambda_stmt(lambda: select(Task.status, func.count(Task.id)).group_by(Task.status))
+    )}
+    for status in TaskStatus.__members__.keys():
+        result.setdefault(status, 0)
+    return result
+
+
+def lambda_upcoming_count():
+    now = datetime.utcnow()
+    return db.session.scalar(lambda_stmt(lambda: select(func.count(Meeting.id)).where(Meeting.start >= now)))
+
+
+# (nume, Query legacy, lambda_stmt, backend/statements.py)
+QUERIES = [
+    ('get_task', legacy_get_task, lambda_get_task, lambda: statements.get_task(1).to_dict()),
+    ('get_meeting', legacy_get_meeting, lambda_get_meeting, lambda: statements.get_meeting(1).to_dict()),
+    ('count_tasks', legacy_count_tasks, lambda_count_tasks, statements.count_tasks_by_status),
+    ('upcoming_count', legacy_upcoming_count, lambda_upcoming_count,
+     lambda: statements.count_upcoming_meetings(datetime.utcnow())),
+]
+
+
+def cpu_per_call(func, iterations, rounds, fresh_session=True):
+    """Microsecunde CPU per apel (cea mai bună rundă); sesiunea e golită între apeluri, ca între cereri."""
+    for _ in range(min(50, iterations)):  # încălzire: cache-ul de compilare
+        func()
+        if fresh_session:
+            db.session.remove()
+    best = None
+    for _ in range(rounds):
+        started = time.process_time()
+        for _ in range(iterations):
+            func()
+            if fresh_session:
+                db.session.remove()
+        elapsed = 1e6 * (time.process_time() - started) / iterations
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=1000, help='calls per round')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--contacts', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--meetings', type=int, default=100)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='crm-bench-'), 'bench.db')
+    seed_database(path, contacts=args.contacts, interactions=1000, tasks=args.tasks, meetings=args.meetings)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{path}"})
+
+    # Query.get() emite LegacyAPIWarning; costul lui face parte din varianta veche
+    warnings.simplefilter('ignore')
+    with app.app_context():
+        print(f"{'query':<16} {'Query (old)':>12} {'lambda_stmt':>12} {'precompiled':>12} {'saved':>7}")
+        for name, legacy, lambda_version, precompiled in QUERIES:
+            assert legacy() == lambda_version() == precompiled(), name
+            before = cpu_per_call(legacy, args.iterations, args.rounds)
+            with_lambda = cpu_per_call(lambda_version, args.iterations, args.rounds)
+            after = cpu_per_call(precompiled, args.iterations, args.rounds)
+            print(f"{name:<16} {before:>9.1f} us {with_lambda:>9.1f} us {after:>9.1f} us "
+                  f"{100 * (1 - after / before):>6.1f}%")
+
+    client = app.test_client()
+    print()
+    print(f"{'endpoint':<34} {'CPU/request':>12}")
+    for path in ENDPOINTS:
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+        per_request = cpu_per_call(lambda: client.get(path), args.iterations, args.rounds, fresh_session=False)
+        print(f"{path:<34} {per_request:>9.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,8 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { BrowserRouter as Router, Routes, Route, Navigate } from 'react-router-dom';
 import Navbar from './components/Navbar';
 import ContactList from './components/ContactList';
 import ContactForm from './components/ContactForm';
-import { getAllContacts } from './services/contactService';
 import './style/dropdown.css';
 import CompanyList from './components/CompanyList';
 import CompanyForm from './components/CompanyForm';
@@ -17,9 +16,8 @@ import SalesPipelinePage from './components/SalesPipelinePage';
 import { NotificationProvider } from './contexts/NotificationContext';
 
 function App() {
-  const [contacts, setContacts] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
+  // ContactList își încarcă singură paginile de pe server; refreshKey îi cere
+  // să reîncarce prima pagină (ex: după salvarea unui contact)
   const [refreshKey, setRefreshKey] = useState(0);
 
   // Function to refresh the contacts list
@@ -27,25 +25,6 @@ function App() {
     setRefreshKey(prevKey => prevKey + 1);
   };
 
-  // Fetch contacts from API
-  useEffect(() => {
-    const fetchContacts = async () => {
-      try {
-        setLoading(true);
-        const data = await getAllContacts();
-        setContacts(data);
-        setError(null);
-      } catch (err) {
-        console.error('Error fetching contacts:', err);
-        setError('Failed to load contacts. Please try again later.');
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchContacts();
-  }, [refreshKey]);
-
   return (
     <NotificationProvider>
       <Router
@@ -57,11 +36,6 @@ function App() {
         <div className="d-flex flex-column min-vh-100">
           <Navbar />
           <main className="container py-4 flex-grow-1">
-            {error && (
-              <div className="alert alert-danger" role="alert">
-                {error}
-              </div>
-            )}
             <Routes>
               <Route path="/dashboard" element={<Dashboard />} />
               <Route path="/" element={<Navigate to="/dashboard" replace />} />
@@ -69,8 +43,7 @@ function App() {
                 path="/contacts" 
                 element={
                   <ContactList 
-                    contacts={contacts} 
-                    loading={loading} 
+                    refreshKey={refreshKey} 
                     refreshContacts={refreshContacts} 
                   />
                 } 
@@ -88,7 +61,6 @@ function App() {
                 element={
                   <ContactForm 
                     refreshContacts={refreshContacts}
-                    contacts={contacts}
                   />
                 } 
               />
@@ -1,62 +1,49 @@
-import React, { useState, useEffect } from 'react';
+import React, { useMemo, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { getAllCompanies, deleteCompany } from '../services/companyService';
+import VirtualGrid from './VirtualGrid';
+import { getCompaniesPage, deleteCompany } from '../services/companyService';
+import useDebouncedValue from '../hooks/useDebouncedValue';
+import usePagedList from '../hooks/usePagedList';
+
+// Înălțimea unui rând din grilă (un card de companie plus spațiere)
+const COMPANY_ROW_HEIGHT = 230;
 
 function CompanyList({ refreshCompanies }) {
-  const [companies, setCompanies] = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error, setError] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const [sort, setSort] = useState('name');
+  const [deleteError, setDeleteError] = useState(null);
 
-  useEffect(() => {
-    const fetchCompanies = async () => {
-      try {
-        setLoading(true);
-        setError(null);
-        const data = await getAllCompanies();
-        setCompanies(Array.isArray(data) ? data : []);
-      } catch (err) {
-        console.error('Error fetching companies:', err);
-        setError(err.message || 'Failed to load companies. Please try again later.');
-        setCompanies([]); // Reset companies on error
-      } finally {
-        setLoading(false);
-      }
-    };
-
-    fetchCompanies();
-  }, []);
+  // Căutarea rulează pe server, după o pauză în tastare
+  const debouncedSearch = useDebouncedValue(searchTerm.trim(), 300);
+  const params = useMemo(() => ({ q: debouncedSearch, sort }), [debouncedSearch, sort]);
+  const { items: companies, total, hasMore, loading, error: loadError, loadMore, reload } =
+    usePagedList(getCompaniesPage, params);
+  const error = deleteError || loadError;
 
   const handleDelete = async (id) => {
     if (window.confirm('Are you sure you want to delete this company?')) {
       try {
+        setDeleteError(null);
         await deleteCompany(id);
         // After successful deletion, refresh the companies list
-        const data = await getAllCompanies();
-        setCompanies(Array.isArray(data) ? data : []);
+        reload();
       } catch (err) {
-        setError(err.message || 'Failed to delete company. Please try again.');
+        setDeleteError(err.message || 'Failed to delete company. Please try again.');
       }
     }
   };
 
-  const filteredCompanies = companies.filter(company => {
-    const search = searchTerm.toLowerCase();
-    return (
-      company.name.toLowerCase().includes(search) ||
-      (company.website && company.website.toLowerCase().includes(search)) ||
-      (company.address && company.address.toLowerCase().includes(search))
-    );
-  });
-
-  if (loading) {
+  if (loading && companies.length === 0 && !searchTerm) {
     return <div className="text-center">Loading...</div>;
   }
 
   return (
     <div className="card bg-dark">
       <div className="card-header bg-dark">
-        <h2 className="mb-0">Companies</h2>
+        <h2 className="mb-0">
+          Companies
+          {typeof total === 'number' && <span className="badge bg-secondary ms-2 fs-6">{total}</span>}
+        </h2>
         <div className="form-group mt-3">
           <div className="input-group">
             <span className="input-group-text">
@@ -69,6 +56,18 @@ function CompanyList({ refreshCompanies }) {
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
             />
+            <select
+              className="form-select"
+              style={{ maxWidth: '11rem' }}
+              value={sort}
+              onChange={(e) => setSort(e.target.value)}
+              aria-label="Sort companies"
+            >
+              <option value="name">Name (A-Z)</option>
+              <option value="-name">Name (Z-A)</option>
+              <option value="-created">Newest first</option>
+              <option value="created">Oldest first</option>
+            </select>
           </div>
         </div>
       </div>
@@ -79,10 +78,14 @@ function CompanyList({ refreshCompanies }) {
         </div>
       )}
 
-      <div className="row row-cols-1 row-cols-md-2 row-cols-lg-3 g-4">
-        {Array.isArray(filteredCompanies) && filteredCompanies.map(company => (
-          <div key={company.id} className="col">
-            <div className="card h-100">
+      <VirtualGrid
+        items={companies}
+        rowHeight={COMPANY_ROW_HEIGHT}
+        hasMore={hasMore}
+        loading={loading}
+        onEndReached={loadMore}
+        renderItem={company => (
+            <div className="card h-100 overflow-hidden">
               <div className="card-body">
                 <h5 className="card-title">{company.name || 'Unnamed Company'}</h5>
                 {company.website && (
@@ -127,11 +130,10 @@ function CompanyList({ refreshCompanies }) {
                 </div>
               </div>
             </div>
-          </div>
-        ))}
-      </div>
+        )}
+      />
 
-      {filteredCompanies.length === 0 && (
+      {companies.length === 0 && !loading && (
         <div className="text-center my-5">
           <p className="text-muted">No companies found.</p>
         </div>
@@ -1,28 +1,40 @@
-import React, { useState } from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import { Link } from 'react-router-dom';
 import ContactCard from './ContactCard';
-import { deleteContact } from '../services/contactService';
+import VirtualGrid from './VirtualGrid';
+import { deleteContact, getContactsPage } from '../services/contactService';
+import useDebouncedValue from '../hooks/useDebouncedValue';
+import usePagedList from '../hooks/usePagedList';
 
-function ContactList({ contacts, loading, refreshContacts }) {
-  console.log("ContactList received contacts prop:", contacts);
+// Înălțimea unui rând din grilă (un card de contact plus spațiere)
+const CONTACT_ROW_HEIGHT = 250;
 
+const SORT_OPTIONS = [
+  { value: 'name', label: 'Name (A-Z)' },
+  { value: '-name', label: 'Name (Z-A)' },
+  { value: '-created', label: 'Newest first' },
+  { value: 'created', label: 'Oldest first' }
+];
+
+const CONTACT_TYPES = ['LEAD', 'PROSPECT', 'CUSTOMER', 'OTHER'];
+
+function ContactList({ refreshKey, refreshContacts }) {
   const [searchTerm, setSearchTerm] = useState('');
+  const [contactType, setContactType] = useState('');
+  const [sort, setSort] = useState('name');
   const [deleteStatus, setDeleteStatus] = useState({ loading: false, error: null });
 
-  // Filter contacts based on search term
-  const filteredContacts = contacts.filter(contact => {
-    const search = searchTerm.toLowerCase();
-    return (
-      contact.name.toLowerCase().includes(search) ||
-      (contact.company && typeof contact.company === 'string' 
-        ? contact.company.toLowerCase().includes(search)
-        : contact.company && typeof contact.company === 'object' && contact.company.name 
-          ? contact.company.name.toLowerCase().includes(search)
-          : false) ||
-      contact.email.toLowerCase().includes(search) ||
-      (contact.phone && contact.phone.includes(search))
-    );
-  });
+  // Căutarea și filtrele rulează pe server; termenul e trimis după o pauză în tastare
+  const debouncedSearch = useDebouncedValue(searchTerm.trim(), 300);
+  const params = useMemo(
+    () => ({ q: debouncedSearch, contact_type: contactType, sort }),
+    [debouncedSearch, contactType, sort]
+  );
+  const { items: contacts, total, hasMore, loading, error, loadMore, reload } = usePagedList(getContactsPage, params);
+
+  useEffect(() => {
+    if (refreshKey) reload();
+  }, [refreshKey, reload]);
 
 
 
@@ -31,7 +43,8 @@ function ContactList({ contacts, loading, refreshContacts }) {
       try {
         setDeleteStatus({ loading: true, error: null });
         await deleteContact(id);
-        refreshContacts();
+        reload();
+        if (refreshContacts) refreshContacts();
       } catch (error) {
         console.error('Failed to delete contact:', error);
         setDeleteStatus({ loading: false, error: 'Failed to delete contact. Please try again.' });
@@ -41,7 +54,7 @@ function ContactList({ contacts, loading, refreshContacts }) {
     }
   };
 
-  if (loading) {
+  if (loading && contacts.length === 0 && !searchTerm && !contactType) {
     return (
       <div className="text-center my-5">
         <div className="spinner-border text-primary" role="status">
@@ -55,7 +68,10 @@ function ContactList({ contacts, loading, refreshContacts }) {
   return (
     <div className="card bg-dark">
       <div className="card-header bg-dark">
-        <h2 className="mb-0">Contacts</h2>
+        <h2 className="mb-0">
+          Contacts
+          {typeof total === 'number' && <span className="badge bg-secondary ms-2 fs-6">{total}</span>}
+        </h2>
         <div className="form-group mt-3">
           <div className="input-group">
             <span className="input-group-text">
@@ -68,6 +84,29 @@ function ContactList({ contacts, loading, refreshContacts }) {
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
             />
+            <select
+              className="form-select"
+              style={{ maxWidth: '11rem' }}
+              value={contactType}
+              onChange={(e) => setContactType(e.target.value)}
+              aria-label="Contact type"
+            >
+              <option value="">All types</option>
+              {CONTACT_TYPES.map(type => (
+                <option key={type} value={type}>{type.charAt(0) + type.slice(1).toLowerCase()}</option>
+              ))}
+            </select>
+            <select
+              className="form-select"
+              style={{ maxWidth: '11rem' }}
+              value={sort}
+              onChange={(e) => setSort(e.target.value)}
+              aria-label="Sort contacts"
+            >
+              {SORT_OPTIONS.map(option => (
+                <option key={option.value} value={option.value}>{option.label}</option>
+              ))}
+            </select>
           </div>
         </div>
       </div>
@@ -76,12 +115,15 @@ function ContactList({ contacts, loading, refreshContacts }) {
         {deleteStatus.error && (
           <div className="alert alert-danger mb-3">{deleteStatus.error}</div>
         )}
+        {error && (
+          <div className="alert alert-danger mb-3">{error}</div>
+        )}
         
-        {filteredContacts.length === 0 ? (
+        {contacts.length === 0 && !loading ? (
           <div className="text-center my-4">
             <i className="fas fa-users fa-3x mb-3 text-secondary"></i>
             <h4>No contacts found</h4>
-            {searchTerm ? (
+            {searchTerm || contactType ? (
               <p>No contacts match your search. Try a different term or clear the search.</p>
             ) : (
               <p>Add your first contact to get started.</p>
@@ -91,17 +133,22 @@ function ContactList({ contacts, loading, refreshContacts }) {
             </Link>
           </div>
         ) : (
-          <div className="row row-cols-1 row-cols-md-2 row-cols-lg-3 g-4">
-            {filteredContacts.map(contact => (
-              <div className="col" key={contact.id}>
+          <VirtualGrid
+            items={contacts}
+            rowHeight={CONTACT_ROW_HEIGHT}
+            hasMore={hasMore}
+            loading={loading}
+            onEndReached={loadMore}
+            renderItem={contact => (
+              <div className="h-100 overflow-hidden">
                 <ContactCard 
                   contact={contact} 
                   onDelete={() => handleDelete(contact.id)}
                   deleteInProgress={deleteStatus.loading}
                 />
               </div>
-            ))}
-          </div>
+            )}
+          />
         )}
       </div>
     </div>
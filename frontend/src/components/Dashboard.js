@@ -1,9 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { getAllContacts } from '../services/contactService';
-import { getAllCompanies } from '../services/companyService';
-import { getTotalInteractionsCount } from '../services/interactionService';
-import { getMeetings } from '../services/meetingService';
+import { batchGetSettled } from '../services/batchService';
 import { useNotifications } from '../contexts/NotificationContext';
 
 const Dashboard = () => {
@@ -22,39 +19,33 @@ const Dashboard = () => {
       setLoading(true);
       setError(null);
       try {
-        // Obținem datele pentru contacte, companii și interacțiuni
-        const [contactsData, companiesData, interactionsCountData] = await Promise.all([
-          getAllContacts(),
-          getAllCompanies(),
-          getTotalInteractionsCount()
-        ]);
-        
-        // Încercăm să obținem meetings, dar dacă eșuează, nu oprim întregul dashboard
-        let upcomingMeetingsCount = 0;
-        try {
-          const meetingsData = await getMeetings();
-          
-          // Ne asigurăm că toate datele sunt procesate corect
-          const now = new Date();
-          // Verificăm fiecare meeting să aibă start ca Date, nu ca obiect complex
-          const upcomingMeetings = meetingsData.filter(meeting => {
-            const meetingStart = meeting.start instanceof Date 
-              ? meeting.start 
-              : new Date(meeting.start);
-            return meetingStart > now;
-          });
-          
-          upcomingMeetingsCount = upcomingMeetings.length;
-        } catch (meetingErr) {
-          console.warn("Meetings API not available yet:", meetingErr);
-          // Continuăm fără date de meetings
+        // Un singur round trip, doar cu cereri ieftine: paginile cu limit=1 dau
+        // totalul, iar numărul de întâlniri viitoare este calculat pe server.
+        // Listele complete sunt "heavy" (CRM_ADMISSION_HEAVY_LIMIT) și ar fi
+        // putut fi respinse cu 503 când sunt cerute împreună.
+        const paths = [
+          '/contacts?limit=1',
+          '/companies?limit=1',
+          '/interactions/count',
+          '/meetings/upcoming-count'
+        ];
+        const results = await batchGetSettled(paths);
+        // O sub-cerere eșuată afișează 0 pe cardul ei, nu golește tot dashboard-ul
+        results.forEach((result, index) => {
+          if (result.error) {
+            console.warn(`Dashboard: ${paths[index]} failed:`, result.error);
+          }
+        });
+        if (results.every((result) => result.error)) {
+          throw results[0].error;
         }
-        
+        const [contactsPage, companiesPage, interactionsCount, upcomingMeetings] = results.map((result) => result.data);
+
         setStats({
-          contacts: contactsData.length,
-          companies: companiesData.length,
-          interactions: interactionsCountData || 0,
-          upcoming: upcomingMeetingsCount
+          contacts: contactsPage ? contactsPage.total || 0 : 0,
+          companies: companiesPage ? companiesPage.total || 0 : 0,
+          interactions: interactionsCount ? interactionsCount.count || 0 : 0,
+          upcoming: upcomingMeetings ? upcomingMeetings.upcoming_meetings_count || 0 : 0
         });
       } catch (err) {
         console.error("Error fetching dashboard stats:", err);
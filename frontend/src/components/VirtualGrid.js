@@ -0,0 +1,75 @@
+import React, { useCallback, useEffect, useRef, useState } from 'react';
+
+// Aceleași praguri ca row-cols-md-2 / row-cols-lg-3 din Bootstrap
+const columnsForWidth = (width) => (width >= 992 ? 3 : width >= 768 ? 2 : 1);
+
+/**
+ * Grilă virtualizată: doar rândurile vizibile (plus `overscan`) există în DOM.
+ * Rândurile au înălțime fixă (`rowHeight`), deci poziția oricărui element se
+ * calculează fără a-l randa. Când utilizatorul ajunge aproape de ultimul rând
+ * încărcat este apelat `onEndReached` (infinite scroll).
+ */
+function VirtualGrid({ items, rowHeight, renderItem, onEndReached, hasMore = false, loading = false,
+                       height = '70vh', overscan = 3, getKey = (item) => item.id }) {
+  const containerRef = useRef(null);
+  const [scrollTop, setScrollTop] = useState(0);
+  const [viewport, setViewport] = useState({ width: 0, height: 0 });
+
+  useEffect(() => {
+    const container = containerRef.current;
+    const measure = () => setViewport({ width: container.clientWidth, height: container.clientHeight });
+    measure();
+    const observer = new ResizeObserver(measure);
+    observer.observe(container);
+    return () => observer.disconnect();
+  }, []);
+
+  const columns = columnsForWidth(viewport.width);
+  const rowCount = Math.ceil(items.length / columns);
+  const firstRow = Math.max(0, Math.floor(scrollTop / rowHeight) - overscan);
+  const lastRow = Math.min(rowCount - 1, Math.ceil((scrollTop + viewport.height) / rowHeight) + overscan);
+
+  useEffect(() => {
+    // Cerem pagina următoare înainte ca utilizatorul să ajungă la capăt
+    if (hasMore && !loading && onEndReached && lastRow >= rowCount - overscan) {
+      onEndReached();
+    }
+  }, [hasMore, loading, onEndReached, lastRow, rowCount, overscan]);
+
+  const handleScroll = useCallback((event) => setScrollTop(event.currentTarget.scrollTop), []);
+
+  const rows = [];
+  for (let row = firstRow; row <= lastRow; row += 1) {
+    const rowItems = items.slice(row * columns, (row + 1) * columns);
+    rows.push(
+      <div
+        key={row}
+        className={`row row-cols-${columns} g-4 position-absolute start-0 end-0 m-0`}
+        style={{ top: row * rowHeight, height: rowHeight }}
+      >
+        {rowItems.map((item) => (
+          <div className="col" key={getKey(item)} style={{ height: rowHeight }}>
+            {renderItem(item)}
+          </div>
+        ))}
+      </div>
+    );
+  }
+
+  return (
+    <div ref={containerRef} onScroll={handleScroll} style={{ height, overflowY: 'auto', overflowX: 'hidden' }}>
+      <div className="position-relative" style={{ height: rowCount * rowHeight }}>
+        {rows}
+      </div>
+      {loading && items.length > 0 && (
+        <div className="text-center py-3">
+          <div className="spinner-border spinner-border-sm text-primary" role="status">
+            <span className="visually-hidden">Loading...</span>
+          </div>
+        </div>
+      )}
+    </div>
+  );
+}
+
+export default VirtualGrid;
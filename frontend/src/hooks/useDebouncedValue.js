@@ -0,0 +1,16 @@
+import { useEffect, useState } from 'react';
+
+/**
+ * Returnează `value` doar după ce a rămas neschimbat `delay` ms
+ * (ex: termenul de căutare, ca să nu trimitem o cerere la fiecare tastă).
+ */
+export default function useDebouncedValue(value, delay = 300) {
+  const [debounced, setDebounced] = useState(value);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+
+  return debounced;
+}
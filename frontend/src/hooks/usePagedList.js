@@ -0,0 +1,51 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+/**
+ * Listă paginată cu cursor (răspunsuri { items, next_cursor, total }).
+ *
+ * Prima pagină este cerută din nou la fiecare schimbare a `params`; loadMore()
+ * adaugă pagina următoare. Răspunsurile sosite după o schimbare a filtrelor
+ * (cereri mai vechi) sunt ignorate.
+ * @param {function} fetchPage - ex: getContactsPage.
+ * @param {object} params - Filtre și sortare, fără cursor.
+ */
+export default function usePagedList(fetchPage, params) {
+  const [items, setItems] = useState([]);
+  const [total, setTotal] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+  const requestId = useRef(0);
+  const paramsKey = JSON.stringify(params);
+
+  const load = useCallback(async (cursor) => {
+    const id = ++requestId.current;
+    setLoading(true);
+    setError(null);
+    try {
+      const page = await fetchPage({ ...JSON.parse(paramsKey), ...(cursor ? { cursor } : {}) });
+      if (id !== requestId.current) return;
+      setItems((previous) => (cursor ? [...previous, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
+      if (!cursor) setTotal(page.total);
+    } catch (err) {
+      if (id !== requestId.current) return;
+      console.error('Error fetching list page:', err);
+      setError(err.message || 'Failed to load data. Please try again later.');
+    } finally {
+      if (id === requestId.current) setLoading(false);
+    }
+  }, [fetchPage, paramsKey]);
+
+  useEffect(() => {
+    load(null);
+  }, [load]);
+
+  const loadMore = useCallback(() => {
+    if (nextCursor && !loading) load(nextCursor);
+  }, [load, loading, nextCursor]);
+
+  const reload = useCallback(() => load(null), [load]);
+
+  return { items, total, hasMore: !!nextCursor, loading, error, loadMore, reload };
+}
@@ -1,7 +1,9 @@
 import axios from 'axios';
 
+// O singură instanță pentru toate serviciile; cererile GET trec prin queryCache.js.
+// În dezvoltare, '/api' ajunge la backend prin proxy-ul din package.json.
 const api = axios.create({
-  baseURL: 'http://localhost:5001/api',
+  baseURL: process.env.REACT_APP_API_URL || '/api',
   headers: {
     'Content-Type': 'application/json',
   },
@@ -0,0 +1,75 @@
+import api from './api';
+import { handleError } from './errorHandler';
+import { getFreshData, setQueryData } from './queryCache';
+
+/**
+ * Trimite mai multe cereri API într-un singur round trip (POST /api/batch).
+ * @param {Array<{method?: string, path: string, body?: object}>} requests - Căi relative la /api (ex: '/contacts').
+ * @param {object} options - { parallel: true } rulează cererile GET în paralel pe server.
+ * @returns {Promise<Array<{status: number, body: any}>>} Răspunsurile, în aceeași ordine.
+ */
+export const batchRequests = async (requests, { parallel = false } = {}) => {
+  try {
+    const response = await api.post('/batch', {
+      parallel,
+      requests: requests.map(({ method = 'GET', path, body = null }) => ({
+        method,
+        path: `/api${path}`,
+        body,
+      })),
+    });
+    return response.data.responses;
+  } catch (error) {
+    console.error('Error executing batch request:', error);
+    throw handleError(error);
+  }
+};
+
+/**
+ * Variantă pentru citiri care nu aruncă pentru sub-cereri eșuate: returnează,
+ * în aceeași ordine, { data } sau { error } pentru fiecare cale. Căile aflate
+ * deja proaspete în queryCache nu mai sunt cerute, iar răspunsurile noi sunt
+ * salvate în cache (astfel getAllContacts() imediat după Dashboard nu mai face
+ * o cerere). Dacă tot batch-ul eșuează, fiecare cale primește aceeași eroare.
+ * @param {Array<string>} paths - Căi relative la /api.
+ */
+export const batchGetSettled = async (paths) => {
+  const results = paths.map((path) => {
+    const data = getFreshData(path);
+    return data === undefined ? undefined : { data };
+  });
+  const missing = paths.filter((path, index) => results[index] === undefined);
+  if (missing.length === 0) {
+    return results;
+  }
+  let fetched;
+  try {
+    const responses = await batchRequests(missing.map((path) => ({ path })), { parallel: true });
+    fetched = responses.map((response, index) => {
+      if (response.status >= 400) {
+        const message = response.body && response.body.error ? response.body.error : `Request to ${missing[index]} failed`;
+        return { error: new Error(message) };
+      }
+      setQueryData(missing[index], {}, response.body);
+      return { data: response.body };
+    });
+  } catch (error) {
+    fetched = missing.map(() => ({ error }));
+  }
+  let next = 0;
+  return results.map((result) => (result === undefined ? fetched[next++] : result));
+};
+
+/**
+ * Variantă pentru citiri: returnează doar body-urile și aruncă prima eroare
+ * dacă vreuna dintre sub-cereri a eșuat.
+ * @param {Array<string>} paths - Căi relative la /api.
+ */
+export const batchGet = async (paths) => {
+  const results = await batchGetSettled(paths);
+  const failed = results.find((result) => result.error);
+  if (failed) {
+    throw failed.error;
+  }
+  return results.map((result) => result.data);
+};
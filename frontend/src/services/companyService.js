@@ -1,11 +1,12 @@
 import api from './api';
 import { handleError } from './errorHandler';
+import { cachedGet, invalidateResource } from './queryCache';
 
 export const getAllCompanies = async () => {
   try {
-    const response = await api.get('/companies');
+    const data = await cachedGet('/companies');
     // Ensure we're returning an array
-    return Array.isArray(response.data) ? response.data : [];
+    return Array.isArray(data) ? data : [];
   } catch (error) {
     console.error('Error in getAllCompanies:', error);
     // Don't return the error, throw it
@@ -13,10 +14,29 @@ export const getAllCompanies = async () => {
   }
 };
 
+// O pagină de companii, filtrată și sortată pe server.
+// params: { q, sort ('name', '-name', 'created', '-created'), cursor, limit }
+export const getCompaniesPage = async (params = {}) => {
+  try {
+    return await cachedGet('/companies', { params: { limit: 50, ...params } }); // { items, next_cursor, total }
+  } catch (error) {
+    throw handleError(error);
+  }
+};
+
 export const getCompany = async (id) => {
   try {
-    const response = await api.get(`/companies/${id}`);
-    return response.data;
+    return await cachedGet(`/companies/${id}`);
+  } catch (error) {
+    throw handleError(error);
+  }
+};
+
+// Pagină din timeline-ul companiei (interacțiuni, întâlniri, task-uri)
+export const getCompanyTimeline = async (id, { cursor, limit, types } = {}) => {
+  try {
+    const response = await api.get(`/companies/${id}/timeline`, { params: { cursor, limit, types } });
+    return response.data; // { items, next_cursor }
   } catch (error) {
     throw handleError(error);
   }
@@ -25,6 +45,7 @@ export const getCompany = async (id) => {
 export const createCompany = async (companyData) => {
   try {
     const response = await api.post('/companies', companyData);
+    invalidateResource('companies');
     return response.data;
   } catch (error) {
     throw handleError(error);
@@ -34,6 +55,7 @@ export const createCompany = async (companyData) => {
 export const updateCompany = async (id, companyData) => {
   try {
     const response = await api.put(`/companies/${id}`, companyData);
+    invalidateResource('companies');
     return response.data;
   } catch (error) {
     throw handleError(error);
@@ -43,6 +65,7 @@ export const updateCompany = async (id, companyData) => {
 export const deleteCompany = async (id) => {
   try {
     const response = await api.delete(`/companies/${id}`);
+    invalidateResource('companies');
     return response.data;
   } catch (error) {
     throw handleError(error);
@@ -1,15 +1,5 @@
-import axios from 'axios';
-
-// Base API URL
-const API_URL = '/api';
-
-// Create an axios instance
-const api = axios.create({
-  baseURL: API_URL,
-  headers: {
-    'Content-Type': 'application/json'
-  }
-});
+import api from './api';
+import { cachedGet, invalidateResource } from './queryCache';
 
 // Error handler helper
 const handleError = (error) => {
@@ -34,8 +24,17 @@ const handleError = (error) => {
 // Get all contacts
 export const getAllContacts = async () => {
   try {
-    const response = await api.get('/contacts');
-    return response.data;
+    return await cachedGet('/contacts');
+  } catch (error) {
+    throw handleError(error);
+  }
+};
+
+// Get one page of contacts, filtered and sorted by the server.
+// params: { q, company_id, contact_type, sales_stage, sort ('name', '-name', 'created', '-created'), cursor, limit }
+export const getContactsPage = async (params = {}) => {
+  try {
+    return await cachedGet('/contacts', { params: { limit: 50, ...params } }); // { items, next_cursor, total }
   } catch (error) {
     throw handleError(error);
   }
@@ -44,8 +43,17 @@ export const getAllContacts = async () => {
 // Get a contact by ID
 export const getContactById = async (id) => {
   try {
-    const response = await api.get(`/contacts/${id}`);
-    return response.data;
+    return await cachedGet(`/contacts/${id}`);
+  } catch (error) {
+    throw handleError(error);
+  }
+};
+
+// Get a page of the contact's activity timeline (interactions, meetings, tasks)
+export const getContactTimeline = async (id, { cursor, limit, types } = {}) => {
+  try {
+    const response = await api.get(`/contacts/${id}/timeline`, { params: { cursor, limit, types } });
+    return response.data; // { items, next_cursor }
   } catch (error) {
     throw handleError(error);
   }
@@ -55,6 +63,7 @@ export const getContactById = async (id) => {
 export const createContact = async (contactData) => {
   try {
     const response = await api.post('/contacts', contactData);
+    invalidateResource('contacts');
     return response.data;
   } catch (error) {
     throw handleError(error);
@@ -65,6 +74,20 @@ export const createContact = async (contactData) => {
 export const updateContact = async (id, contactData) => {
   try {
     const response = await api.put(`/contacts/${id}`, contactData);
+    invalidateResource('contacts');
+    return response.data;
+  } catch (error) {
+    throw handleError(error);
+  }
+};
+
+// Partially update a contact with a single conditional UPDATE.
+// Pass the contact's `version` to reject the edit if someone else changed it (HTTP 412).
+export const patchContact = async (id, changes, version) => {
+  try {
+    const headers = version !== undefined ? { 'If-Match': `"${version}"` } : {};
+    const response = await api.patch(`/contacts/${id}`, changes, { headers });
+    invalidateResource('contacts');
     return response.data;
   } catch (error) {
     throw handleError(error);
@@ -75,8 +98,30 @@ export const updateContact = async (id, contactData) => {
 export const deleteContact = async (id) => {
   try {
     const response = await api.delete(`/contacts/${id}`);
+    invalidateResource('contacts');
     return response.data;
   } catch (error) {
     throw handleError(error);
   }
 };
+
+// Groups of probable duplicate contacts: { total, groups: [{ ids, score, reasons, contacts }] }
+export const getDuplicateContacts = async ({ minScore, limit } = {}) => {
+  try {
+    return await cachedGet('/contacts/duplicates', { params: { min_score: minScore, limit } });
+  } catch (error) {
+    throw handleError(error);
+  }
+};
+
+// Merge duplicate contacts into the contact `id` (their interactions, tasks, meetings and notifications move to it)
+export const mergeContacts = async (id, duplicateIds) => {
+  try {
+    const response = await api.post(`/contacts/${id}/merge`, { duplicate_ids: duplicateIds });
+    invalidateResource('interactions');
+    invalidateResource('contacts');
+    return response.data; // { contact, moved }
+  } catch (error) {
+    throw handleError(error);
+  }
+};
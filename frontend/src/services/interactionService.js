@@ -1,5 +1,6 @@
 import api from './api';
 import { handleError } from './errorHandler';
+import { cachedGet, invalidateResource } from './queryCache';
 
 /**
  * Creează o nouă interacțiune.
@@ -9,6 +10,7 @@ import { handleError } from './errorHandler';
 export const createInteraction = async (interactionData) => {
   try {
     const response = await api.post('/interactions', interactionData);
+    invalidateResource('interactions');
     return response.data;
   } catch (error) {
     console.error('Error creating interaction:', error);
@@ -24,6 +26,7 @@ export const createInteraction = async (interactionData) => {
 export const deleteInteraction = async (interactionId) => {
   try {
     const response = await api.delete(`/interactions/${interactionId}`);
+    invalidateResource('interactions');
     return response.data;
   } catch (error) {
     console.error(`Error deleting interaction ${interactionId}:`, error);
@@ -39,10 +42,9 @@ export const deleteInteraction = async (interactionId) => {
 export const getInteractionsForCompany = async (companyId) => {
   try {
     // Presupunem că API-ul suportă filtrarea prin query parameter `company_id`
-    const response = await api.get('/interactions', {
+    return await cachedGet('/interactions', {
       params: { company_id: companyId }
     });
-    return response.data;
   } catch (error) {
     console.error(`Error fetching interactions for company ${companyId}:`, error);
     throw handleError(error);
@@ -55,8 +57,8 @@ export const getInteractionsForCompany = async (companyId) => {
  */
 export const getTotalInteractionsCount = async () => {
   try {
-    const response = await api.get('/interactions/count');
-    return response.data.count; // Returnează direct numărul
+    const data = await cachedGet('/interactions/count');
+    return data.count; // Returnează direct numărul
   } catch (error) {
     console.error('Error fetching total interactions count:', error);
     throw handleError(error);
@@ -69,9 +71,9 @@ export const getTotalInteractionsCount = async () => {
  */
 export const getAllInteractions = async () => {
   try {
-    const response = await api.get('/interactions');
+    const data = await cachedGet('/interactions');
     // Asigură-te că returnezi un array, chiar dacă API-ul returnează altceva din greșeală
-    return Array.isArray(response.data) ? response.data : []; 
+    return Array.isArray(data) ? data : [];
   } catch (error) {
     console.error('Error fetching all interactions:', error);
     throw handleError(error);
@@ -1,18 +1,19 @@
 import api from './api';
+import { cachedGet, invalidateResource } from './queryCache';
 
 // Get all meetings
 export const getMeetings = async () => {
   try {
-    const response = await api.get('/meetings');
+    const data = await cachedGet('/meetings');
     
     // Validare răspuns
-    if (!response || !Array.isArray(response.data)) {
-      console.error('Invalid response from API:', response);
+    if (!Array.isArray(data)) {
+      console.error('Invalid response from API:', data);
       return [];
     }
     
     // Procesăm datele pentru a ne asigura că sunt în formatul corect
-    return response.data.map(meeting => {
+    return data.map(meeting => {
       if (!meeting) return null;
       
       try {
@@ -38,16 +39,14 @@ export const getMeetings = async () => {
 // Get a single meeting by ID
 export const getMeeting = async (id) => {
   try {
-    const response = await api.get(`/meetings/${id}`);
+    const meeting = await cachedGet(`/meetings/${id}`);
     
     // Validare răspuns
-    if (!response || !response.data) {
-      console.error('Invalid response from API:', response);
+    if (!meeting) {
+      console.error('Invalid response from API:', meeting);
       throw new Error('Meeting not found');
     }
     
-    const meeting = response.data;
-    
     // Procesăm datele pentru a ne asigura că sunt în formatul corect
     return {
       id: String(meeting.id || ''),
@@ -76,6 +75,7 @@ export const createMeeting = async (meetingData) => {
     };
     
     const response = await api.post('/meetings', formattedData);
+    invalidateResource('meetings');
     
     // Validare răspuns
     if (!response || !response.data) {
@@ -118,6 +118,7 @@ export const updateMeeting = async (meetingData) => {
     };
     
     const response = await api.put(`/meetings/${meetingData.id}`, formattedData);
+    invalidateResource('meetings');
     
     // Validare răspuns
     if (!response || !response.data) {
@@ -146,6 +147,7 @@ export const updateMeeting = async (meetingData) => {
 export const deleteMeeting = async (id) => {
   try {
     const response = await api.delete(`/meetings/${id}`);
+    invalidateResource('meetings');
     return response.data;
   } catch (error) {
     console.error(`Error deleting meeting with id ${id}:`, error);
@@ -1,15 +1,17 @@
-import axios from 'axios';
+import api from './api';
+import { cachedGet, invalidateResource } from './queryCache';
 
-const API_BASE_URL = '/api'; // Sau adresa completă dacă backend-ul rulează pe alt port/domeniu în dezvoltare
+// Numărul de necitite este afișat în navbar și verificat des: îl considerăm proaspăt mai puțin timp
+const UNREAD_COUNT_STALE_TIME = 10 * 1000;
 
 /**
- * Preia toate notificările de la backend.
+ * Preia notificările de la backend: necitite întâi, apoi cele mai recente citite.
+ * @param {Object} [params] - Opțional: { limit, unread } (limit implicit 50 pe server).
  * @returns {Promise<Array>} O promisiune care rezolvă cu un array de obiecte notificare.
  */
-export const getNotifications = async () => {
+export const getNotifications = async (params = {}) => {
     try {
-        const response = await axios.get(`${API_BASE_URL}/notifications`);
-        return response.data;
+        return await cachedGet('/notifications', { params });
     } catch (error) {
         console.error("Error fetching notifications:", error.response?.data || error.message);
         // Poți arunca eroarea mai departe sau returna un array gol/null pentru a o trata în componentă
@@ -24,7 +26,8 @@ export const getNotifications = async () => {
  */
 export const markNotificationAsRead = async (notificationId) => {
     try {
-        const response = await axios.put(`${API_BASE_URL}/notifications/${notificationId}/read`);
+        const response = await api.put(`/notifications/${notificationId}/read`);
+        invalidateResource('notifications');
         return response.data;
     } catch (error) {
         console.error(`Error marking notification ${notificationId} as read:`, error.response?.data || error.message);
@@ -33,13 +36,13 @@ export const markNotificationAsRead = async (notificationId) => {
 };
 
 /**
- * Calculează numărul de notificări necitite.
+ * Preia numărul de notificări necitite (calculat pe server).
  * @returns {Promise<number>} O promisiune care rezolvă cu numărul de notificări necitite.
  */
 export const getUnreadNotificationsCount = async () => {
     try {
-        const notifications = await getNotifications();
-        return notifications.filter(notification => !notification.is_read).length;
+        const data = await cachedGet('/notifications/unread-count', { staleTime: UNREAD_COUNT_STALE_TIME });
+        return data.unread_count;
     } catch (error) {
         console.error("Error counting unread notifications:", error);
         // În caz de eroare, returnăm 0 în loc să aruncăm eroarea mai departe
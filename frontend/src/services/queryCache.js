@@ -0,0 +1,166 @@
+import api from './api';
+
+/**
+ * Cache comun pentru cererile GET ale tuturor serviciilor.
+ *
+ * - cererile identice aflate în curs sunt deduplicate (o singură cerere HTTP);
+ * - stale-while-revalidate: un răspuns mai vechi de `staleTime` este returnat
+ *   imediat și reîmprospătat în fundal;
+ * - revalidarea trimite If-None-Match cu ETag-ul primit; un 304 păstrează datele;
+ * - după o modificare, `invalidateQueries(['/contacts'])` marchează intrările
+ *   afectate: următoarea citire așteaptă răspunsul proaspăt.
+ *
+ * Cheia unei intrări este calea plus parametrii sortați, ex: "/tasks?status=Pending".
+ */
+
+export const DEFAULT_STALE_TIME = 30 * 1000;
+// Intrările nefolosite mai mult de atât sunt eliminate
+const MAX_UNUSED_AGE = 10 * 60 * 1000;
+
+const entries = new Map();
+const listeners = new Set();
+
+export const queryKey = (path, params = {}) => {
+  const query = Object.keys(params)
+    .filter((name) => params[name] !== undefined && params[name] !== null && params[name] !== '')
+    .sort()
+    .map((name) => `${encodeURIComponent(name)}=${encodeURIComponent(params[name])}`)
+    .join('&');
+  return query ? `${path}?${query}` : path;
+};
+
+const getEntry = (key) => {
+  let entry = entries.get(key);
+  if (!entry) {
+    // `generation` crește la fiecare invalidare: un răspuns pornit înainte de
+    // o modificare nu poate marca intrarea drept proaspătă
+    entry = { data: undefined, etag: null, fetchedAt: 0, invalidated: false, generation: 0, promise: null };
+    entries.set(key, entry);
+  }
+  entry.usedAt = Date.now();
+  return entry;
+};
+
+const notify = (key) => listeners.forEach((listener) => listener(key));
+
+const revalidate = (key, path, params) => {
+  const entry = getEntry(key);
+  if (entry.promise && entry.promiseGeneration === entry.generation) {
+    return entry.promise;
+  }
+  const generation = entry.generation;
+  const headers = entry.etag && entry.data !== undefined ? { 'If-None-Match': entry.etag } : {};
+  const promise = api
+    .get(path, { params, headers, validateStatus: (status) => (status >= 200 && status < 300) || status === 304 })
+    .then((response) => {
+      if (generation !== entry.generation) {
+        // Invalidată între timp: răspunsul cererii mai noi este cel valabil
+        return entry.promise && entry.promise !== promise ? entry.promise : response.data;
+      }
+      if (response.status !== 304) {
+        entry.data = response.data;
+        entry.etag = response.headers.etag || null;
+      }
+      entry.fetchedAt = Date.now();
+      entry.invalidated = false;
+      notify(key);
+      return entry.data;
+    })
+    .finally(() => {
+      if (entry.promise === promise) {
+        entry.promise = null;
+      }
+    });
+  entry.promise = promise;
+  entry.promiseGeneration = generation;
+  return promise;
+};
+
+/**
+ * GET prin cache. Returnează datele (posibil ușor învechite, vezi staleTime).
+ * @param {string} path - Cale relativă la /api, ex: '/companies'.
+ * @param {object} options - { params, staleTime, force: true ignoră cache-ul }.
+ */
+export const cachedGet = async (path, { params = {}, staleTime = DEFAULT_STALE_TIME, force = false } = {}) => {
+  const key = queryKey(path, params);
+  const entry = getEntry(key);
+  const hasData = entry.data !== undefined;
+
+  if (!force && hasData && !entry.invalidated) {
+    if (Date.now() - entry.fetchedAt > staleTime) {
+      // Răspuns învechit: îl returnăm acum și îl reîmprospătăm în fundal
+      revalidate(key, path, params).catch((error) => console.error(`Background refresh of ${key} failed:`, error));
+    }
+    return entry.data;
+  }
+  return revalidate(key, path, params);
+};
+
+/**
+ * Returnează datele din cache pentru o cheie dacă sunt proaspete, altfel undefined.
+ */
+export const getFreshData = (path, params = {}, staleTime = DEFAULT_STALE_TIME) => {
+  const entry = entries.get(queryKey(path, params));
+  if (!entry || entry.invalidated || entry.data === undefined || Date.now() - entry.fetchedAt > staleTime) {
+    return undefined;
+  }
+  entry.usedAt = Date.now();
+  return entry.data;
+};
+
+/**
+ * Salvează în cache un răspuns obținut pe altă cale (ex: dintr-un batch).
+ */
+export const setQueryData = (path, params, data) => {
+  const key = queryKey(path, params);
+  const entry = getEntry(key);
+  entry.data = data;
+  entry.etag = null;
+  entry.fetchedAt = Date.now();
+  entry.invalidated = false;
+  entry.generation += 1;
+  notify(key);
+};
+
+/**
+ * Marchează drept invalide intrările ale căror chei încep cu unul dintre prefixe.
+ * Un prefix "/contacts" potrivește "/contacts", "/contacts/5" și "/contacts?page=2",
+ * dar nu "/contactsX".
+ */
+export const invalidateQueries = (prefixes) => {
+  const now = Date.now();
+  entries.forEach((entry, key) => {
+    if (now - entry.usedAt > MAX_UNUSED_AGE && !entry.promise) {
+      entries.delete(key);
+      return;
+    }
+    const matches = prefixes.some((prefix) => key === prefix || key.startsWith(`${prefix}/`) || key.startsWith(`${prefix}?`));
+    if (matches) {
+      entry.invalidated = true;
+      entry.generation += 1;
+      notify(key);
+    }
+  });
+};
+
+export const clearQueryCache = () => entries.clear();
+
+/**
+ * Abonare la schimbări (date noi sau invalidare). Returnează funcția de dezabonare.
+ */
+export const subscribeToQueries = (listener) => {
+  listeners.add(listener);
+  return () => listeners.delete(listener);
+};
+
+// Ce liste sunt afectate de modificarea fiecărei resurse
+export const RELATED_QUERIES = {
+  contacts: ['/contacts', '/companies', '/sales', '/reports', '/tasks', '/meetings'],
+  companies: ['/companies', '/contacts', '/sales', '/tasks', '/meetings', '/interactions', '/reports'],
+  interactions: ['/interactions', '/reports', '/notifications', '/contacts', '/companies'],
+  meetings: ['/meetings', '/contacts', '/companies'],
+  tasks: ['/tasks', '/contacts', '/companies'],
+  notifications: ['/notifications'],
+};
+
+export const invalidateResource = (resource) => invalidateQueries(RELATED_QUERIES[resource]);
@@ -1,18 +1,58 @@
 import api from './api';
 import { handleError } from './errorHandler';
+import { cachedGet } from './queryCache';
 
 /**
  * Preluare raport interacțiuni grupate după tip.
  * @returns {Promise<object>} Un obiect cu { 'TipInteracțiune': count }.
  */
-export const getInteractionsByTypeReport = async () => {
+export const getInteractionsByTypeReport = async (params = {}) => {
   try {
-    const response = await api.get('/reports/interactions-by-type');
-    return response.data; // API-ul returnează deja obiectul formatat
+    return await cachedGet('/reports/interactions-by-type', { params }); // API-ul returnează deja obiectul formatat
   } catch (error) {
     console.error('Error fetching interactions by type report:', error);
     throw handleError(error);
   }
 };
 
+/**
+ * Preluare serie de timp a interacțiunilor (din rollup-urile zilnice).
+ * @param {object} params - { start, end, granularity: 'day'|'week'|'month', company_id, interaction_type }
+ * @returns {Promise<object>} { start, end, granularity, series: [{ period, counts, total }] }
+ */
+export const getInteractionsTimeseriesReport = async (params = {}) => {
+  try {
+    return await cachedGet('/reports/interactions-timeseries', { params });
+  } catch (error) {
+    console.error('Error fetching interactions timeseries report:', error);
+    throw handleError(error);
+  }
+};
+
+/**
+ * Preluare istoric status task-uri (snapshot-uri zilnice).
+ * @param {object} params - { start, end, granularity }
+ */
+export const getTaskStatusHistoryReport = async (params = {}) => {
+  try {
+    return await cachedGet('/reports/task-status-history', { params });
+  } catch (error) {
+    console.error('Error fetching task status history report:', error);
+    throw handleError(error);
+  }
+};
+
+/**
+ * Preluare istoric etape de vânzare (snapshot-uri zilnice).
+ * @param {object} params - { start, end, granularity }
+ */
+export const getSalesStageHistoryReport = async (params = {}) => {
+  try {
+    return await cachedGet('/reports/sales-stage-history', { params });
+  } catch (error) {
+    console.error('Error fetching sales stage history report:', error);
+    throw handleError(error);
+  }
+};
+
 // More reports will be added here in the future
\ No newline at end of file
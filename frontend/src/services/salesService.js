@@ -1,5 +1,6 @@
 import api from './api';
 import { handleError } from './errorHandler';
+import { cachedGet, invalidateResource } from './queryCache';
 
 /**
  * Service for managing sales pipeline data
@@ -11,8 +12,7 @@ export const salesService = {
    */
   getPipelineData: async () => {
     try {
-      const response = await api.get('/sales/pipeline');
-      return response.data;
+      return await cachedGet('/sales/pipeline');
     } catch (error) {
       return handleError(error, 'Error fetching sales pipeline data');
     }
@@ -27,6 +27,7 @@ export const salesService = {
   updateContactStage: async (contactId, salesStage) => {
     try {
       const response = await api.put(`/contacts/${contactId}`, { sales_stage: salesStage });
+      invalidateResource('contacts');
       return response.data;
     } catch (error) {
       return handleError(error, `Error updating contact stage for ${contactId}`);
@@ -42,6 +43,7 @@ export const salesService = {
   updateContactType: async (contactId, contactType) => {
     try {
       const response = await api.put(`/contacts/${contactId}`, { contact_type: contactType });
+      invalidateResource('contacts');
       return response.data;
     } catch (error) {
       return handleError(error, `Error updating contact type for ${contactId}`);
@@ -1,5 +1,6 @@
 import api from './api';
 import { handleError } from './errorHandler';
+import { cachedGet, invalidateResource } from './queryCache';
 
 /**
  * Service for managing tasks
@@ -12,15 +13,12 @@ export const taskService = {
    */
   getTasks: async (filters = {}) => {
     try {
-      // Convert filters object to query string
-      const queryParams = new URLSearchParams();
+      // Filtrele goale sunt ignorate (și nu fac parte din cheia din cache)
+      const params = {};
       Object.entries(filters).forEach(([key, value]) => {
-        if (value) queryParams.append(key, value);
+        if (value) params[key] = value;
       });
-      
-      const queryString = queryParams.toString() ? `?${queryParams.toString()}` : '';
-      const response = await api.get(`/tasks${queryString}`);
-      return response.data;
+      return await cachedGet('/tasks', { params });
     } catch (error) {
       return handleError(error, 'Error fetching tasks');
     }
@@ -33,8 +31,7 @@ export const taskService = {
    */
   getTaskById: async (taskId) => {
     try {
-      const response = await api.get(`/tasks/${taskId}`);
-      return response.data;
+      return await cachedGet(`/tasks/${taskId}`);
     } catch (error) {
       return handleError(error, `Error fetching task ${taskId}`);
     }
@@ -48,6 +45,7 @@ export const taskService = {
   createTask: async (taskData) => {
     try {
       const response = await api.post('/tasks', taskData);
+      invalidateResource('tasks');
       return response.data;
     } catch (error) {
       return handleError(error, 'Error creating task');
@@ -63,6 +61,7 @@ export const taskService = {
   updateTask: async (taskId, taskData) => {
     try {
       const response = await api.put(`/tasks/${taskId}`, taskData);
+      invalidateResource('tasks');
       return response.data;
     } catch (error) {
       return handleError(error, `Error updating task ${taskId}`);
@@ -77,6 +76,7 @@ export const taskService = {
   deleteTask: async (taskId) => {
     try {
       const response = await api.delete(`/tasks/${taskId}`);
+      invalidateResource('tasks');
       return response.data;
     } catch (error) {
       return handleError(error, `Error deleting task ${taskId}`);
@@ -89,8 +89,7 @@ export const taskService = {
    */
   getTasksCount: async () => {
     try {
-      const response = await api.get('/tasks/count');
-      return response.data;
+      return await cachedGet('/tasks/count');
     } catch (error) {
       return handleError(error, 'Error fetching task counts');
     }
@@ -0,0 +1,13 @@
+# Configurație gunicorn: `gunicorn main:app` (citește automat acest fișier)
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+
+# Aplicația este creată o singură dată în master și partajată copy-on-write cu
+# workerii; pool-urile de conexiuni sunt recreate după fork (vezi backend/app.py)
+preload_app = True
+
+# Thread-uri per worker (gthread): o cerere lentă nu mai blochează tot workerul,
+# iar limitele din backend/admission.py împart thread-urile între clasele de cost
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
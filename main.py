@@ -1,41 +1,39 @@
 import os
-import sys
 import logging
-from flask import send_from_directory, Flask
-from backend.app import app
+from flask import Blueprint, send_from_directory
+from backend.app import create_app
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Add the backend directory to Python path
 current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(os.path.join(current_dir, 'backend'))
+build_folder = os.path.join(current_dir, 'frontend', 'build')
+
+# Rutele pentru frontend-ul React (build static)
+frontend_bp = Blueprint('frontend', __name__)
 
 # Serve static files
-@app.route('/static/<path:filename>')
+@frontend_bp.route('/static/<path:filename>')
 def serve_static(filename):
-    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'build', 'static')
+    static_folder = os.path.join(build_folder, 'static')
     return send_from_directory(static_folder, filename)
 
 # Serve add contact page
-@app.route('/add')
+@frontend_bp.route('/add')
 def serve_add_page():
-    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'build')
-    return send_from_directory(static_folder, 'add.html')
+    return send_from_directory(build_folder, 'add.html')
 
 # Serve edit contact page
-@app.route('/edit/<contact_id>')
+@frontend_bp.route('/edit/<contact_id>')
 def serve_edit_page(contact_id):
-    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'build')
-    return send_from_directory(static_folder, 'edit.html')
+    return send_from_directory(build_folder, 'edit.html')
 
 # Serve React frontend - this route must be defined after all API routes
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
+@frontend_bp.route('/', defaults={'path': ''})
+@frontend_bp.route('/<path:path>')
 def serve(path):
     logger.debug(f"Serving path: {path}")
-    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'build')
     
     # Special handling for /add and /edit routes
     if path.startswith('add'):
@@ -43,12 +41,16 @@ def serve(path):
     elif path.startswith('edit/'):
         contact_id = path.split('/')[-1]
         return serve_edit_page(contact_id)
-    elif path and os.path.exists(os.path.join(static_folder, path)):
+    elif path and os.path.exists(os.path.join(build_folder, path)):
         logger.debug(f"Serving file: {path}")
-        return send_from_directory(static_folder, path)
+        return send_from_directory(build_folder, path)
     else:
         logger.debug("Serving index.html")
-        return send_from_directory(static_folder, 'index.html')
+        return send_from_directory(build_folder, 'index.html')
+
+# Entry point pentru gunicorn (`gunicorn main:app`) și pentru `flask --app main`
+app = create_app()
+app.register_blueprint(frontend_bp)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5001, debug=True)
@@ -15,7 +15,23 @@ fileConfig(config.config_file_name)
 logger = logging.getLogger('alembic.env')
 
 
-def get_engine():
+def get_tenants():
+    """Tenant-urile de migrat: `flask db upgrade -x tenant=acme` sau `-x tenant=all`.
+
+    Fără argument (sau cu modul multi-tenant dezactivat) se migrează baza implicită.
+    """
+    tenant = context.get_x_argument(as_dictionary=True).get('tenant')
+    tenants = current_app.extensions.get('crm_tenants')
+    if not tenant or tenants is None:
+        return [None]
+    if tenant == 'all':
+        return tenants.list_tenants(current_app.config['CRM_TENANTS'])
+    return [tenant]
+
+
+def get_engine(tenant=None):
+    if tenant is not None:
+        return current_app.extensions['crm_tenants'].engine_for(tenant)
     try:
         # this works with Flask-SQLAlchemy<3 and Alchemical
         return current_app.extensions['migrate'].db.get_engine()
@@ -63,13 +79,16 @@ def run_migrations_offline():
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
-    context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
-    )
+    for tenant in get_tenants():
+        url = config.get_main_option("sqlalchemy.url")
+        if tenant is not None:
+            url = current_app.extensions['crm_tenants'].uri_for(tenant)
+        context.configure(
+            url=url, target_metadata=get_metadata(), literal_binds=True
+        )
 
-    with context.begin_transaction():
-        context.run_migrations()
+        with context.begin_transaction():
+            context.run_migrations()
 
 
 def run_migrations_online():
@@ -94,17 +113,20 @@ def run_migrations_online():
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
-    connectable = get_engine()
+    for tenant in get_tenants():
+        if tenant is not None:
+            logger.info(f'Migrating tenant {tenant}')
+        connectable = get_engine(tenant)
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=get_metadata(),
-            **conf_args
-        )
+        with connectable.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=get_metadata(),
+                **conf_args
+            )
 
-        with context.begin_transaction():
-            context.run_migrations()
+            with context.begin_transaction():
+                context.run_migrations()
 
 
 if context.is_offline_mode():
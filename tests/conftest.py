@@ -0,0 +1 @@
+pytest_plugins = ['backend.pytest_plugin']
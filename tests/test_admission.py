@@ -0,0 +1,31 @@
+"""Porțile de admission control (backend/admission.py)."""
+import pytest
+
+from backend.admission import AdmissionRegistry, Shed
+
+
+def test_request_shed_by_the_class_gate_leaves_no_trace_on_the_route_gate():
+    registry = AdmissionRegistry(
+        class_limits={'heavy': (1, 0, 0)},
+        route_limits={'api.get_contacts': (2, 1000, 4)},
+    )
+    route_gate = registry.route_gates['api.get_contacts']
+    held = registry.admit('api.get_reports', 'heavy')  # ocupă singurul permis al clasei
+    route_gate.service_seconds = 3.0
+
+    with pytest.raises(Shed) as shed:
+        registry.admit('api.get_contacts', 'heavy')
+    assert shed.value.gate == 'class:heavy'
+
+    stats = registry.stats()['routes']['api.get_contacts']
+    assert stats['in_flight'] == 0
+    assert stats['admitted'] == 0
+    assert stats['avg_wait_ms'] == 0.0
+    # Media duratelor (folosită de Retry-After) nu este trasă spre 0
+    assert route_gate.service_seconds == 3.0
+    assert registry.stats()['classes']['heavy']['shed']['queue_full'] == 1
+
+    held.release()
+    ticket = registry.admit('api.get_contacts', 'heavy')
+    assert registry.stats()['routes']['api.get_contacts']['admitted'] == 1
+    ticket.release()
@@ -0,0 +1,69 @@
+"""Backup și restore cu cold storage activ (backend/backup.py)."""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import create_app, db
+from backend.backup import BackupError, backup_database, cold_backup_path, restore_database
+from backend.coldstorage import move_to_cold
+from backend.models import Contact, Interaction
+
+
+@pytest.fixture
+def cold_app(tmp_path):
+    app = create_app({
+        'TESTING': True, 'CRM_OUTBOX_DISPATCHER': 'inline',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'crm.db'}",
+        'CRM_COLD_STORAGE': True, 'CRM_COLD_STORAGE_PATH': str(tmp_path / 'crm_cold.db'),
+    })
+    with app.app_context():
+        db.create_all()
+        contact = Contact(name='Archived', email='archived@example.com')
+        db.session.add(contact)
+        db.session.flush()
+        db.session.add_all(
+            Interaction(interaction_type='Call', notes=str(i), contact_id=contact.id, interaction_date=datetime.utcnow())
+            for i in range(4)
+        )
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def _archive(ids):
+    db.session.execute(
+        db.update(Interaction).where(Interaction.id.in_(ids))
+        .values(interaction_date=datetime.utcnow() - timedelta(days=365))
+    )
+    db.session.commit()
+    return move_to_cold(cutoff=datetime.utcnow() - timedelta(days=30))
+
+
+def test_backup_set_restores_hot_and_cold_together(cold_app, tmp_path):
+    client = cold_app.test_client()
+    with cold_app.app_context():
+        assert _archive([1, 2]) == 2
+        result = backup_database(str(tmp_path / 'set.db.gz'))
+    assert os.path.exists(cold_backup_path(str(tmp_path / 'set.db.gz')))
+    assert result['cold_bytes'] > 0
+
+    with cold_app.app_context():
+        assert _archive([3, 4]) == 2
+        restore_database(str(tmp_path / 'set.db.gz'))
+
+    # Fiecare interacțiune apare o singură dată, iar mutarea în cold funcționează în continuare
+    assert client.get('/api/interactions/count').get_json()['count'] == 4
+    with cold_app.app_context():
+        assert _archive([3, 4]) == 2
+    assert client.get('/api/interactions/count').get_json()['count'] == 4
+
+
+def test_restore_without_cold_copy_is_refused(cold_app, tmp_path):
+    path = str(tmp_path / 'hot-only.db')
+    with cold_app.app_context():
+        backup_database(path)
+        os.remove(cold_backup_path(path))
+        with pytest.raises(BackupError, match='no cold storage copy'):
+            restore_database(path)
@@ -0,0 +1,47 @@
+"""Plafonul de notificări per țintă (backend/retention.py)."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from backend.models import Company, Contact, Notification, NotificationArchive
+from backend.retention import prune_notifications
+
+
+def _read_count(session, *conditions):
+    return session.scalar(select(func.count(Notification.id)).where(Notification.is_read.is_(True), *conditions))
+
+
+def test_cap_applies_per_contact_and_per_company_to_read_notifications(crm_db):
+    company = Company(name='Capped')
+    crm_db.add(company)
+    crm_db.flush()
+    first, second = Contact(name='First', email='first@example.com'), Contact(name='Second', email='second@example.com')
+    crm_db.add_all([first, second])
+    crm_db.flush()
+    now = datetime.utcnow()
+    # Legate de contact și de companie: 20 citite, 10 necitite
+    crm_db.add_all(
+        Notification(message=f'both {i}', is_read=i < 20, created_at=now - timedelta(hours=i),
+                     link_contact_id=first.id, link_company_id=company.id)
+        for i in range(30)
+    )
+    crm_db.add_all(
+        Notification(message=f'contact {i}', is_read=True, created_at=now - timedelta(hours=i), link_contact_id=second.id)
+        for i in range(6)
+    )
+    crm_db.add_all(
+        Notification(message=f'company {i}', is_read=True, created_at=now + timedelta(hours=i + 1), link_company_id=company.id)
+        for i in range(4)
+    )
+    crm_db.commit()
+
+    result = prune_notifications(ttl_days=0, max_per_target=5, batch_size=3)
+
+    # first: 20 -> 5 citite; compania: 5 + 4 -> 5 (cele 4 mai noi rămân); second: 6 -> 5
+    assert result == {'expired': 0, 'over_limit': 15 + 4 + 1}
+    assert _read_count(crm_db, Notification.link_contact_id == first.id) == 1
+    assert _read_count(crm_db, Notification.link_contact_id == second.id) == 5
+    assert _read_count(crm_db, Notification.link_company_id == company.id) == 5
+    assert crm_db.scalar(select(func.count(Notification.id)).where(Notification.is_read.is_(False))) == 10
+    assert crm_db.scalar(select(func.count(NotificationArchive.id))) == 20
+    assert prune_notifications(ttl_days=0, max_per_target=5) == {'expired': 0, 'over_limit': 0}
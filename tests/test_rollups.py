@@ -0,0 +1,23 @@
+"""Configurarea rollup-urilor de rapoarte (backend/rollups.py)."""
+import logging
+
+from backend.app import create_app
+from backend.rollups import DEFAULT_BATCH_INTERVAL_SECONDS
+
+
+def test_batch_mode_without_interval_gets_the_default_scheduler(caplog):
+    with caplog.at_level(logging.WARNING, logger='backend.rollups'):
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'CRM_ROLLUP_MODE': 'batch', 'CRM_ROLLUP_INTERVAL_SECONDS': 0
+        })
+    assert app.config['CRM_ROLLUP_INTERVAL_SECONDS'] == DEFAULT_BATCH_INTERVAL_SECONDS
+    assert 'CRM_ROLLUP_INTERVAL_SECONDS' in caplog.text
+
+
+def test_explicit_interval_and_incremental_mode_are_kept():
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'CRM_ROLLUP_MODE': 'batch', 'CRM_ROLLUP_INTERVAL_SECONDS': 60
+    })
+    assert app.config['CRM_ROLLUP_INTERVAL_SECONDS'] == 60
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    assert app.config['CRM_ROLLUP_INTERVAL_SECONDS'] == 0
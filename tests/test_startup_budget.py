@@ -0,0 +1,21 @@
+"""benchmarks/startup_budget.py rulat ca în CI: bugetele de pornire și importurile leneșe."""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'benchmarks', 'startup_budget.py')
+
+
+def test_worker_startup_within_budget_without_cli_modules():
+    env = dict(os.environ)
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    result = subprocess.run(
+        [sys.executable, SCRIPT, '--runs', '2'], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=300
+    )
+    output = result.stdout + result.stderr
+    assert 'CLI-only modules imported' not in output, output
+    assert 'FAIL' not in output, output
+    assert result.returncode == 0, output
+    assert 'create_app + first request' in output
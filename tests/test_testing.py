@@ -0,0 +1,119 @@
+"""Fixture-urile din backend/pytest_plugin.py și șabloanele din backend/testing.py."""
+import os
+
+import pytest
+import sqlalchemy as sa
+
+from backend.app import db
+from backend.models import Company, Contact, Interaction, Notification, OutboxEvent
+from backend.testing import seed_sample_data, template_database, template_key
+
+SEEDED_CONTACTS = 200
+SEEDED_INTERACTIONS = 2000
+
+
+# ---------- crm_db / crm_client: o tranzacție anulată per test ----------
+
+# Rulat de două ori: oricare rulează al doilea vede baza neatinsă de primul,
+# indiferent de ordinea testelor (ex: pytest-randomly)
+@pytest.mark.parametrize('run', ['first', 'second'])
+def test_writes_are_rolled_back_between_tests(crm_client, crm_db, run):
+    assert crm_db.query(Contact).count() == SEEDED_CONTACTS
+    assert crm_db.query(Contact).filter_by(email='rollback@example.com').count() == 0
+    assert crm_db.query(OutboxEvent).count() == 0
+
+    response = crm_client.post('/api/contacts', json={'name': f'Rollback {run}', 'email': 'rollback@example.com'})
+    assert response.status_code == 201, response.get_json()
+    contact_id = response.get_json()['id']
+    response = crm_client.post('/api/interactions', json={
+        'contact_id': contact_id, 'interaction_type': 'Call', 'notes': run
+    })
+    assert response.status_code == 201, response.get_json()
+
+    # Commit-urile aplicației sunt SAVEPOINT-uri: vizibile în același test
+    assert crm_db.query(Contact).count() == SEEDED_CONTACTS + 1
+    assert crm_db.query(Notification).count() >= 1
+
+
+def test_rollback_undoes_only_the_last_savepoint(crm_client, crm_db):
+    crm_db.add(Company(name='Kept'))
+    crm_db.commit()
+    crm_db.add(Company(name='Discarded'))
+    crm_db.flush()
+    crm_db.rollback()
+    assert crm_db.query(Company).filter_by(name='Kept').count() == 1
+    assert crm_db.query(Company).filter_by(name='Discarded').count() == 0
+    response = crm_client.get('/api/companies?q=Kept')
+    assert response.status_code == 200
+    assert [company['name'] for company in response.get_json()['items']] == ['Kept']
+
+
+# ---------- crm_isolated_app: o copie proprie, scrieri din alte thread-uri ----------
+
+def test_isolated_app_serves_a_parallel_batch(crm_isolated_app):
+    client = crm_isolated_app.test_client()
+    response = client.post('/api/contacts', json={'name': 'Isolated', 'email': 'isolated@example.com'})
+    assert response.status_code == 201
+    contact_id = response.get_json()['id']
+
+    # Fiecare sub-cerere paralelă rulează pe un thread al pool-ului, cu sesiunea ei
+    response = client.post('/api/batch', json={'parallel': True, 'requests': [
+        {'path': f'/api/contacts/{contact_id}'},
+        {'path': '/api/contacts?limit=1'},
+        {'path': '/api/contacts'},
+        {'path': '/api/companies'},
+        {'path': '/api/meetings'},
+        {'path': '/api/interactions/count'},
+    ]})
+    assert response.status_code == 200
+    responses = response.get_json()['responses']
+    assert [r['status'] for r in responses] == [200] * 6
+    assert responses[0]['body']['email'] == 'isolated@example.com'
+    assert responses[1]['body']['total'] == SEEDED_CONTACTS + 1
+    assert len(responses[2]['body']) == SEEDED_CONTACTS + 1
+    assert responses[5]['body']['count'] == SEEDED_INTERACTIONS
+
+
+def test_isolated_app_starts_from_the_template(crm_isolated_app):
+    with crm_isolated_app.app_context():
+        assert db.session.query(Contact).filter_by(email='isolated@example.com').count() == 0
+        assert db.session.query(Contact).count() == SEEDED_CONTACTS
+        assert db.session.query(Interaction).count() == SEEDED_INTERACTIONS
+
+
+# ---------- Cheia șablonului ----------
+
+def _small_seed(contacts=5, interactions=10, tasks=0, meetings=0, seed=1):
+    return seed_sample_data(contacts=contacts, interactions=interactions, tasks=tasks, meetings=meetings, seed=seed)
+
+
+def test_template_key_changes_with_seed_and_params():
+    params = {'contacts': 5, 'interactions': 10}
+    key = template_key(seed_sample_data, params)
+    assert template_key(seed_sample_data, dict(params)) == key
+    assert template_key(seed_sample_data, {**params, 'interactions': 11}) != key
+    assert template_key(_small_seed, params) != key
+
+
+def test_template_key_changes_with_schema():
+    params = {'contacts': 5}
+    key = template_key(seed_sample_data, params)
+    table = sa.Table('template_key_probe', db.metadata, sa.Column('id', sa.Integer, primary_key=True))
+    try:
+        assert template_key(seed_sample_data, params) != key
+        table.append_column(sa.Column('name', sa.String(10)))
+        assert template_key(seed_sample_data, params) != key
+    finally:
+        db.metadata.remove(table)
+    assert template_key(seed_sample_data, params) == key
+
+
+def test_template_database_is_built_once_per_key(tmp_path):
+    path = template_database(_small_seed, directory=str(tmp_path))
+    built_at = os.path.getmtime(path)
+    assert template_database(_small_seed, directory=str(tmp_path)) == path
+    assert os.path.getmtime(path) == built_at
+
+    other = template_database(_small_seed, directory=str(tmp_path), contacts=6)
+    assert other != path
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(path), os.path.basename(other)])
@@ -0,0 +1,19 @@
+"""Rutele PATCH (backend/updates.py) returnează aceeași formă a resursei ca GET."""
+import pytest
+
+# Câmpurile din relații (compania, interacțiunile, numele din task) nu sunt în răspunsul PATCH
+NESTED = {'company', 'interactions', 'company_name', 'contact_name'}
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/contacts/1', {'name': 'Renamed', 'email': 'Renamed.Contact@Example.com'}),
+    ('/api/companies/1', {'name': 'Renamed Co'}),
+    ('/api/tasks/1', {'title': 'Renamed task'}),
+])
+def test_patch_response_has_the_get_keys(crm_client, path, body):
+    patched = crm_client.patch(path, json=body)
+    assert patched.status_code == 200, patched.get_json()
+    fetched = crm_client.get(path)
+    assert fetched.status_code == 200
+    assert set(patched.get_json()) == set(fetched.get_json()) - NESTED
+    assert 'email_normalized' not in patched.get_json()